@@ -0,0 +1,128 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+import numpy as np
+
+from .metrics import metrics
+
+
+class InferenceScheduler:
+    """
+    Coalesces concurrent prediction requests into micro-batches and runs them off the
+    event loop. The first waiting request opens a batch; requests arriving within
+    window_seconds join it, up to max_batch_size profiles. Each batch is one vectorized
+    predict per model version, run on a bounded thread pool (xgboost releases the GIL
+    while predicting). At most max_workers batches run at once, so under load requests
+    queue up and leave in larger batches.
+    """
+
+    def __init__(self, predict: Callable[[Any, list], np.ndarray], max_batch_size: int = 256,
+                 window_seconds: float = 0.001, max_workers: int = 1, max_queue: int = 4096):
+        # predict(snapshot, profiles) -> (n, 3) array
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='inference')
+        self._loop = None
+        self._queue = None
+        self._slots = None
+        self._task = None
+        # Request that did not fit in the previous batch; opens the next one
+        self._carry = None
+
+    def _ensure_started(self):
+        # Started lazily on the serving event loop (ASGI test transports do not run the lifespan)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(self.max_queue)
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._carry = None
+            self._task = loop.create_task(self._collect())
+
+    async def submit(self, snapshot, profiles: list) -> np.ndarray:
+        """Predicts low, mid, high for profiles with the snapshot's models; returns (n, 3)."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        # Waits when the queue is full, so callers feel backpressure instead of memory growing
+        await self._queue.put((snapshot, profiles, future, time.perf_counter()))
+        return await future
+
+    async def run(self, fn: Callable, *args):
+        """
+        Runs fn(*args) on the inference threads. It takes one of the max_workers slots like a
+        batch does, so long jobs split into calls queue fairly with the request batches.
+        """
+        self._ensure_started()
+        async with self._slots:
+            return await self._loop.run_in_executor(self._executor, fn, *args)
+
+    async def _next_request(self, timeout):
+        if self._carry is not None:
+            request, self._carry = self._carry, None
+            return request
+        if timeout is None:
+            return await self._queue.get()
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        if timeout <= 0:
+            return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _collect(self):
+        while True:
+            batch = [await self._next_request(None)]
+            # Requests keep queuing while every slot is busy, so the batch grows under load
+            await self._slots.acquire()
+            size = len(batch[0][1])
+            deadline = self._loop.time() + self.window_seconds
+            while size < self.max_batch_size:
+                request = await self._next_request(deadline - self._loop.time())
+                if request is None:
+                    break
+                if size + len(request[1]) > self.max_batch_size:
+                    self._carry = request
+                    break
+                batch.append(request)
+                size += len(request[1])
+            self._loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        try:
+            dispatched = time.perf_counter()
+            # Requests of one batch may have started on different model versions
+            groups = {}
+            for request in batch:
+                groups.setdefault(id(request[0]), []).append(request)
+                if metrics.enabled:
+                    metrics.stage_duration.observe(('queue_wait',), dispatched - request[3])
+            for requests in groups.values():
+                profiles = [profile for _, request_profiles, _, _ in requests for profile in request_profiles]
+                if metrics.enabled:
+                    metrics.batch_size.observe((), len(profiles))
+                try:
+                    ranges = await self._loop.run_in_executor(self._executor, self.predict, requests[0][0], profiles)
+                except Exception as e:
+                    for _, _, future, _ in requests:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                start = 0
+                for _, request_profiles, future, _ in requests:
+                    if not future.done():  # The caller may have gone away
+                        future.set_result(ranges[start:start + len(request_profiles)])
+                    start += len(request_profiles)
+        finally:
+            self._slots.release()
+
+    async def close(self):
+        """Stops collecting batches; a later submit starts again."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with a time-to-live. Entries are evicted when the cache is
+    over max_size (least recently used first) or when they are older than ttl_seconds.
+    A max_size of 0 disables caching. clock returns the current time in seconds.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self.clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
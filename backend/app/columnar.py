@@ -0,0 +1,172 @@
+from typing import Dict, Tuple
+import numpy as np
+
+from .encoder import Categorical
+from .predictor import PROFILE_COLUMNS
+
+# Request and response bodies of /predict_salary_range/bulk
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+COLUMNAR_MEDIA_TYPES = {
+    ARROW_MEDIA_TYPE: ARROW_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE: MSGPACK_MEDIA_TYPE,
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+}
+
+# UserProfile fields by type; also the input columns of scripts/score_profiles.py
+INTEGER_FIELDS = ['age', 'hours_per_week']
+STRING_FIELDS = [field for field in PROFILE_COLUMNS if field not in INTEGER_FIELDS]
+OUTPUT_COLUMNS = ['lower_bound', 'median', 'upper_bound']
+
+
+class ColumnarError(ValueError):
+    """A body that cannot be read as profile columns at all; status_code is the HTTP answer."""
+
+    def __init__(self, message: str, status_code: int = 422):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _import_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ColumnarError("MessagePack bodies need the msgpack package; send an Arrow IPC stream "
+                            f"({ARROW_MEDIA_TYPE}) instead.", status_code=415)
+    return msgpack
+
+
+def _int64_values(values: list) -> list:
+    # Python ints outside int64 become infinities, so validate_columns fails only their rows
+    return [(float('inf') if v > 0 else float('-inf'))
+            if isinstance(v, int) and not -2 ** 63 <= v < 2 ** 63 else v for v in values]
+
+
+def read_columns(body: bytes, media_type: str) -> dict:
+    """
+    Decodes a request body into one pyarrow array per UserProfile field. Arrow bodies are an
+    IPC stream with one column per field; MessagePack bodies a map of field -> list of values.
+    """
+    # Imported here, like pandas elsewhere: only this route needs them
+    import pyarrow as pa
+
+    if media_type == ARROW_MEDIA_TYPE:
+        try:
+            table = pa.ipc.open_stream(body).read_all()
+        except (pa.ArrowInvalid, OSError) as e:
+            raise ColumnarError(f"Invalid Arrow IPC stream: {e}")
+        columns = {name: table.column(name) for name in table.column_names}
+    else:
+        msgpack = _import_msgpack()
+        try:
+            data = msgpack.unpackb(body)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise ColumnarError(f"Invalid MessagePack body: {e}")
+        if not isinstance(data, dict):
+            raise ColumnarError("MessagePack body must be a map of column name -> list of values.")
+        columns = {}
+        for field in PROFILE_COLUMNS:
+            if isinstance(data.get(field), list):
+                values = _int64_values(data[field]) if field in INTEGER_FIELDS else data[field]
+                try:
+                    columns[field] = pa.array(values)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError) as e:
+                    raise ColumnarError(f"Column {field}: {e}")
+            elif field in data:
+                raise ColumnarError(f"Column {field} must be a list.")
+
+    missing = [field for field in PROFILE_COLUMNS if field not in columns]
+    if missing:
+        raise ColumnarError(f"Missing columns: {', '.join(missing)}.")
+    lengths = {len(columns[field]) for field in PROFILE_COLUMNS}
+    if len(lengths) > 1:
+        raise ColumnarError("All columns must have the same length.")
+    arrays = {}
+    for field in PROFILE_COLUMNS:
+        column = columns[field]
+        if isinstance(column, pa.ChunkedArray):
+            if pa.types.is_dictionary(column.type):
+                # Record batches may carry different dictionaries
+                column = column.cast(column.type.value_type)
+            column = column.combine_chunks()
+        arrays[field] = column
+    return arrays
+
+
+def validate_columns(arrays: dict) -> Tuple[Dict[str, object], np.ndarray, np.ndarray]:
+    """
+    Applies the UserProfile rules a whole column at a time: integer fields take integers or
+    whole floats within the int64 range, string fields take strings, and neither may be null.
+    A column of the wrong type rejects the request; a bad value only fails its row. Returns
+    the model input (ACS column -> int64 array or Categorical) for the valid rows, the valid
+    row mask and an error message per row (None when valid).
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    n = len(arrays[next(iter(PROFILE_COLUMNS))])
+    errors = np.full(n, None, dtype=object)
+    valid = np.ones(n, dtype=bool)
+    columns = {}
+    for field in INTEGER_FIELDS:
+        array = arrays[field]
+        missing = array.is_null().to_numpy(zero_copy_only=False)
+        if pa.types.is_integer(array.type):
+            raw = pc.fill_null(array, 0).to_numpy()
+            bad = missing | (raw > np.iinfo(np.int64).max) if raw.dtype == np.uint64 else missing
+            values = np.where(bad, 0, raw).astype(np.int64)
+        elif pa.types.is_floating(array.type) or pa.types.is_null(array.type):
+            floats = pc.fill_null(array.cast(pa.float64()), 0.0).to_numpy()
+            # 2 ** 63 is the first float past the int64 range; casting it would wrap around
+            bad = missing | ~np.isfinite(floats) | (floats != np.round(floats)) | (np.abs(floats) >= 2.0 ** 63)
+            values = np.where(bad, 0, floats).astype(np.int64)
+        else:
+            raise ColumnarError(f"Column {field} must hold integers, not {array.type}.")
+        errors[missing & valid] = f"{field}: missing"
+        errors[bad & ~missing & valid] = f"{field}: not an integer"
+        valid &= ~bad
+        columns[PROFILE_COLUMNS[field]] = values
+    for field in STRING_FIELDS:
+        array = arrays[field]
+        if pa.types.is_dictionary(array.type):
+            array = array.cast(array.type.value_type)
+        if pa.types.is_null(array.type):
+            array = array.cast(pa.string())
+        if not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+            raise ColumnarError(f"Column {field} must hold strings, not {array.type}.")
+        encoded = array.dictionary_encode()
+        codes = pc.fill_null(encoded.indices, -1).to_numpy().astype(np.int64)
+        bad = codes < 0
+        errors[bad & valid] = f"{field}: missing"
+        valid &= ~bad
+        columns[PROFILE_COLUMNS[field]] = Categorical(codes, encoded.dictionary.to_pylist())
+    return {column: values[valid] for column, values in columns.items()}, valid, errors
+
+
+def write_columns(ranges: np.ndarray, valid: np.ndarray, errors: np.ndarray, media_type: str) -> bytes:
+    """
+    Encodes the results in the request's format, one row per input row in input order:
+    lower_bound, median and upper_bound (null for invalid rows) and error (null for valid rows).
+    ranges holds the (low, mid, high) rows of the valid rows only.
+    """
+    import pyarrow as pa
+
+    full = np.zeros((len(valid), 3))
+    full[valid] = ranges
+    if media_type == ARROW_MEDIA_TYPE:
+        table = pa.table({
+            **{name: pa.array(full[:, i], mask=~valid) for i, name in enumerate(OUTPUT_COLUMNS)},
+            'error': pa.array(errors, type=pa.string()),
+        })
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    msgpack = _import_msgpack()
+    body = {}
+    for i, name in enumerate(OUTPUT_COLUMNS):
+        values = full[:, i].astype(object)
+        values[~valid] = None
+        body[name] = values.tolist()
+    body['error'] = errors.tolist()
+    return msgpack.packb(body)
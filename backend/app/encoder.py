@@ -0,0 +1,139 @@
+from typing import Dict, List, Sequence
+import numpy as np
+
+
+class Categorical:
+    """
+    Dictionary-encoded column: codes index into categories, -1 marks a missing value.
+    Lets columnar input be encoded without a Python lookup per row.
+    """
+
+    def __init__(self, codes, categories: list):
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.categories = list(categories)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, rows) -> "Categorical":
+        return Categorical(self.codes[rows], self.categories)
+
+    def recode(self, codes: Dict[str, int]) -> np.ndarray:
+        """Codes in another category order (value -> code); -1 for values it does not contain."""
+        # The extra trailing -1 is where missing values (code -1) land
+        lookup = np.array([codes.get(value, -1) for value in self.categories] + [-1], dtype=np.int64)
+        return lookup[self.codes]
+
+
+class FeatureEncoder:
+    """
+    Pandas- and sklearn-free replica of a fitted ColumnTransformer made of a StandardScaler
+    ('num') and a OneHotEncoder ('cat'). Produces the float32 matrix XGBoost sees after
+    Pipeline preprocessing, so booster predictions are bit-for-bit identical.
+
+    When the ColumnTransformer output is sparse, XGBoost treats every entry that is not
+    stored (all zeros) as missing, so the dense rows built here use NaN for those entries.
+    """
+
+    def __init__(self, numerical_columns: List[str], means, scales,
+                 categorical_columns: List[str], categories: List[list], sparse_output: bool):
+        self.numerical_columns = list(numerical_columns)
+        self.means = None if means is None else np.asarray(means, dtype=np.float64)
+        self.scales = None if scales is None else np.asarray(scales, dtype=np.float64)
+        self.categorical_columns = list(categorical_columns)
+        self.categories = [list(values) for values in categories]
+        self.sparse_output = bool(sparse_output)
+
+        # Output layout: scaled numerical columns, then one block of one-hot columns per feature
+        self.category_offsets = []
+        self.category_codes = []
+        offset = len(self.numerical_columns)
+        for values in self.categories:
+            self.category_offsets.append(offset)
+            self.category_codes.append({value: code for code, value in enumerate(values)})
+            offset += len(values)
+        self.num_features = offset
+        self.fill_value = np.nan if self.sparse_output else 0.0
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor) -> "FeatureEncoder":
+        """Extracts the fitted scaler statistics and one-hot categories from a ColumnTransformer."""
+        numerical_columns, means, scales = [], None, None
+        categorical_columns, categories = [], []
+        for name, transformer, columns in preprocessor.transformers_:
+            if name == 'remainder':
+                if transformer != 'drop':
+                    raise ValueError("FeatureEncoder only supports remainder='drop'.")
+            elif name == 'num':
+                numerical_columns = list(columns)
+                means = transformer.mean_ if transformer.with_mean else None
+                scales = transformer.scale_ if transformer.with_std else None
+            elif name == 'cat':
+                if transformer.drop is not None or transformer.handle_unknown != 'ignore':
+                    raise ValueError("FeatureEncoder only supports OneHotEncoder(drop=None, handle_unknown='ignore').")
+                categorical_columns = list(columns)
+                categories = [values.tolist() for values in transformer.categories_]
+            else:
+                raise ValueError(f"Unsupported transformer in preprocessor: {name!r}")
+        return cls(numerical_columns, means, scales, categorical_columns, categories,
+                   preprocessor.sparse_output_)
+
+    def to_dict(self) -> dict:
+        """JSON-serializable description of the fitted preprocessing."""
+        return {
+            'numerical_columns': self.numerical_columns,
+            'means': None if self.means is None else self.means.tolist(),
+            'scales': None if self.scales is None else self.scales.tolist(),
+            'categorical_columns': self.categorical_columns,
+            'categories': self.categories,
+            'sparse_output': self.sparse_output,
+        }
+
+    @classmethod
+    def from_dict(cls, d) -> "FeatureEncoder":
+        return cls(d['numerical_columns'], d['means'], d['scales'],
+                   d['categorical_columns'], d['categories'], d['sparse_output'])
+
+    def __eq__(self, other):
+        if not isinstance(other, FeatureEncoder):
+            return NotImplemented
+        return (self.numerical_columns == other.numerical_columns
+                and _arrays_equal(self.means, other.means)
+                and _arrays_equal(self.scales, other.scales)
+                and self.categorical_columns == other.categorical_columns
+                and self.categories == other.categories
+                and self.sparse_output == other.sparse_output)
+
+    def encode(self, columns: Dict[str, Sequence]) -> np.ndarray:
+        """Encodes column-oriented input (ACS column -> values) into an (n, num_features) float32 matrix."""
+        n = len(columns[self.numerical_columns[0] if self.numerical_columns else self.categorical_columns[0]])
+        out = np.full((n, self.num_features), self.fill_value, dtype=np.float32)
+        rows = np.arange(n)
+
+        if self.numerical_columns:
+            # Same float64 operations, in the same order, as StandardScaler.transform
+            scaled = np.column_stack([np.asarray(columns[c], dtype=np.float64) for c in self.numerical_columns])
+            if self.means is not None:
+                scaled -= self.means
+            if self.scales is not None:
+                scaled /= self.scales
+            if self.sparse_output:
+                scaled[scaled == 0] = np.nan
+            out[:, :len(self.numerical_columns)] = scaled
+
+        for column, offset, codes in zip(self.categorical_columns, self.category_offsets, self.category_codes):
+            # Unknown categories stay all-zero (handle_unknown='ignore')
+            values = columns[column]
+            if isinstance(values, Categorical):
+                value_codes = values.recode(codes)
+            else:
+                value_codes = np.fromiter((codes.get(value, -1) for value in values), dtype=np.int64, count=n)
+            known = value_codes >= 0
+            out[rows[known], offset + value_codes[known]] = 1.0
+        return out
+
+
+def _arrays_equal(a, b):
+    if a is None or b is None:
+        return a is b
+    return np.array_equal(a, b)
@@ -0,0 +1,157 @@
+import json
+import numpy as np
+
+
+def _parse_floats(value: str) -> np.ndarray:
+    """Parses XGBoost's JSON number or '[a,b,c]' vector notation into float32."""
+    return np.array([float(v) for v in value.strip('[]').split(',')], dtype=np.float32)
+
+
+# Rows evaluated at once by predict_margin; its temporaries are (rows, trees) arrays, so this
+# bounds memory whatever the batch size (about 50 MB per array for 4096 rows x 1500 trees)
+BLOCK_ROWS = 4096
+
+# Objectives whose predictions predict() reproduces: the raw margin (identity link), or
+# the sigmoid of it for binary:logistic. reg:gamma, reg:tweedie, count:poisson, ... use a log link.
+SUPPORTED_OBJECTIVES = ('reg:squarederror', 'reg:absoluteerror', 'reg:quantileerror', 'reg:pseudohubererror',
+                        'binary:logistic')
+
+
+class CompiledForest:
+    """
+    A gradient-boosted tree ensemble flattened into NumPy arrays and evaluated for all
+    trees at once, one tree level per step. Needs only NumPy at prediction time.
+
+    Every tree's nodes are stored back to back. Leaves point to themselves, so after
+    max_depth steps every (row, tree) position sits on its leaf.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'default_left', 'leaf_value',
+              'roots', 'tree_group', 'base_score')
+
+    def __init__(self, feature, threshold, left, right, default_left, leaf_value,
+                 roots, tree_group, base_score, max_depth, objective):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.tree_group = tree_group
+        self.base_score = base_score
+        self.max_depth = int(max_depth)
+        self.objective = str(objective)
+        self.num_groups = len(base_score)
+        # children[node] = (right, left), indexed by the go-left flag during traversal
+        self.children = np.column_stack([right, left])
+        # Trees of each output, in boosting order (XGBoost adds them to the margin in this order)
+        self.group_trees = [np.flatnonzero(tree_group == g) for g in range(self.num_groups)]
+
+    @classmethod
+    def from_booster(cls, booster, iteration_range=(0, 0)) -> "CompiledForest":
+        """Flattens an xgboost Booster, keeping only the trees used by iteration_range."""
+        learner = json.loads(booster.save_raw('json'))['learner']
+        objective = learner['objective']['name']
+        if objective not in SUPPORTED_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for export: {objective}")
+        booster_model = learner['gradient_booster']
+        if booster_model['name'] != 'gbtree':
+            raise ValueError(f"Only gbtree models can be exported, not {booster_model['name']}.")
+        model = booster_model['model']
+        trees, tree_info = model['trees'], model['tree_info']
+        if iteration_range[1] > 0:
+            end = model['iteration_indptr'][iteration_range[1]]
+            trees, tree_info = trees[:end], tree_info[:end]
+
+        feature, threshold, left, right, default_left, leaf_value, roots = [], [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+        for tree in trees:
+            if int(tree['tree_param']['size_leaf_vector']) > 1 or any(tree['split_type']):
+                raise ValueError("Multi-output and categorical trees cannot be exported.")
+            lefts = np.array(tree['left_children'], dtype=np.int32)
+            rights = np.array(tree['right_children'], dtype=np.int32)
+            is_leaf = lefts == -1
+            node_ids = np.arange(len(lefts), dtype=np.int32)
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, tree['split_indices']).astype(np.int32))
+            threshold.append(np.array(tree['split_conditions'], dtype=np.float32))
+            # For leaves split_conditions holds the leaf value
+            leaf_value.append(np.where(is_leaf, np.array(tree['split_conditions'], dtype=np.float32), 0).astype(np.float32))
+            left.append(np.where(is_leaf, node_ids, lefts) + offset)
+            right.append(np.where(is_leaf, node_ids, rights) + offset)
+            default_left.append(np.array(tree['default_left'], dtype=bool))
+            max_depth = max(max_depth, _tree_depth(lefts, rights))
+            offset += len(lefts)
+
+        base_score = _parse_floats(learner['learner_model_param']['base_score'])
+        num_groups = max(int(learner['learner_model_param'].get('num_target', 1)),
+                         int(learner['learner_model_param'].get('num_class', 0)), 1)
+        if len(base_score) != num_groups:
+            base_score = np.repeat(base_score[:1], num_groups)
+        if objective == 'binary:logistic':
+            # base_score is stored as a probability; the trees add to the log-odds margin
+            base_score = np.log(base_score / (1 - base_score)).astype(np.float32)
+
+        return cls(
+            np.concatenate(feature), np.concatenate(threshold), np.concatenate(left).astype(np.int32),
+            np.concatenate(right).astype(np.int32), np.concatenate(default_left), np.concatenate(leaf_value),
+            np.array(roots, dtype=np.int32), np.array(tree_info, dtype=np.int32), base_score,
+            max_depth, objective
+        )
+
+    def to_arrays(self, prefix='') -> dict:
+        arrays = {prefix + name: getattr(self, name) for name in self.ARRAYS}
+        arrays[prefix + 'max_depth'] = np.array(self.max_depth)
+        arrays[prefix + 'objective'] = np.array(self.objective)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix='') -> "CompiledForest":
+        values = [np.asarray(arrays[prefix + name]) for name in cls.ARRAYS]
+        return cls(*values, max_depth=arrays[prefix + 'max_depth'], objective=arrays[prefix + 'objective'])
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        """Raw scores, shape (n, num_groups), for a float32 matrix where NaN marks missing values."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        margin = np.empty((len(X), self.num_groups), dtype=np.float32)
+        for start in range(0, len(X), BLOCK_ROWS):
+            margin[start:start + BLOCK_ROWS] = self._predict_block(X[start:start + BLOCK_ROWS])
+        return margin
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        flat_X = X.ravel()
+        row_offsets = (np.arange(len(X)) * X.shape[1])[:, None]
+        nodes = np.tile(self.roots, (len(X), 1))
+        for _ in range(self.max_depth):
+            values = flat_X[row_offsets + self.feature[nodes]]
+            # XGBoost goes left when value < threshold, and follows default_left when missing
+            go_left = (values < self.threshold[nodes]) | (np.isnan(values) & self.default_left[nodes])
+            nodes = self.children[nodes, go_left.view(np.int8)]
+        leaves = self.leaf_value[nodes]
+
+        margin = np.empty((len(X), self.num_groups), dtype=np.float32)
+        for group, trees in enumerate(self.group_trees):
+            # Sequential float32 accumulation from the base score, like XGBoost's CPU predictor
+            total = np.full(len(X), self.base_score[group], dtype=np.float32)
+            for tree in trees:
+                total += leaves[:, tree]
+            margin[:, group] = total
+        return margin
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predictions after the objective's link function; shape (n,) for one output, else (n, num_groups)."""
+        margin = self.predict_margin(X)
+        if self.objective == 'binary:logistic':
+            margin = 1 / (1 + np.exp(-margin))
+        return margin[:, 0] if self.num_groups == 1 else margin
+
+
+def _tree_depth(lefts, rights) -> int:
+    depth, frontier = 0, [0]
+    while True:
+        frontier = [child for node in frontier for child in (lefts[node], rights[node]) if child != -1]
+        if not frontier:
+            return depth
+        depth += 1
@@ -1,18 +1,46 @@
+import hmac
+import json
 import sys
 import os
-import pandas as pd
-import joblib
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import numpy as np
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import ValidationError
 
 # Add the project root to the Python path to allow for absolute imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from .schemas import UserProfile, SalaryRangeResponse, FairnessAnalysisResponse
-from mappings import map_education, map_occupation
+from .schemas import (
+    UserProfile, SalaryRangeResponse, FairnessAnalysisResponse,
+    BatchSalaryRangeRequest, BatchSalaryRangeItem, BatchSalaryRangeResponse, BatchItemError,
+    CacheStatsResponse, ModelStatusResponse, ReadinessResponse,
+    SalaryTrajectoryRequest, SalaryTrajectoryResponse, TrajectorySeries, TrajectoryPoint
+)
+from .predictor import PROFILE_COLUMNS
+from .registry import ModelRegistry, ModelSnapshot, read_manifest, resolve_models_dir
+from .cache import PredictionCache
+from .batching import InferenceScheduler
+from .streaming import NDJSONStreamingResponse
+from .columnar import COLUMNAR_MEDIA_TYPES, ColumnarError, read_columns, validate_columns, write_columns
+from .encoder import Categorical
+from .metrics import metrics, MetricsMiddleware, Counter, Gauge
+from mappings import SEXES, RACES, AGE_RANGE, HOURS_RANGE
+
+MODEL_VERSION_HEADER = "X-Model-Version"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MODEL_WATCH_INTERVAL > 0:
+        registry.start_watching(MODEL_WATCH_INTERVAL)
+    yield
+    registry.stop_watching()
+    if scheduler is not None:
+        await scheduler.close()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # --- CORS Configuration ---
 origins = ["http://localhost:5173", "http://localhost:5174"]
@@ -22,47 +50,128 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[MODEL_VERSION_HEADER],
 )
 
+# --- Metrics ---
+# Per-stage timers, request counters and model load times served on /metrics; "0" turns
+# all instrumentation off (no middleware, no-op timers)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+metrics.enabled = METRICS_ENABLED
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 # --- Model Loading ---
-MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
-LOW_REGRESSOR_PATH = os.path.join(MODELS_DIR, 'acs_low.joblib')
-MID_REGRESSOR_PATH = os.path.join(MODELS_DIR, 'acs_mid.joblib')
-HIGH_REGRESSOR_PATH = os.path.join(MODELS_DIR, 'acs_high.joblib')
-
-try:
-    low_reg_pipeline = joblib.load(LOW_REGRESSOR_PATH)
-    mid_reg_pipeline = joblib.load(MID_REGRESSOR_PATH)
-    high_reg_pipeline = joblib.load(HIGH_REGRESSOR_PATH)
-    print("Salary range prediction models loaded successfully.")
-except FileNotFoundError:
-    low_reg_pipeline = mid_reg_pipeline = high_reg_pipeline = None
-    print("Warning: Salary range prediction models not found. Please train them first.")
-
-def prepare_input_df(user_profile: UserProfile) -> pd.DataFrame:
-    """Prepares the input DataFrame for prediction from a UserProfile."""
-    input_data = {
-        'AGEP': user_profile.age,
-        'SCHL': user_profile.education_level,
-        'MAR': user_profile.marital_status,
-        'SEX': user_profile.sex,
-        'OCCP': user_profile.occupation_category,
-        'WKHP': user_profile.hours_per_week,
-        'COW': user_profile.work_class,
-        'RAC1P': user_profile.race
-    }
-    return pd.DataFrame([input_data])
+MODELS_DIR = os.environ.get("MODELS_DIR", os.path.join(os.path.dirname(__file__), '..', 'models'))
 
-@app.post("/predict_salary_range", response_model=SalaryRangeResponse)
-async def predict_salary_range(user_profile: UserProfile):
-    if not mid_reg_pipeline:
+# --- Prediction Cache ---
+# Shared by every endpoint; keyed on the model version and the normalized profile
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "50000"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "3600"))
+prediction_cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL)
+# Whole /predict_salary_range/trajectory responses, kept apart so charts never evict single predictions
+TRAJECTORY_CACHE_SIZE = int(os.environ.get("TRAJECTORY_CACHE_SIZE", "1000"))
+trajectory_cache = PredictionCache(max_size=TRAJECTORY_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL)
+
+# Which model artifacts to serve (app.predictor.MODEL_FORMATS): 'auto' serves the native
+# UBJSON boosters when present, 'compiled' the NumPy-only export (scripts/export_acs.py),
+# 'joblib' the pickled sklearn pipelines
+MODEL_FORMAT = os.environ.get("MODEL_FORMAT", "auto")
+# Answer in-range profiles from the precomputed prediction table when one was built for the model
+USE_PREDICTION_TABLE = os.environ.get("USE_PREDICTION_TABLE", "1") != "0"
+# Seconds between checks of the registry manifest for a new model version (0 disables)
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", "0"))
+# Required in the X-Admin-Token header of admin endpoints; without it they are disabled (404)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+def on_model_swap(snapshot: ModelSnapshot):
+    prediction_cache.clear()
+    trajectory_cache.clear()
+    metrics.model_loaded(snapshot.version, type(snapshot.predictor).__name__,
+                         snapshot.load_seconds, snapshot.warm_up_seconds)
+
+registry = ModelRegistry(MODELS_DIR, model_format=MODEL_FORMAT, on_swap=on_model_swap,
+                         use_table=USE_PREDICTION_TABLE)
+registry.reload()
+
+def current_snapshot(response: Response) -> ModelSnapshot:
+    """The snapshot a request uses from start to finish; also reported in X-Model-Version."""
+    # First call of every prediction handler: the time so far went to reading and validating the body
+    metrics.stage_since_request_start('parse_validate')
+    snapshot = registry.current
+    if snapshot is None:
         raise HTTPException(status_code=503, detail="Models are not loaded.")
-    
-    input_df = prepare_input_df(user_profile)
-    
-    lower_bound = low_reg_pipeline.predict(input_df)[0]
-    median = mid_reg_pipeline.predict(input_df)[0]
-    upper_bound = high_reg_pipeline.predict(input_df)[0]
+    response.headers[MODEL_VERSION_HEADER] = snapshot.version
+    return snapshot
+
+def profile_cache_key(snapshot: ModelSnapshot, user_profile: UserProfile) -> tuple:
+    """Cache key: the model version plus only the profile fields the models read."""
+    return (snapshot.version,) + tuple(getattr(user_profile, field) for field in snapshot.input_fields)
+
+# --- Batch Configuration ---
+# Upper bound on the number of profiles accepted by /predict_salary_range/batch
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "10000"))
+
+# --- Inference Scheduling ---
+# Model calls run on INFERENCE_WORKERS threads instead of the event loop; concurrent requests
+# arriving within INFERENCE_BATCH_WINDOW_MS are merged into one predict of up to
+# INFERENCE_MAX_BATCH_SIZE profiles. INFERENCE_BATCHING=0 predicts inline on the event loop.
+INFERENCE_BATCHING = os.environ.get("INFERENCE_BATCHING", "1") != "0"
+INFERENCE_BATCH_WINDOW_MS = float(os.environ.get("INFERENCE_BATCH_WINDOW_MS", "1"))
+INFERENCE_MAX_BATCH_SIZE = int(os.environ.get("INFERENCE_MAX_BATCH_SIZE", "256"))
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "1"))
+
+def predict_with_models(snapshot: ModelSnapshot, user_profiles: List[UserProfile]) -> np.ndarray:
+    return snapshot.predictor.predict_profiles(user_profiles)
+
+scheduler = InferenceScheduler(
+    predict_with_models,
+    max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+    window_seconds=INFERENCE_BATCH_WINDOW_MS / 1000,
+    max_workers=INFERENCE_WORKERS,
+) if INFERENCE_BATCHING else None
+
+async def predict_profiles(snapshot: ModelSnapshot, user_profiles: List[UserProfile]) -> np.ndarray:
+    """
+    Returns an (n, 3) array of low, mid, high in input order. Profiles are answered from
+    the prediction table or the cache when possible; the rest go through the models in one
+    batch, shared with concurrent requests when the inference scheduler is on.
+    """
+    ranges = np.empty((len(user_profiles), 3))
+    missed, missed_keys = [], []
+    from_table = 0
+    with metrics.stage('lookup'):
+        for i, user_profile in enumerate(user_profiles):
+            row = snapshot.table.lookup(user_profile) if snapshot.table is not None else None
+            if row is None:
+                key = profile_cache_key(snapshot, user_profile)
+                row = prediction_cache.get(key)
+                if row is None:
+                    missed.append(i)
+                    missed_keys.append(key)
+                    continue
+            else:
+                from_table += 1
+            ranges[i] = row
+    metrics.count_profiles('table', from_table)
+    metrics.count_profiles('cache', len(user_profiles) - from_table - len(missed))
+    metrics.count_profiles('model', len(missed))
+    if missed:
+        missed_profiles = [user_profiles[i] for i in missed]
+        if scheduler is not None:
+            ranges[missed] = await scheduler.submit(snapshot, missed_profiles)
+        else:
+            ranges[missed] = predict_with_models(snapshot, missed_profiles)
+        with metrics.stage('cache_store'):
+            for i, key in zip(missed, missed_keys):
+                prediction_cache.put(key, ranges[i].copy())
+    return ranges
+
+@app.post("/predict_salary_range", response_model=SalaryRangeResponse)
+async def predict_salary_range(user_profile: UserProfile, response: Response):
+    snapshot = current_snapshot(response)
+
+    lower_bound, median, upper_bound = (await predict_profiles(snapshot, [user_profile]))[0]
 
     return SalaryRangeResponse(
         lower_bound=float(lower_bound),
@@ -70,36 +179,334 @@ async def predict_salary_range(user_profile: UserProfile):
         upper_bound=float(upper_bound)
     )
 
-@app.post("/analyze_fairness", response_model=FairnessAnalysisResponse)
-async def analyze_fairness(user_profile: UserProfile):
-    if not mid_reg_pipeline:
+def validate_batch_items(items: list, results: List[BatchSalaryRangeItem]):
+    """Validates raw batch items; records errors in results and returns (indices, profiles) of the valid ones."""
+    valid_indices, valid_profiles = [], []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[i].errors = [BatchItemError(loc=[], msg="Profile must be a JSON object.", type="type_error")]
+            continue
+        try:
+            valid_profiles.append(UserProfile(**item))
+            valid_indices.append(i)
+        except ValidationError as e:
+            results[i].errors = [
+                BatchItemError(loc=list(err['loc']), msg=err['msg'], type=err['type']) for err in e.errors()
+            ]
+    return valid_indices, valid_profiles
+
+async def predict_batch_items(snapshot: ModelSnapshot, valid_indices: List[int], valid_profiles: List[UserProfile],
+                              results: List[BatchSalaryRangeItem]):
+    if valid_profiles:
+        ranges = await predict_profiles(snapshot, valid_profiles)
+        for i, (lower_bound, median, upper_bound) in zip(valid_indices, ranges):
+            results[i].prediction = SalaryRangeResponse(
+                lower_bound=float(lower_bound),
+                median=float(median),
+                upper_bound=float(upper_bound)
+            )
+
+@app.post("/predict_salary_range/batch", response_model=BatchSalaryRangeResponse)
+async def predict_salary_range_batch(request: BatchSalaryRangeRequest, response: Response):
+    snapshot = current_snapshot(response)
+    if len(request.profiles) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(request.profiles)} profiles exceeds the limit of {MAX_BATCH_SIZE}."
+        )
+
+    # 1. Validate each row on its own so one bad profile only fails its own slot
+    results = [BatchSalaryRangeItem(index=i) for i in range(len(request.profiles))]
+    with metrics.stage('validate_rows'):
+        valid_indices, valid_profiles = validate_batch_items(request.profiles, results)
+
+    # 2. Score all valid rows together: one native encode and one predict per model, no DataFrame
+    await predict_batch_items(snapshot, valid_indices, valid_profiles, results)
+
+    return BatchSalaryRangeResponse(
+        results=results,
+        num_succeeded=len(valid_indices),
+        num_failed=len(results) - len(valid_indices)
+    )
+
+# --- Streaming ---
+# Lines per vectorized predict, and parsed batches buffered ahead of the models, in
+# /predict_salary_range/stream
+STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", "256"))
+STREAM_MAX_PENDING_BATCHES = int(os.environ.get("STREAM_MAX_PENDING_BATCHES", "4"))
+
+@app.post("/predict_salary_range/stream", response_class=NDJSONStreamingResponse)
+async def predict_salary_range_stream():
+    """
+    Newline-delimited JSON profiles in, one BatchSalaryRangeItem per line out, in input order,
+    streamed while the body is still being uploaded. The whole stream uses one model version.
+    """
+    snapshot = registry.current
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="Models are not loaded.")
+
+    async def handle_batch(lines):
+        results = [BatchSalaryRangeItem(index=index) for index, _ in lines]
+        items = []
+        for result, (_, line) in zip(results, lines):
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                result.errors = [BatchItemError(loc=[], msg=f"Invalid JSON: {e}", type="json_invalid")]
+                items.append(None)
+        positions = [i for i, result in enumerate(results) if result.errors is None]
+        valid_positions, valid_profiles = validate_batch_items([items[i] for i in positions],
+                                                               [results[i] for i in positions])
+        await predict_batch_items(snapshot, [positions[i] for i in valid_positions], valid_profiles, results)
+        return [result.model_dump_json(exclude_none=True).encode() + b"\n" for result in results]
+
+    return NDJSONStreamingResponse(handle_batch, batch_size=STREAM_BATCH_SIZE,
+                                   max_pending_batches=STREAM_MAX_PENDING_BATCHES,
+                                   headers={MODEL_VERSION_HEADER: snapshot.version})
+
+# --- Columnar Bulk Prediction ---
+# Upper bound on the rows of one /predict_salary_range/bulk request, and rows per model call:
+# large bulk requests are predicted in chunks that queue with the other requests' batches
+BULK_MAX_ROWS = int(os.environ.get("BULK_MAX_ROWS", "1000000"))
+BULK_CHUNK_ROWS = int(os.environ.get("BULK_CHUNK_ROWS", "4096"))
+
+async def predict_columns(snapshot: ModelSnapshot, columns: dict) -> np.ndarray:
+    """
+    Returns an (n, 3) array of low, mid, high for column-oriented model input, without
+    building a Python object per profile. In-range rows are read from the prediction table
+    in one vectorized lookup; the prediction cache is not used.
+    """
+    n = len(columns[next(iter(columns))])
+    ranges = np.empty((n, 3))
+    missed = np.arange(n)
+    if snapshot.table is not None:
+        with metrics.stage('lookup'):
+            found, rows = snapshot.table.lookup_columns(columns)
+            ranges[found] = rows
+            missed = np.flatnonzero(~found)
+    metrics.count_profiles('table', n - len(missed))
+    metrics.count_profiles('model', len(missed))
+    for start in range(0, len(missed), BULK_CHUNK_ROWS):
+        rows = missed[start:start + BULK_CHUNK_ROWS]
+        chunk = {column: values[rows] for column, values in columns.items()}
+        if scheduler is not None:
+            ranges[rows] = await scheduler.run(snapshot.predictor.predict_columns, chunk)
+        else:
+            ranges[rows] = snapshot.predictor.predict_columns(chunk)
+    return ranges
+
+@app.post("/predict_salary_range/bulk")
+async def predict_salary_range_bulk(request: Request):
+    """
+    Bulk prediction with columnar bodies: an Arrow IPC stream (application/vnd.apache.arrow.stream)
+    or a MessagePack map of columns (application/msgpack), one column per UserProfile field.
+    Answers in the same format with lower_bound, median, upper_bound and error columns, in
+    input order. Columns are validated and encoded whole, without per-row Python objects.
+    """
+    snapshot = registry.current
+    if snapshot is None:
         raise HTTPException(status_code=503, detail="Models are not loaded.")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    media_type = COLUMNAR_MEDIA_TYPES.get(content_type)
+    if media_type is None:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type {content_type!r}; "
+                                                    f"expected one of {', '.join(COLUMNAR_MEDIA_TYPES)}.")
+    body = await request.body()
+    try:
+        with metrics.stage('parse_validate'):
+            arrays = read_columns(body, media_type)
+            num_rows = len(arrays['age'])
+            if num_rows > BULK_MAX_ROWS:
+                raise ColumnarError(f"Bulk size exceeds the limit of {BULK_MAX_ROWS} rows.", status_code=413)
+            columns, valid, errors = validate_columns(arrays)
+    except ColumnarError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    ranges = await predict_columns(snapshot, columns)
+    with metrics.stage('serialize'):
+        content = write_columns(ranges, valid, errors, media_type)
+    return Response(content, media_type=media_type, headers={MODEL_VERSION_HEADER: snapshot.version})
+
+@app.post("/analyze_fairness", response_model=FairnessAnalysisResponse)
+async def analyze_fairness(user_profile: UserProfile, response: Response):
+    snapshot = current_snapshot(response)
+
+    # 1. Counterfactual grid: every sex x race combination, plus the original profile
+    # and the simple swaps reported on their own (gender swap, White <-> Black). Race is
+    # only varied when the models read it; otherwise every race gets the same prediction.
+    race_in_model = 'race' in snapshot.input_fields
+    races = RACES if race_in_model else [user_profile.race]
+    original = (user_profile.sex, user_profile.race)
+    gender_swap = ("Female" if user_profile.sex == "Male" else "Male", user_profile.race)
+    race_swap = (user_profile.sex, "Black" if user_profile.race == "White" else "White") if race_in_model \
+        else original
+    combinations = list(dict.fromkeys(
+        [original, gender_swap, race_swap] + [(sex, race) for sex in SEXES for race in races]
+    ))
 
-    # 1. Original Prediction
-    original_df = prepare_input_df(user_profile)
-    original_prediction = mid_reg_pipeline.predict(original_df)[0]
-
-    # 2. Gender Counterfactual
-    gender_swapped_profile = user_profile.copy()
-    gender_swapped_profile.sex = "Female" if user_profile.sex == "Male" else "Male"
-    gender_df = prepare_input_df(gender_swapped_profile)
-    gender_counterfactual = mid_reg_pipeline.predict(gender_df)[0]
-    
-    # 3. Race Counterfactual
-    # Simple swap: If White, change to Black. Otherwise, change to White.
-    race_swapped_profile = user_profile.copy()
-    race_swapped_profile.race = "Black" if user_profile.race == "White" else "White"
-    race_df = prepare_input_df(race_swapped_profile)
-    race_counterfactual = mid_reg_pipeline.predict(race_df)[0]
-
-    # 4. Calculate Gaps
-    gender_gap = ((gender_counterfactual - original_prediction) / original_prediction) * 100
-    race_gap = ((race_counterfactual - original_prediction) / original_prediction) * 100
+    profiles = []
+    for sex, race in combinations:
+        counterfactual = user_profile.copy()
+        counterfactual.sex = sex
+        counterfactual.race = race
+        profiles.append(counterfactual)
+
+    # 2. Score the whole grid in one vectorized pass
+    medians = dict(zip(combinations, (await predict_profiles(snapshot, profiles))[:, 1]))
+    original_prediction = medians[original]
+
+    # 3. Calculate Gaps
+    def gap(prediction):
+        return round(float((prediction - original_prediction) / original_prediction * 100), 2)
+
+    prediction_matrix, gap_matrix = {}, {}
+    for (sex, race), prediction in medians.items():
+        prediction_matrix.setdefault(sex, {})[race] = float(prediction)
+        gap_matrix.setdefault(sex, {})[race] = gap(prediction)
 
     return FairnessAnalysisResponse(
         original_prediction=float(original_prediction),
-        gender_counterfactual=float(gender_counterfactual),
-        race_counterfactual=float(race_counterfactual),
-        gender_gap_percent=round(gender_gap, 2),
-        race_gap_percent=round(race_gap, 2)
+        gender_counterfactual=float(medians[gender_swap]),
+        race_counterfactual=float(medians[race_swap]),
+        gender_gap_percent=gap(medians[gender_swap]),
+        race_gap_percent=gap(medians[race_swap]),
+        race_in_model=race_in_model,
+        prediction_matrix=prediction_matrix,
+        gap_matrix=gap_matrix
+    )
+
+# --- Salary Trajectory ---
+# Longest trajectory and largest hours-per-week grid accepted by /predict_salary_range/trajectory
+MAX_TRAJECTORY_YEARS = int(os.environ.get("MAX_TRAJECTORY_YEARS", "50"))
+MAX_TRAJECTORY_HOURS = int(os.environ.get("MAX_TRAJECTORY_HOURS", "24"))
+
+def trajectory_columns(user_profile: UserProfile, ages: List[int], hours: List[int]) -> dict:
+    """Model input for every (hours, age) pair of the grid, hours-major, the other fields fixed."""
+    n = len(ages) * len(hours)
+    columns = {}
+    for field, column in PROFILE_COLUMNS.items():
+        if field == 'age':
+            columns[column] = np.tile(np.asarray(ages, dtype=np.int64), len(hours))
+        elif field == 'hours_per_week':
+            columns[column] = np.repeat(np.asarray(hours, dtype=np.int64), len(ages))
+        else:
+            columns[column] = Categorical(np.zeros(n, dtype=np.int64), [getattr(user_profile, field)])
+    return columns
+
+@app.post("/predict_salary_range/trajectory", response_model=SalaryTrajectoryResponse)
+async def predict_salary_trajectory(request: SalaryTrajectoryRequest, response: Response):
+    """
+    Low, mid and high predictions for every age from the profile's age up to years_ahead
+    later (at most the top of the age range), for each requested hours per week. The whole
+    grid is scored in one vectorized pass and the result is cached per profile and grid.
+    Ages and hours must lie in AGE_RANGE and HOURS_RANGE, the ranges the chart covers.
+    """
+    snapshot = current_snapshot(response)
+    user_profile = request.profile
+    if not AGE_RANGE[0] <= user_profile.age <= AGE_RANGE[1]:
+        raise HTTPException(status_code=422, detail=f"age must be between {AGE_RANGE[0]} and {AGE_RANGE[1]}.")
+    if not 0 <= request.years_ahead <= MAX_TRAJECTORY_YEARS:
+        raise HTTPException(status_code=422, detail=f"years_ahead must be between 0 and {MAX_TRAJECTORY_YEARS}.")
+    hours = sorted(set(request.hours_per_week or [user_profile.hours_per_week]))
+    if len(hours) > MAX_TRAJECTORY_HOURS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_TRAJECTORY_HOURS} hours_per_week values.")
+    if not all(HOURS_RANGE[0] <= h <= HOURS_RANGE[1] for h in hours):
+        raise HTTPException(status_code=422,
+                            detail=f"hours_per_week values must be between {HOURS_RANGE[0]} and {HOURS_RANGE[1]}.")
+
+    key = (request.years_ahead, tuple(hours)) + profile_cache_key(snapshot, user_profile)
+    cached = trajectory_cache.get(key)
+    if cached is not None:
+        return cached
+
+    ages = list(range(user_profile.age, min(user_profile.age + request.years_ahead, AGE_RANGE[1]) + 1))
+    ranges = (await predict_columns(snapshot, trajectory_columns(user_profile, ages, hours))).reshape(
+        len(hours), len(ages), 3)
+    result = SalaryTrajectoryResponse(
+        ages=ages,
+        series=[
+            TrajectorySeries(hours_per_week=h, points=[
+                TrajectoryPoint(age=age, lower_bound=float(low), median=float(mid), upper_bound=float(high))
+                for age, (low, mid, high) in zip(ages, series_ranges)
+            ])
+            for h, series_ranges in zip(hours, ranges)
+        ]
+    )
+    trajectory_cache.put(key, result)
+    return result
+
+@app.get("/ready", response_model=ReadinessResponse)
+async def ready(response: Response):
+    """Readiness probe: 200 once a model version is loaded and warmed up, 503 before."""
+    snapshot = registry.current
+    if snapshot is None:
+        response.status_code = 503
+        return ReadinessResponse(ready=False, model_version=None, predictor=None,
+                                 load_seconds=None, warm_up_seconds=None)
+    return ReadinessResponse(
+        ready=True,
+        model_version=snapshot.version,
+        predictor=type(snapshot.predictor).__name__,
+        load_seconds=snapshot.load_seconds,
+        warm_up_seconds=snapshot.warm_up_seconds
+    )
+
+@app.get("/cache/stats", response_model=CacheStatsResponse)
+async def cache_stats():
+    return CacheStatsResponse(model_version=registry.version, **prediction_cache.stats())
+
+def cache_families(name: str, cache: PredictionCache) -> list:
+    stats = cache.stats()
+    description = name.replace('_', ' ').capitalize()
+    families = []
+    for key in ('hits', 'misses', 'evictions', 'expirations'):
+        counter = Counter(f'salary_api_{name}_{key}_total', f'{description} {key}.')
+        counter.inc((), stats[key])
+        families.append(counter)
+    size = Gauge(f'salary_api_{name}_size', f'Entries in the {description.lower()}.')
+    size.set((), stats['size'])
+    return families + [size]
+
+def cache_metrics():
+    return cache_families('prediction_cache', prediction_cache) + cache_families('trajectory_cache', trajectory_cache)
+
+metrics.collectors.append(cache_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of the request, stage, model and cache metrics."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def check_admin_token(x_admin_token: Optional[str] = Header(default=None)):
+    # The admin routes can swap the served models, so they only exist once a token is configured
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+def model_status() -> ModelStatusResponse:
+    manifest = read_manifest(MODELS_DIR)
+    return ModelStatusResponse(
+        current_version=registry.version,
+        manifest_version=manifest['current'] if manifest else None,
+        available_versions=[entry['version'] for entry in manifest['versions']] if manifest else [],
+        reloading=registry.reloading,
+        last_error=registry.last_error
     )
+
+@app.post("/admin/reload", response_model=ModelStatusResponse, status_code=202,
+          dependencies=[Depends(check_admin_token)])
+async def reload_models(version: Optional[str] = None):
+    """Loads a model version (default: the manifest's current one) in the background and swaps it in."""
+    if version is not None:
+        try:
+            resolve_models_dir(MODELS_DIR, version)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    registry.reload_in_background(version)
+    return model_status()
+
+@app.get("/admin/models", response_model=ModelStatusResponse, dependencies=[Depends(check_admin_token)])
+async def get_model_status():
+    return model_status()
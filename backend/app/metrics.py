@@ -0,0 +1,213 @@
+import bisect
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Upper bounds of the inference batch size histogram
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+
+# perf_counter() at which the current request entered MetricsMiddleware
+REQUEST_START: ContextVar[float] = ContextVar('request_start', default=0.0)
+
+# Returned by the timers when instrumentation is disabled
+_NO_TIMER = nullcontext()
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra='') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {value}')
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, labels: tuple, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f'# TYPE {self.name} gauge'
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (+Inf last), sum]
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, labels: tuple) -> "_Timer":
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.histogram.observe(self.labels, time.perf_counter() - self.start)
+
+
+class ServiceMetrics:
+    """
+    Counters and latency histograms of the prediction service, rendered in the Prometheus
+    text format. With enabled False the timers are a shared no-op context manager and
+    nothing is recorded.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.requests = Counter('salary_api_requests_total', 'Requests by endpoint and status code.',
+                                ('endpoint', 'status'))
+        self.errors = Counter('salary_api_errors_total', 'Requests answered with a 5xx status, by endpoint.',
+                              ('endpoint',))
+        self.request_duration = Histogram('salary_api_request_duration_seconds',
+                                          'End-to-end request latency by endpoint.', ('endpoint',))
+        self.stage_duration = Histogram('salary_api_stage_duration_seconds',
+                                        'Time spent in each stage of the prediction path.', ('stage',))
+        self.model_duration = Histogram('salary_api_model_predict_duration_seconds',
+                                        'Latency of each model predict call.', ('model',))
+        self.batch_size = Histogram('salary_api_inference_batch_size',
+                                    'Profiles per model call of the inference scheduler.', (), BATCH_SIZE_BUCKETS)
+        self.profiles = Counter('salary_api_profiles_total',
+                                'Profiles answered, by source (table, cache or model).', ('source',))
+        self.model_load_seconds = Gauge('salary_api_model_load_seconds',
+                                        'Load time of the served model version, including warm-up.',
+                                        ('version', 'predictor'))
+        self.model_warm_up_seconds = Gauge('salary_api_model_warm_up_seconds',
+                                           'Warm-up time of the served model version.', ('version', 'predictor'))
+        self.families = [self.requests, self.errors, self.request_duration, self.stage_duration,
+                         self.model_duration, self.batch_size, self.profiles, self.model_load_seconds,
+                         self.model_warm_up_seconds]
+        # Called at scrape time; each returns more families (e.g. the prediction cache statistics)
+        self.collectors: List[Callable[[], list]] = []
+
+    def stage(self, name: str):
+        """Context manager timing one stage of the prediction path."""
+        return self.stage_duration.time((name,)) if self.enabled else _NO_TIMER
+
+    def model(self, name: str):
+        """Context manager timing one model predict call."""
+        return self.model_duration.time((name,)) if self.enabled else _NO_TIMER
+
+    def stage_since_request_start(self, name: str):
+        """Records the time from the start of the request to now as a stage (e.g. body parsing and validation)."""
+        start = REQUEST_START.get()
+        if self.enabled and start:
+            self.stage_duration.observe((name,), time.perf_counter() - start)
+
+    def count_profiles(self, source: str, count: int):
+        if self.enabled and count:
+            self.profiles.inc((source,), count)
+
+    def model_loaded(self, version: str, predictor: str, load_seconds: float, warm_up_seconds: float):
+        # Only the served version is reported
+        self.model_load_seconds.clear()
+        self.model_warm_up_seconds.clear()
+        self.model_load_seconds.set((version, predictor), load_seconds)
+        self.model_warm_up_seconds.set((version, predictor), warm_up_seconds)
+
+    def render(self) -> str:
+        families = self.families + [family for collector in self.collectors for family in collector()]
+        return '\n'.join(line for family in families for line in family.render()) + '\n'
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, errors and latency per route."""
+
+    def __init__(self, app, metrics: ServiceMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        token = REQUEST_START.set(start)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_START.reset(token)
+            # The route template, so path parameters do not create new series
+            route = scope.get('route')
+            endpoint = getattr(route, 'path', 'unmatched')
+            self.metrics.request_duration.observe((endpoint,), time.perf_counter() - start)
+            self.metrics.requests.inc((endpoint, str(status)))
+            if status >= 500:
+                self.metrics.errors.inc((endpoint,))
+
+
+# Shared by the app and the predictors; main.py applies METRICS_ENABLED
+metrics = ServiceMetrics()
@@ -0,0 +1,154 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from .encoder import Categorical
+from mappings import (
+    EDUCATION_LEVELS, OCCUPATION_CATEGORIES, WORK_CLASSES, MARITAL_STATUSES,
+    SEXES, RACES, AGE_RANGE, HOURS_RANGE
+)
+
+TABLE_FILE = 'acs_table.npy'
+TABLE_META_FILE = 'acs_table.json'
+
+# (UserProfile field, ACS column, values) for every dimension of the input space.
+# Integer fields list their inclusive range; categorical fields list their options.
+PROFILE_AXES = [
+    ('age', 'AGEP', AGE_RANGE),
+    ('hours_per_week', 'WKHP', HOURS_RANGE),
+    ('education_level', 'SCHL', EDUCATION_LEVELS),
+    ('occupation_category', 'OCCP', OCCUPATION_CATEGORIES),
+    ('work_class', 'COW', WORK_CLASSES),
+    ('marital_status', 'MAR', MARITAL_STATUSES),
+    ('sex', 'SEX', SEXES),
+    ('race', 'RAC1P', RACES),
+]
+
+
+class TableAxis:
+    """One dimension of the table: maps a profile value to its code in 0..size-1."""
+
+    def __init__(self, field: str, column: str, values):
+        self.field = field
+        self.column = column
+        if isinstance(values, tuple):
+            self.low, self.high = values
+            self.values = list(range(self.low, self.high + 1))
+            self.codes = None
+        else:
+            self.values = list(values)
+            self.codes = {value: code for code, value in enumerate(self.values)}
+        self.size = len(self.values)
+
+    def code(self, value) -> Optional[int]:
+        if self.codes is None:
+            return value - self.low if self.low <= value <= self.high else None
+        return self.codes.get(value)
+
+    def to_dict(self):
+        if self.codes is None:
+            return {'field': self.field, 'column': self.column, 'range': [self.low, self.high]}
+        return {'field': self.field, 'column': self.column, 'values': self.values}
+
+    @classmethod
+    def from_dict(cls, d):
+        values = tuple(d['range']) if 'range' in d else d['values']
+        return cls(d['field'], d['column'], values)
+
+
+def build_axes(input_columns: List[str]) -> List[TableAxis]:
+    """Axes for the profile fields the models actually read; other fields cannot change the output."""
+    return [TableAxis(field, column, values) for field, column, values in PROFILE_AXES if column in input_columns]
+
+
+class PredictionTable:
+    """
+    Precomputed low/mid/high predictions for every profile in the discrete input space,
+    stored row-major as an (n, 3) float32 array indexed by mixed-radix feature codes.
+    """
+
+    def __init__(self, axes: List[TableAxis], values: np.ndarray, model_version: str):
+        self.axes = axes
+        self.values = values
+        self.model_version = model_version
+        # Mixed-radix strides: the last axis varies fastest
+        self.strides = []
+        stride = 1
+        for axis in reversed(axes):
+            self.strides.insert(0, stride)
+            stride *= axis.size
+        self.size = stride
+
+    def index(self, user_profile) -> Optional[int]:
+        """Flat row index for a profile, or None if any field is outside the table."""
+        index = 0
+        for axis, stride in zip(self.axes, self.strides):
+            code = axis.code(getattr(user_profile, axis.field))
+            if code is None:
+                return None
+            index += code * stride
+        return index
+
+    def lookup(self, user_profile) -> Optional[np.ndarray]:
+        """Returns the (low, mid, high) row for a profile, or None if it must go to the model."""
+        index = self.index(user_profile)
+        if index is None:
+            return None
+        return self.values[index]
+
+    def lookup_columns(self, columns: Dict[str, object]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized lookup for column-oriented input (ACS column -> integer array or Categorical).
+        Returns the mask of rows inside the table and the (low, mid, high) rows for those.
+        """
+        n = len(columns[self.axes[0].column])
+        index = np.zeros(n, dtype=np.int64)
+        found = np.ones(n, dtype=bool)
+        for axis, stride in zip(self.axes, self.strides):
+            values = columns[axis.column]
+            if axis.codes is None:
+                values = np.asarray(values, dtype=np.int64)
+                found &= (values >= axis.low) & (values <= axis.high)
+                code = values - axis.low
+            elif isinstance(values, Categorical):
+                code = values.recode(axis.codes)
+                found &= code >= 0
+            else:
+                code = np.fromiter((axis.codes.get(value, -1) for value in values), dtype=np.int64, count=n)
+                found &= code >= 0
+            index += code * stride
+        return found, self.values[index[found]]
+
+    def decode(self, indices: np.ndarray) -> dict:
+        """Inverse of index(): per-field value arrays for a batch of flat indices."""
+        codes = np.unravel_index(indices, [axis.size for axis in self.axes])
+        return {
+            axis.field: np.asarray(axis.values, dtype=object if axis.codes is not None else np.int64)[code]
+            for axis, code in zip(self.axes, codes)
+        }
+
+    def save_meta(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({
+                'model_version': self.model_version,
+                'axes': [axis.to_dict() for axis in self.axes],
+                'size': self.size,
+            }, f, indent=2)
+
+
+def load_prediction_table(models_dir: str, model_version: str) -> Optional[PredictionTable]:
+    """Memory-maps the table built for model_version, or returns None if it is missing or stale."""
+    table_path = os.path.join(models_dir, TABLE_FILE)
+    meta_path = os.path.join(models_dir, TABLE_META_FILE)
+    if not (os.path.exists(table_path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta['model_version'] != model_version:
+        print(f"Warning: Prediction table was built for model {meta['model_version']}, "
+              f"not {model_version}. Ignoring it.")
+        return None
+    axes = [TableAxis.from_dict(d) for d in meta['axes']]
+    values = np.load(table_path, mmap_mode='r')
+    return PredictionTable(axes, values, model_version)
@@ -0,0 +1,329 @@
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from .encoder import FeatureEncoder
+from .forest import CompiledForest
+from .metrics import metrics
+
+LOW_REGRESSOR_FILE = 'acs_low.joblib'
+MID_REGRESSOR_FILE = 'acs_mid.joblib'
+HIGH_REGRESSOR_FILE = 'acs_high.joblib'
+# Multi-quantile model (train_acs.py --multi-quantile); preferred over the three separate models
+QUANTILES_REGRESSOR_FILE = 'acs_quantiles.joblib'
+# NumPy-only export of whichever of the above is in use (scripts/export_acs.py)
+COMPILED_REGRESSOR_FILE = 'acs_compiled.npz'
+# Native format written next to the joblib files at training time: one UBJSON booster per
+# joblib model plus a JSON sidecar with the fitted preprocessing, loadable without sklearn
+NATIVE_METADATA_FILE = 'acs_native.json'
+
+# Model formats the API can serve; 'auto' prefers the native boosters over the joblib pipelines
+MODEL_FORMATS = ('auto', 'native', 'joblib', 'compiled')
+
+# UserProfile field -> ACS column read by the models
+PROFILE_COLUMNS = {
+    'age': 'AGEP',
+    'education_level': 'SCHL',
+    'marital_status': 'MAR',
+    'sex': 'SEX',
+    'occupation_category': 'OCCP',
+    'hours_per_week': 'WKHP',
+    'work_class': 'COW',
+    'race': 'RAC1P',
+}
+
+
+def profile_columns(user_profiles) -> Dict[str, list]:
+    """Column-oriented model input (ACS column -> values), one entry per UserProfile, in input order."""
+    return {column: [getattr(p, field) for p in user_profiles] for field, column in PROFILE_COLUMNS.items()}
+
+
+def _iteration_range(model):
+    # Same tree range XGBModel.predict uses (best_iteration if early stopping was used)
+    try:
+        return (0, model.best_iteration + 1)
+    except AttributeError:
+        return (0, 0)
+
+
+def artifact_fingerprint(paths: List[str]) -> str:
+    """Short content hash of the model artifacts, used as the loaded model version."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class BaseSalaryPredictor:
+    """
+    Native prediction path shared by the predictors below: each output block (one
+    multi-quantile model, or the low, mid and high models) has a FeatureEncoder and a
+    tree model. Subclasses set version, encoders and implement _predict_encoded.
+    """
+
+    version: str
+    encoders: List[FeatureEncoder]
+
+    def _predict_encoded(self, model_index: int, X: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    @property
+    def input_columns(self) -> List[str]:
+        """ACS columns actually consumed by the preprocessing (others are dropped)."""
+        encoder = self.encoders[0]
+        return encoder.numerical_columns + encoder.categorical_columns
+
+    @property
+    def input_fields(self) -> List[str]:
+        """UserProfile fields that can change a prediction, in PROFILE_COLUMNS order."""
+        columns = set(self.input_columns)
+        return [field for field, column in PROFILE_COLUMNS.items() if column in columns]
+
+    @property
+    def model_names(self) -> List[str]:
+        """Name of each output block, as reported in the metrics."""
+        return ['quantiles'] if len(self.encoders) == 1 else ['low', 'mid', 'high']
+
+    def predict_columns(self, columns: Dict[str, list]) -> np.ndarray:
+        """Predicts low, mid, high for column-oriented input (ACS column -> values); returns (n, 3)."""
+        encoded = {}
+        outputs = []
+        for i, (encoder, name) in enumerate(zip(self.encoders, self.model_names)):
+            if id(encoder) not in encoded:
+                with metrics.stage('encode'):
+                    encoded[id(encoder)] = encoder.encode(columns)
+            with metrics.model(name):
+                outputs.append(self._predict_encoded(i, encoded[id(encoder)]))
+        if len(outputs) == 1:
+            return outputs[0].reshape(-1, 3)
+        return np.column_stack(outputs)
+
+    def predict_profiles(self, user_profiles) -> np.ndarray:
+        """Predicts low, mid, high for a list of UserProfiles without building a DataFrame."""
+        return self.predict_columns(profile_columns(user_profiles))
+
+
+def _shared_encoder(encoders, encoder):
+    # Models fitted on the same data share one encoder, so a batch is encoded only once
+    return next((e for e in encoders if e == encoder), encoder)
+
+
+class BoosterSalaryPredictor(BaseSalaryPredictor):
+    """
+    Serves the salary models straight from xgboost Boosters: native encoding followed by
+    in-place prediction. Loads from the UBJSON export, so neither sklearn nor pandas is imported.
+    """
+
+    def __init__(self, version: str, encoders: List[FeatureEncoder], models: list):
+        self.version = version
+        self.encoders = []
+        for encoder in encoders:
+            self.encoders.append(_shared_encoder(self.encoders, encoder))
+        # (booster, iteration_range, missing) per output block
+        self.models = models
+
+    def _predict_encoded(self, model_index, X):
+        booster, iteration_range, missing = self.models[model_index]
+        return booster.inplace_predict(X, iteration_range=iteration_range, missing=missing, validate_features=False)
+
+    def save_native(self, models_dir: str) -> List[str]:
+        """Writes the boosters as UBJSON plus the preprocessing sidecar; returns the written paths."""
+        names = [QUANTILES_REGRESSOR_FILE] if len(self.models) == 1 else \
+            [LOW_REGRESSOR_FILE, MID_REGRESSOR_FILE, HIGH_REGRESSOR_FILE]
+        paths, entries = [], []
+        for name, encoder, (booster, iteration_range, missing) in zip(names, self.encoders, self.models):
+            path = os.path.join(models_dir, os.path.splitext(name)[0] + '.ubj')
+            booster.save_model(path)
+            paths.append(path)
+            entries.append({
+                'file': os.path.basename(path),
+                'iteration_range': list(iteration_range),
+                'missing': None if np.isnan(missing) else float(missing),
+                'encoder': encoder.to_dict(),
+            })
+        metadata_path = os.path.join(models_dir, NATIVE_METADATA_FILE)
+        with open(metadata_path, 'w') as f:
+            json.dump({'model_version': self.version, 'models': entries}, f)
+        return paths + [metadata_path]
+
+    @classmethod
+    def load_native(cls, models_dir: str) -> "BoosterSalaryPredictor":
+        import xgboost as xgb
+
+        with open(os.path.join(models_dir, NATIVE_METADATA_FILE)) as f:
+            metadata = json.load(f)
+        encoders, models = [], []
+        for entry in metadata['models']:
+            booster = xgb.Booster(model_file=os.path.join(models_dir, entry['file']))
+            missing = np.nan if entry['missing'] is None else entry['missing']
+            encoders.append(FeatureEncoder.from_dict(entry['encoder']))
+            models.append((booster, tuple(entry['iteration_range']), missing))
+        return cls(metadata['model_version'], encoders, models)
+
+
+class SalaryPredictor(BoosterSalaryPredictor):
+    """
+    The ACS salary range models: either one multi-quantile pipeline or three separate
+    quantile pipelines. Every prediction returns an (n, 3) array of low, mid, high.
+    predict_columns/predict_profiles are bit-for-bit identical to predict_ranges.
+    """
+
+    def __init__(self, paths, quantiles_pipeline=None, low_pipeline=None, mid_pipeline=None, high_pipeline=None):
+        self.paths = list(paths)
+        self.quantiles_pipeline = quantiles_pipeline
+        self.low_pipeline = low_pipeline
+        self.mid_pipeline = mid_pipeline
+        self.high_pipeline = high_pipeline
+
+        # Native inference path: fitted preprocessing replicated in NumPy + in-place booster prediction
+        encoders, models = [], []
+        for pipeline in self.pipelines:
+            encoder = FeatureEncoder.from_preprocessor(pipeline.named_steps['preprocessor'])
+            encoders.append(encoder)
+            model = pipeline[-1]
+            missing = np.nan if encoder.sparse_output else model.missing
+            models.append((model.get_booster(), _iteration_range(model), missing))
+        super().__init__(artifact_fingerprint(self.paths), encoders, models)
+
+    @property
+    def pipelines(self) -> list:
+        if self.quantiles_pipeline is not None:
+            return [self.quantiles_pipeline]
+        return [self.low_pipeline, self.mid_pipeline, self.high_pipeline]
+
+    def predict_ranges(self, input_df: "pd.DataFrame") -> np.ndarray:
+        """Runs each quantile model once over the frame; returns an (n, 3) array of low, mid, high."""
+        if self.quantiles_pipeline is not None:
+            return np.asarray(self.quantiles_pipeline.predict(input_df)).reshape(len(input_df), 3)
+        return np.column_stack([
+            self.low_pipeline.predict(input_df),
+            self.mid_pipeline.predict(input_df),
+            self.high_pipeline.predict(input_df)
+        ])
+
+
+class CompiledSalaryPredictor(BaseSalaryPredictor):
+    """
+    Serves the salary models from the NumPy artifact written by scripts/export_acs.py:
+    encoder metadata plus flattened tree arrays, with no sklearn, pandas or xgboost needed.
+    """
+
+    def __init__(self, version: str, encoders: List[FeatureEncoder], forests: List[CompiledForest]):
+        self.version = version
+        self.encoders = []
+        for encoder in encoders:
+            self.encoders.append(_shared_encoder(self.encoders, encoder))
+        self.forests = forests
+
+    @classmethod
+    def from_predictor(cls, predictor: BoosterSalaryPredictor) -> "CompiledSalaryPredictor":
+        forests = [CompiledForest.from_booster(booster, iteration_range) for booster, iteration_range, _ in predictor.models]
+        return cls(predictor.version, predictor.encoders, forests)
+
+    def save(self, path: str):
+        arrays = {'model_version': np.array(self.version), 'num_models': np.array(len(self.forests))}
+        for i, (encoder, forest) in enumerate(zip(self.encoders, self.forests)):
+            arrays[f'm{i}_encoder'] = np.array(json.dumps(encoder.to_dict()))
+            arrays.update(forest.to_arrays(prefix=f'm{i}_'))
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledSalaryPredictor":
+        with np.load(path) as arrays:
+            num_models = int(arrays['num_models'])
+            encoders = [FeatureEncoder.from_dict(json.loads(str(arrays[f'm{i}_encoder']))) for i in range(num_models)]
+            forests = [CompiledForest.from_arrays(arrays, prefix=f'm{i}_') for i in range(num_models)]
+            return cls(str(arrays['model_version']), encoders, forests)
+
+    def _predict_encoded(self, model_index, X):
+        return self.forests[model_index].predict(X)
+
+
+def salary_model_paths(models_dir: str) -> Optional[List[str]]:
+    """Artifacts of the salary models in use: the multi-quantile model if present, else the three models."""
+    quantiles_path = os.path.join(models_dir, QUANTILES_REGRESSOR_FILE)
+    if os.path.exists(quantiles_path):
+        return [quantiles_path]
+    paths = [os.path.join(models_dir, name) for name in (LOW_REGRESSOR_FILE, MID_REGRESSOR_FILE, HIGH_REGRESSOR_FILE)]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    return paths
+
+
+def load_salary_predictor(models_dir: str) -> Optional[SalaryPredictor]:
+    """Loads the salary models from models_dir, or returns None if they have not been trained."""
+    paths = salary_model_paths(models_dir)
+    if paths is None:
+        return None
+    # joblib (and sklearn, through unpickling) is only needed on this path
+    import joblib
+
+    if len(paths) == 1:
+        return SalaryPredictor(paths, quantiles_pipeline=joblib.load(paths[0]))
+    low, mid, high = (joblib.load(path) for path in paths)
+    return SalaryPredictor(paths, low_pipeline=low, mid_pipeline=mid, high_pipeline=high)
+
+
+def _is_current_export(models_dir: str, version: str, name: str, script: str) -> bool:
+    # Exports record the fingerprint of the joblib models they were made from
+    paths = salary_model_paths(models_dir)
+    if paths is not None and artifact_fingerprint(paths) != version:
+        print(f"Warning: {name} was exported from model {version}, "
+              f"which is not the current model. Please re-run {script}.")
+        return False
+    return True
+
+
+def load_native_salary_predictor(models_dir: str) -> Optional[BoosterSalaryPredictor]:
+    """
+    Loads the UBJSON boosters and preprocessing sidecar, or returns None if they have not been
+    written or were written for different models than the ones now in models_dir.
+    """
+    if not os.path.exists(os.path.join(models_dir, NATIVE_METADATA_FILE)):
+        return None
+    predictor = BoosterSalaryPredictor.load_native(models_dir)
+    if not _is_current_export(models_dir, predictor.version, NATIVE_METADATA_FILE, 'export_acs.py'):
+        return None
+    return predictor
+
+
+def load_compiled_salary_predictor(models_dir: str) -> Optional[CompiledSalaryPredictor]:
+    """
+    Loads the exported NumPy salary models, or returns None if they have not been exported
+    or were exported from different models than the ones now in models_dir.
+    """
+    path = os.path.join(models_dir, COMPILED_REGRESSOR_FILE)
+    if not os.path.exists(path):
+        return None
+    predictor = CompiledSalaryPredictor.load(path)
+    if not _is_current_export(models_dir, predictor.version, COMPILED_REGRESSOR_FILE, 'export_acs.py'):
+        return None
+    return predictor
+
+
+def load_predictor(models_dir: str, model_format: str = 'auto') -> Optional[BaseSalaryPredictor]:
+    """
+    Loads the salary models in the requested format (one of MODEL_FORMATS), falling back to
+    the joblib pipelines when that format has not been exported. Returns None if nothing is trained.
+    """
+    if model_format not in MODEL_FORMATS:
+        raise ValueError(f"Unknown model format {model_format!r}; expected one of {', '.join(MODEL_FORMATS)}.")
+    if model_format == 'compiled':
+        predictor = load_compiled_salary_predictor(models_dir)
+        if predictor is not None:
+            return predictor
+        print("Warning: Compiled salary models not available, falling back to the xgboost models.")
+    if model_format != 'joblib':
+        predictor = load_native_salary_predictor(models_dir)
+        if predictor is not None:
+            return predictor
+        if model_format == 'native':
+            print("Warning: Native salary models not available, falling back to the joblib models.")
+    return load_salary_predictor(models_dir)
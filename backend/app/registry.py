@@ -0,0 +1,266 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+from .predictor import load_predictor, artifact_fingerprint, BaseSalaryPredictor
+from .prediction_table import load_prediction_table, PredictionTable
+from mappings import (
+    EDUCATION_LEVELS, OCCUPATION_CATEGORIES, WORK_CLASSES, MARITAL_STATUSES, SEXES, RACES,
+    AGE_RANGE, HOURS_RANGE
+)
+
+# Versioned layout: <models_dir>/registry/manifest.json and <models_dir>/registry/<version>/<artifacts>
+REGISTRY_DIR = 'registry'
+MANIFEST_FILE = 'manifest.json'
+
+
+def manifest_path(models_dir: str) -> str:
+    return os.path.join(models_dir, REGISTRY_DIR, MANIFEST_FILE)
+
+
+def read_manifest(models_dir: str) -> Optional[dict]:
+    """Returns the registry manifest, or None if models_dir has no registry yet."""
+    path = manifest_path(models_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(models_dir: str, manifest: dict):
+    """Writes the manifest atomically so readers never see a partial file."""
+    path = manifest_path(models_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def resolve_models_dir(models_dir: str, version: Optional[str] = None) -> Tuple[Optional[str], str]:
+    """
+    Returns (version, directory) holding the artifacts of the requested version, or of the
+    manifest's current version. Without a registry the flat models_dir is used (version None).
+    """
+    manifest = read_manifest(models_dir)
+    if manifest is None:
+        if version is not None:
+            raise ValueError(f"Unknown model version {version!r}: no model registry in {models_dir}.")
+        return None, models_dir
+    version = version or manifest['current']
+    if version not in {entry['version'] for entry in manifest['versions']}:
+        raise ValueError(f"Unknown model version {version!r}.")
+    return version, os.path.join(models_dir, REGISTRY_DIR, version)
+
+
+def publish_version(models_dir: str, paths: List[str], make_current: bool = True, **metadata) -> str:
+    """
+    Copies freshly trained artifacts into a new version directory and records it in the
+    manifest. Running servers pick it up on reload or through the file watcher. Publishing
+    the same artifacts twice within a second gets a -2, -3, ... suffix instead of failing.
+    """
+    created_at = datetime.now(timezone.utc)
+    base_version = f"{created_at:%Y%m%d-%H%M%S}-{artifact_fingerprint(paths)[:8]}"
+    registry_dir = os.path.join(models_dir, REGISTRY_DIR)
+    os.makedirs(registry_dir, exist_ok=True)
+    # Copy into a temporary directory first so a half-copied version is never visible
+    tmp_dir = tempfile.mkdtemp(prefix=base_version + '.', suffix='.tmp', dir=registry_dir)
+    for path in paths:
+        shutil.copy2(path, os.path.join(tmp_dir, os.path.basename(path)))
+    version, attempt = base_version, 1
+    while True:
+        version_dir = os.path.join(registry_dir, version)
+        try:
+            # Unlike os.replace, fails when the target exists (a non-empty directory)
+            os.rename(tmp_dir, version_dir)
+            break
+        except OSError:
+            if not os.path.exists(version_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+            attempt += 1
+            version = f"{base_version}-{attempt}"
+
+    manifest = read_manifest(models_dir) or {'current': None, 'versions': []}
+    manifest['versions'].append({
+        'version': version,
+        'created_at': created_at.isoformat(),
+        'files': sorted(os.path.basename(path) for path in paths),
+        **metadata,
+    })
+    if make_current:
+        manifest['current'] = version
+    write_manifest(models_dir, manifest)
+    print(f"Published model version {version} to {version_dir}.")
+    return version
+
+
+def record_artifacts(models_dir: str, version: Optional[str], paths: List[str]):
+    """Adds derived artifacts (prediction table, compiled export) to a version's manifest entry."""
+    if version is None:
+        return
+    manifest = read_manifest(models_dir)
+    for entry in manifest['versions']:
+        if entry['version'] == version:
+            entry['files'] = sorted(set(entry['files']) | {os.path.basename(path) for path in paths})
+    write_manifest(models_dir, manifest)
+
+
+def warm_up(predictor: BaseSalaryPredictor, batch_size: int = 64):
+    """Runs a synthetic batch through the models so the first real request is not slow."""
+    options = [EDUCATION_LEVELS, MARITAL_STATUSES, SEXES, OCCUPATION_CATEGORIES, WORK_CLASSES, RACES]
+    columns = {
+        'AGEP': [AGE_RANGE[0] + i % (AGE_RANGE[1] - AGE_RANGE[0] + 1) for i in range(batch_size)],
+        'WKHP': [HOURS_RANGE[0] + i % (HOURS_RANGE[1] - HOURS_RANGE[0] + 1) for i in range(batch_size)],
+    }
+    for column, values in zip(['SCHL', 'MAR', 'SEX', 'OCCP', 'COW', 'RAC1P'], options):
+        columns[column] = [values[i % len(values)] for i in range(batch_size)]
+    predictor.predict_columns(columns)
+    predictor.predict_columns({column: values[:1] for column, values in columns.items()})
+
+
+class ModelSnapshot:
+    """Everything one request needs, loaded together and swapped in as a unit."""
+
+    def __init__(self, version: str, models_dir: str, predictor: BaseSalaryPredictor,
+                 table: Optional[PredictionTable], load_seconds: float, warm_up_seconds: float = 0.0):
+        self.version = version
+        self.models_dir = models_dir
+        self.predictor = predictor
+        self.table = table
+        # Reading the artifacts, and running the warm-up batch (included in load_seconds)
+        self.load_seconds = load_seconds
+        self.warm_up_seconds = warm_up_seconds
+        # Only the profile fields the models read (e.g. race is dropped by the preprocessor)
+        self.input_fields = predictor.input_fields
+
+
+class ModelRegistry:
+    """
+    Holds the model snapshot being served. A reload loads and warms up the new version
+    on the calling (or a background) thread, then swaps it in with a single assignment,
+    so in-flight requests keep using the snapshot they started with.
+    """
+
+    def __init__(self, models_dir: str, model_format: str = 'auto',
+                 on_swap: Optional[Callable[[ModelSnapshot], None]] = None, use_table: bool = True):
+        self.models_dir = models_dir
+        # One of predictor.MODEL_FORMATS
+        self.model_format = model_format
+        self.use_table = use_table
+        self.on_swap = on_swap
+        self.current: Optional[ModelSnapshot] = None
+        self.last_error: Optional[str] = None
+        self._reload_lock = threading.Lock()
+        self._manifest_mtime = None
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        # Set in forked workers (app/serve.py): reloads are sent to the parent process
+        self._forward_reload: Optional[Callable[[Optional[str]], None]] = None
+
+    def load_snapshot(self, version: Optional[str] = None) -> Optional[ModelSnapshot]:
+        start = time.perf_counter()
+        registry_version, models_dir = resolve_models_dir(self.models_dir, version)
+        predictor = load_predictor(models_dir, self.model_format)
+        if predictor is None:
+            return None
+        # Precomputed answers for the discrete input space (scripts/build_prediction_table.py)
+        table = load_prediction_table(models_dir, predictor.version) if self.use_table else None
+        warm_up_start = time.perf_counter()
+        warm_up(predictor)
+        end = time.perf_counter()
+        return ModelSnapshot(registry_version or predictor.version, models_dir, predictor, table,
+                             end - start, end - warm_up_start)
+
+    def reload(self, version: Optional[str] = None) -> Optional[ModelSnapshot]:
+        """Loads, warms up and atomically swaps in a version (default: the manifest's current one)."""
+        with self._reload_lock:
+            manifest_mtime = self._read_manifest_mtime()
+            try:
+                snapshot = self.load_snapshot(version)
+            except Exception as e:
+                # Not retried until the manifest changes again
+                self._manifest_mtime = manifest_mtime
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Error: Model reload failed, still serving {self.version}: {self.last_error}")
+                raise
+            self._manifest_mtime = manifest_mtime
+            self.last_error = None
+            if snapshot is None:
+                print("Warning: Salary range prediction models not found. Please train them first.")
+                return None
+            self.current = snapshot
+            if self.on_swap is not None:
+                self.on_swap(snapshot)
+            print(f"Salary range prediction models loaded successfully (version {snapshot.version}, "
+                  f"{type(snapshot.predictor).__name__}, {snapshot.load_seconds:.2f}s "
+                  f"including {snapshot.warm_up_seconds:.2f}s warm-up).")
+            if snapshot.table is not None:
+                print(f"Prediction table loaded with {snapshot.table.size} profiles.")
+            return snapshot
+
+    def reload_in_background(self, version: Optional[str] = None) -> bool:
+        """Starts a reload thread; returns False if a reload is already running."""
+        if self._forward_reload is not None:
+            self._forward_reload(version)
+            return True
+        if self._reload_lock.locked():
+            return False
+
+        def run():
+            try:
+                self.reload(version)
+            except Exception:
+                pass  # Already recorded in last_error; keep serving the current snapshot
+
+        threading.Thread(target=run, name='model-reload', daemon=True).start()
+        return True
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.current.version if self.current is not None else None
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_lock.locked()
+
+    def _read_manifest_mtime(self):
+        try:
+            return os.stat(manifest_path(self.models_dir)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def forward_reloads(self, send: Callable[[Optional[str]], None]):
+        """Hands reloads to send(version) instead of loading here; the manifest is not watched."""
+        self._forward_reload = send
+
+    def manifest_changed(self) -> bool:
+        """True when the manifest changed since the last reload attempt."""
+        return self._read_manifest_mtime() != self._manifest_mtime
+
+    def start_watching(self, interval: float):
+        """Polls the manifest every interval seconds and reloads when it changes."""
+        if self._watcher is not None or self._forward_reload is not None:
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                if self.manifest_changed() and not self.reloading:
+                    print("Model manifest changed, reloading models...")
+                    try:
+                        self.reload()
+                    except Exception:
+                        pass  # Retried on the next manifest change; current snapshot keeps serving
+
+        self._watcher = threading.Thread(target=watch, name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
+        self._watcher = None
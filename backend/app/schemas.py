@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Dict
+from typing import Any, Dict, List, Optional
 
 class UserProfile(BaseModel):
     age: int
@@ -16,12 +16,83 @@ class SalaryRangeResponse(BaseModel):
     median: float
     upper_bound: float
 
+class BatchSalaryRangeRequest(BaseModel):
+    # Items are validated one by one so a bad row does not reject the whole batch
+    profiles: List[Any]
+
+class BatchItemError(BaseModel):
+    loc: List[Any]
+    msg: str
+    type: str
+
+class BatchSalaryRangeItem(BaseModel):
+    index: int
+    prediction: Optional[SalaryRangeResponse] = None
+    errors: Optional[List[BatchItemError]] = None
+
+class BatchSalaryRangeResponse(BaseModel):
+    results: List[BatchSalaryRangeItem]
+    num_succeeded: int
+    num_failed: int
+
+class SalaryTrajectoryRequest(BaseModel):
+    profile: UserProfile
+    # Ages from profile.age up to profile.age + years_ahead
+    years_ahead: int = 10
+    # Hours per week to chart a series for (default: only profile.hours_per_week)
+    hours_per_week: Optional[List[int]] = None
+
+class TrajectoryPoint(BaseModel):
+    age: int
+    lower_bound: float
+    median: float
+    upper_bound: float
+
+class TrajectorySeries(BaseModel):
+    hours_per_week: int
+    points: List[TrajectoryPoint]
+
+class SalaryTrajectoryResponse(BaseModel):
+    ages: List[int]
+    series: List[TrajectorySeries]
+
 class FairnessAnalysisResponse(BaseModel):
     original_prediction: float
     gender_counterfactual: float
     race_counterfactual: float
     gender_gap_percent: float
     race_gap_percent: float
+    # False when the models do not read race: race is then left out of the grid, and the race
+    # counterfactual is the original prediction by construction
+    race_in_model: bool = True
+    # Every sex x race combination: sex -> race -> median prediction / gap vs. the original (%)
+    prediction_matrix: Dict[str, Dict[str, float]]
+    gap_matrix: Dict[str, Dict[str, float]]
+
+class CacheStatsResponse(BaseModel):
+    model_version: Optional[str]
+    size: int
+    max_size: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    hit_rate: float
+
+class ModelStatusResponse(BaseModel):
+    current_version: Optional[str]
+    manifest_version: Optional[str]
+    available_versions: List[str]
+    reloading: bool
+    last_error: Optional[str]
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    model_version: Optional[str]
+    predictor: Optional[str]
+    load_seconds: Optional[float]
+    warm_up_seconds: Optional[float]
 
 class ClassificationResponse(BaseModel):
     salary_class: str
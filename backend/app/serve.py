@@ -0,0 +1,288 @@
+"""
+Multi-worker launcher that shares the loaded models between workers copy-on-write.
+
+The parent process imports the app, which loads and warms up the models, binds the
+listening socket and then forks the workers. Every worker starts with the parent's
+memory, so the boosters, encoders and prediction table are shared until a worker
+writes to them. Run from the backend directory:
+
+    python -m app.serve --workers 4 --port 8000
+
+uvicorn --workers instead starts each worker from scratch, and each one loads its own
+copy of the models.
+
+Model reloads happen in the parent: /admin/reload in any worker, or a manifest change seen
+by the parent when MODEL_WATCH_INTERVAL is set, loads the version once in the parent and then
+replaces the workers one by one with fresh forks. Every worker so serves the same version
+and keeps sharing its memory.
+
+Each worker predicts single-threaded: OMP_NUM_THREADS defaults to 1 because the workers
+already use the cores, and because GNU libgomp does not survive fork() once its thread
+pool exists. Worker threads would hang in the first parallel region. The parent has no
+other threads when it forks (it watches the manifest from its supervision loop, and the
+inference executor starts in the workers).
+"""
+import argparse
+import gc
+import os
+import select
+import signal
+import socket
+import sys
+import time
+
+# Must be set before xgboost is imported
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Listening socket created once in the parent and accepted on by every worker."""
+    # An explicit IPPROTO_TCP makes asyncio set TCP_NODELAY on accepted connections; with
+    # proto 0 small responses wait on Nagle's algorithm and delayed ACKs (~40ms)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+# A worker that exits within WORKER_MIN_UPTIME seconds of starting counts as a crash. Its
+# replacement waits WORKER_RESTART_BACKOFF seconds, doubling per consecutive crash up to
+# WORKER_RESTART_BACKOFF_MAX; after WORKER_MAX_RESTARTS consecutive crashes the server stops.
+WORKER_MIN_UPTIME = float(os.environ.get("WORKER_MIN_UPTIME", "10"))
+WORKER_RESTART_BACKOFF = float(os.environ.get("WORKER_RESTART_BACKOFF", "0.5"))
+WORKER_RESTART_BACKOFF_MAX = float(os.environ.get("WORKER_RESTART_BACKOFF_MAX", "30"))
+WORKER_MAX_RESTARTS = int(os.environ.get("WORKER_MAX_RESTARTS", "5"))
+# Seconds a worker replaced after a reload may take to finish its requests before SIGKILL
+WORKER_SHUTDOWN_TIMEOUT = float(os.environ.get("WORKER_SHUTDOWN_TIMEOUT", "30"))
+
+
+class Supervisor:
+    """
+    Forks the workers, replaces the ones that exit and owns model reloads. Workers send
+    /admin/reload requests up a pipe; the parent loads the new version (it also watches the
+    manifest when MODEL_WATCH_INTERVAL is set), then replaces the workers one at a time with
+    fresh forks, so every worker serves the same version and shares its memory.
+    """
+
+    def __init__(self, app, registry, sock: socket.socket, workers: int, log_level: str,
+                 watch_interval: float = 0):
+        self.app = app
+        self.registry = registry
+        self.sock = sock
+        self.num_workers = workers
+        self.log_level = log_level
+        self.watch_interval = watch_interval
+        self.workers = {}  # pid -> start time
+        self.retiring = set()
+        self.crashes = 0
+        self.pending_spawns = []  # start times of delayed replacements
+        self.stopping = False
+        self.status = 0
+        self.reload_requests = []
+        self._commands = b''
+        self.command_r, self.command_w = os.pipe()
+        # Signals wake up the select() of the supervision loop through this pipe
+        self.wakeup_r, self.wakeup_w = os.pipe()
+        for fd in (self.command_r, self.wakeup_r, self.wakeup_w):
+            os.set_blocking(fd, False)
+
+    def fork_worker(self) -> int:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return pid
+        # Worker: never returns into the parent's supervision loop
+        status = 1
+        try:
+            import uvicorn
+
+            signal.set_wakeup_fd(-1)
+            for fd in (self.command_r, self.wakeup_r, self.wakeup_w):
+                os.close(fd)
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+                signal.signal(signum, signal.SIG_DFL)
+            self.registry.forward_reloads(self.send_reload)
+            uvicorn.Server(uvicorn.Config(self.app, log_level=self.log_level)).run(sockets=[self.sock])
+            status = 0
+        finally:
+            os._exit(status)
+
+    def send_reload(self, version):
+        # Called in a worker; a line shorter than PIPE_BUF is written atomically
+        os.write(self.command_w, f"{version or ''}\n".encode())
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self.workers):
+            self.kill(pid, signal.SIGTERM)
+
+    @staticmethod
+    def kill(pid: int, signum: int):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def worker_exited(self, pid: int, status: int):
+        started = self.workers.pop(pid)
+        if pid in self.retiring:
+            self.retiring.discard(pid)
+            return
+        if self.stopping:
+            return
+        if time.monotonic() - started < WORKER_MIN_UPTIME:
+            self.crashes += 1
+        else:
+            self.crashes = 0
+        if self.crashes > WORKER_MAX_RESTARTS:
+            print(f"Error: workers exited {self.crashes} times in a row within {WORKER_MIN_UPTIME}s "
+                  f"of starting; stopping the server.")
+            self.status = 1
+            self.stop()
+            return
+        delay = min(WORKER_RESTART_BACKOFF * 2 ** (self.crashes - 1), WORKER_RESTART_BACKOFF_MAX) \
+            if self.crashes else 0
+        print(f"Worker {pid} exited with status {status}, starting a replacement in {delay:.1f}s.")
+        self.pending_spawns.append(time.monotonic() + delay)
+
+    def reap(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self.workers:
+                self.worker_exited(pid, status)
+
+    def read_commands(self):
+        try:
+            while True:
+                data = os.read(self.command_r, 4096)
+                if not data:
+                    break
+                self._commands += data
+        except BlockingIOError:
+            pass
+        *lines, self._commands = self._commands.split(b'\n')
+        self.reload_requests.extend(line.decode() or None for line in lines)
+
+    def reload(self, version=None):
+        """Loads the version in the parent, then replaces every worker with a fresh fork of it."""
+        try:
+            snapshot = self.registry.reload(version)
+        except Exception:
+            return  # Already recorded and printed; the workers keep serving the current version
+        if snapshot is None:
+            return
+        gc.collect()
+        gc.freeze()
+        old_pids = list(self.workers)
+        for i, pid in enumerate(old_pids):
+            if self.stopping:
+                print(f"Server stopping: {len(old_pids) - i} worker(s) still on the previous model "
+                      f"version were not replaced.")
+                return
+            if pid not in self.workers:
+                continue  # Exited meanwhile; its pending replacement forks the new version
+            # Start the replacement first so the socket is never left with one worker fewer
+            self.fork_worker()
+            self.retire(pid)
+        print(f"All workers now serve model version {snapshot.version}.")
+
+    def retire(self, pid: int):
+        self.retiring.add(pid)
+        self.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + WORKER_SHUTDOWN_TIMEOUT
+        while pid in self.workers:
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, 0
+            if done:
+                self.worker_exited(pid, status)
+                break
+            if time.monotonic() > deadline:
+                self.kill(pid, signal.SIGKILL)
+            time.sleep(0.05)
+
+    def run(self) -> int:
+        for _ in range(self.num_workers):
+            self.fork_worker()
+        print(f"Serving with {self.num_workers} forked workers: {sorted(self.workers)}")
+        signal.set_wakeup_fd(self.wakeup_w)
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        # Only there to interrupt select() through the wakeup pipe when a worker exits
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        next_watch = time.monotonic() + self.watch_interval
+        while not self.stopping:
+            now = time.monotonic()
+            deadlines = self.pending_spawns + ([next_watch] if self.watch_interval > 0 else [])
+            timeout = max(0.0, min(deadlines) - now) if deadlines else None
+            select.select([self.wakeup_r, self.command_r], [], [], timeout)
+            try:
+                while os.read(self.wakeup_r, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+            self.reap()
+            if self.stopping:
+                break
+            now = time.monotonic()
+            for due in [due for due in self.pending_spawns if due <= now]:
+                self.pending_spawns.remove(due)
+                self.fork_worker()
+            self.read_commands()
+            if self.watch_interval > 0 and now >= next_watch:
+                next_watch = now + self.watch_interval
+                if self.registry.manifest_changed():
+                    print("Model manifest changed, reloading models...")
+                    self.reload_requests.append(None)
+            if self.reload_requests:
+                # Requests that queued up while busy lead to one reload, of the last one's version
+                version = self.reload_requests[-1]
+                self.reload_requests.clear()
+                self.reload(version)
+        while self.workers:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            self.workers.pop(pid, None)
+        return self.status
+
+
+def serve(host: str = '127.0.0.1', port: int = 8000, workers: int = 4, log_level: str = 'info') -> int:
+    from .main import app, registry, MODEL_WATCH_INTERVAL
+
+    if registry.current is None:
+        print("Warning: no models loaded; workers will answer 503 until a reload succeeds.")
+    sock = bind_socket(host, port)
+
+    # Everything allocated so far lives for the whole process. Frozen objects are skipped by
+    # the garbage collector, which would otherwise write to their headers in every worker
+    # and so copy the pages holding them.
+    gc.collect()
+    gc.freeze()
+
+    print(f"Listening on http://{host}:{port}")
+    try:
+        return Supervisor(app, registry, sock, workers, log_level, MODEL_WATCH_INTERVAL).run()
+    finally:
+        sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the API from forked workers sharing the models.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+    if sys.platform == 'win32':
+        sys.exit("The forking launcher needs a POSIX system; use uvicorn --workers instead.")
+    sys.exit(serve(args.host, args.port, args.workers, args.log_level))
@@ -0,0 +1,120 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from starlette.responses import Response
+
+# (line index, raw line) pairs handed to the batch handler
+LineBatch = List[Tuple[int, bytes]]
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+class NDJSONStreamingResponse(Response):
+    """
+    Reads newline-delimited JSON from the request body and streams one output line per input
+    line back while the body is still arriving. Input lines are grouped into batches of up to
+    batch_size and handed to handle_batch, which returns the encoded output lines.
+
+    Both directions are bounded. At most max_pending_batches parsed batches wait for the
+    handler: when they are full the body is not read further, so the client's sends block
+    through TCP flow control. Output is written with send(), which waits while the client is
+    not reading. A partial batch is flushed whenever the handler is idle, so interactive
+    clients get answers without waiting for a full batch. A line longer than max_line_bytes
+    ends the stream with an {"error": ...} line, after the answers to the lines before it.
+
+    The response reads the body itself. Starlette's StreamingResponse would consume the
+    body messages while listening for a disconnect.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, handle_batch: Callable[[LineBatch], Awaitable[List[bytes]]], batch_size: int = 256,
+                 max_pending_batches: int = 4, max_line_bytes: int = 65536, headers: Optional[dict] = None):
+        # As StreamingResponse: no body attribute, so no Content-Length header
+        self.status_code = 200
+        self.background = None
+        self.init_headers(headers)
+        self.handle_batch = handle_batch
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches
+        self.max_line_bytes = max_line_bytes
+
+    async def _read_lines(self, receive, queue: asyncio.Queue):
+        buffer = b''
+        batch: LineBatch = []
+        index = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise ClientDisconnected()
+            buffer += message.get('body', b'')
+            more_body = message.get('more_body', False)
+            lines = buffer.split(b'\n')
+            buffer = lines.pop()
+            if not more_body:
+                lines.append(buffer)
+                buffer = b''
+            for line in lines:
+                if not line.strip():
+                    continue
+                if len(line) > self.max_line_bytes:
+                    break
+                batch.append((index, line))
+                index += 1
+                if len(batch) == self.batch_size:
+                    await queue.put(batch)
+                    batch = []
+            else:
+                line = buffer
+            if len(line) > self.max_line_bytes:
+                # The lines before it are answered first, then the stream ends with the error
+                if batch:
+                    await queue.put(batch)
+                raise ValueError(f"Line {index} is longer than {self.max_line_bytes} bytes.")
+            if batch and queue.empty():
+                await queue.put(batch)
+                batch = []
+        if batch:
+            await queue.put(batch)
+        await queue.put(None)
+
+    async def _next_batch(self, queue: asyncio.Queue, reader: asyncio.Task) -> Optional[LineBatch]:
+        """The next parsed batch, None at the end of the body; raises what the reader raised."""
+        while not reader.done():
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait([getter, reader], return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                return getter.result()
+            getter.cancel()
+        # Batches queued before the reader failed are still answered
+        if not queue.empty():
+            return queue.get_nowait()
+        reader.result()
+        # The reader finished cleanly: everything up to the final None is already queued
+        return await queue.get()
+
+    async def __call__(self, scope, receive, send):
+        queue: asyncio.Queue = asyncio.Queue(self.max_pending_batches)
+        reader = asyncio.create_task(self._read_lines(receive, queue))
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        try:
+            while True:
+                try:
+                    batch = await self._next_batch(queue, reader)
+                except ClientDisconnected:
+                    return
+                except ValueError as e:
+                    error = json.dumps({'error': str(e)}).encode() + b'\n'
+                    await send({'type': 'http.response.body', 'body': error, 'more_body': True})
+                    break
+                if batch is None:
+                    break
+                lines = await self.handle_batch(batch)
+                await send({'type': 'http.response.body', 'body': b''.join(lines), 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            reader.cancel()
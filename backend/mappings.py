@@ -1,4 +1,5 @@
 # backend/mappings.py
+import numpy as np
 
 EDUCATION_MAP = {
     24: "Doctorate",
@@ -34,3 +35,70 @@ def map_occupation(occp_code):
         if start <= occp_code <= end:
             return category
     return "Other"
+
+class IntervalMapping:
+    """
+    Vectorized version of a scalar code -> category function defined by (possibly overlapping)
+    inclusive ranges. The real line is split at every range bound into a sorted, non-overlapping
+    partition: the bound points themselves and the open gaps between them. Each piece gets the
+    category the scalar function returns for it, so first-match semantics carry over exactly.
+    Lookup is a binary search over the bounds plus a table lookup, for a whole array at once.
+    """
+
+    def __init__(self, bounds, scalar_map, categories):
+        self.points = np.unique(np.asarray(bounds, dtype=np.float64))
+        self.categories = list(categories)
+        # Gap i lies below points[i]; the last gap (also used for NaN) lies above every point
+        gap_values = np.concatenate([[self.points[0] - 1],
+                                     (self.points[:-1] + self.points[1:]) / 2,
+                                     [self.points[-1] + 1]])
+        index = {category: code for code, category in enumerate(self.categories)}
+        self.point_codes = np.array([index[scalar_map(value)] for value in self.points], dtype=np.int8)
+        self.gap_codes = np.array([index[scalar_map(value)] for value in gap_values], dtype=np.int8)
+
+    def codes(self, values) -> np.ndarray:
+        """Category codes (positions in self.categories) for an array of codes."""
+        values = np.asarray(values, dtype=np.float64)
+        positions = np.searchsorted(self.points, values)
+        is_point = self.points[np.minimum(positions, len(self.points) - 1)] == values
+        return np.where(is_point, self.point_codes[np.minimum(positions, len(self.points) - 1)],
+                        self.gap_codes[positions])
+
+    def __call__(self, values):
+        """Maps a Series (keeping its index) or an array of codes to categorical output."""
+        import pandas as pd
+
+        categorical = pd.Categorical.from_codes(self.codes(values), categories=self.categories)
+        if isinstance(values, pd.Series):
+            return pd.Series(categorical, index=values.index, name=values.name)
+        return categorical
+
+# --- Serving Vocabulary ---
+# Values offered for each UserProfile field (kept in sync with frontend/src/data/options.js)
+EDUCATION_LEVELS = ["Less than HS", "High School/Some College", "Bachelors", "Masters", "Doctorate"]
+OCCUPATION_CATEGORIES = [
+    "Management & Business", "Tech & Engineering", "Healthcare",
+    "Sales & Office", "Service & Blue Collar", "Other",
+]
+WORK_CLASSES = ["Private", "Self-emp-not-inc", "Self-emp-inc", "Federal-gov", "Local-gov", "State-gov"]
+MARITAL_STATUSES = ["Married-civ-spouse", "Divorced", "Never-married", "Separated", "Widowed"]
+SEXES = ["Female", "Male"]
+RACES = ["White", "Black", "Asian-Pac-Islander", "Amer-Indian-Eskimo", "Other"]
+
+# Inclusive integer ranges covered by ACS AGEP (working age) and WKHP
+AGE_RANGE = (16, 99)
+HOURS_RANGE = (1, 99)
+
+# --- Vectorized Mappings ---
+# Same results as map_education / map_occupation, for whole Series or arrays of codes
+education_mapping = IntervalMapping([16] + list(EDUCATION_MAP), map_education, EDUCATION_LEVELS + ["Other"])
+occupation_mapping = IntervalMapping([bound for bounds in OCCUPATION_MAP for bound in bounds],
+                                     map_occupation, OCCUPATION_CATEGORIES)
+
+def map_education_codes(schl_codes):
+    """Vectorized map_education: SCHL codes (Series or array) -> categorical education levels."""
+    return education_mapping(schl_codes)
+
+def map_occupation_codes(occp_codes):
+    """Vectorized map_occupation: OCCP codes (Series or array) -> categorical occupation categories."""
+    return occupation_mapping(occp_codes)
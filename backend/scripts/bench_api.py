@@ -0,0 +1,253 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+import numpy as np
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sample_profiles import random_profiles
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BASELINE_PATH = os.path.join(BACKEND_DIR, 'benchmarks', 'api_baseline.json')
+
+ENDPOINTS = {
+    'predict_salary_range': '/predict_salary_range',
+    'analyze_fairness': '/analyze_fairness',
+}
+# Relative change in a latency percentile or in throughput reported as a regression
+REGRESSION_TOLERANCE = 0.10
+
+
+def rss_mb(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def child_pids(pid):
+    children = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as f:
+            children.extend(int(child) for child in f.read().split())
+    return children
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@asynccontextmanager
+async def in_process_client(env):
+    """Client calling the app through its ASGI interface, in this process."""
+    import httpx
+
+    os.environ.update(env)
+    import app.main as main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        yield client, [os.getpid()], type(main.registry.current.predictor).__name__
+
+
+@asynccontextmanager
+async def uvicorn_client(env, workers):
+    """Client calling a local uvicorn server started in a subprocess with the given workers."""
+    import httpx
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=dict(os.environ, **env))
+    try:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + 120
+            while True:
+                try:
+                    response = await client.get('/ready')
+                    if response.status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not become ready.")
+                await asyncio.sleep(0.2)
+            # Each worker loads the models itself; wait until all of them answer
+            await asyncio.sleep(1 if workers > 1 else 0)
+            predictor = response.json()['predictor']
+            yield client, (child_pids(server.pid) if workers > 1 else [server.pid]), predictor
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def run_load(client, path, profiles, concurrency, num_requests):
+    """Sends num_requests requests from concurrency concurrent senders; returns latencies and errors."""
+    latencies = np.empty(num_requests)
+    errors = 0
+    next_request = 0
+
+    async def sender():
+        nonlocal next_request, errors
+        while next_request < num_requests:
+            i = next_request
+            next_request += 1
+            start = time.perf_counter()
+            response = await client.post(path, json=profiles[i % len(profiles)])
+            latencies[i] = time.perf_counter() - start
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = latencies * 1000
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'mean_ms': float(latencies.mean()),
+        'throughput_rps': len(latencies) / elapsed,
+    }
+
+
+async def benchmark(mode='inprocess', endpoints=tuple(ENDPOINTS), concurrency_levels=(1, 8, 32),
+                    num_requests=2000, warmup=200, workers=1, env=None, seed=0):
+    """Runs every endpoint at every concurrency level and returns the results document."""
+    env = env or {}
+    profiles = random_profiles(max(num_requests, warmup), seed)
+    client_context = in_process_client(env) if mode == 'inprocess' else uvicorn_client(env, workers)
+    results = {}
+    async with client_context as (client, pids, predictor):
+        memory_before = {pid: rss_mb(pid) for pid in pids}
+        for endpoint in endpoints:
+            path = ENDPOINTS[endpoint]
+            await run_load(client, path, profiles, max(concurrency_levels), warmup)
+            results[endpoint] = {}
+            for concurrency in concurrency_levels:
+                stats = summarize(*await run_load(client, path, profiles, concurrency, num_requests))
+                results[endpoint][str(concurrency)] = stats
+                print(f"{endpoint:>22} c={concurrency:<3} p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms "
+                      f"p99={stats['p99_ms']:.2f}ms {stats['throughput_rps']:.0f} req/s"
+                      + (f" ({stats['errors']} errors)" if stats['errors'] else ""))
+        memory_after = {pid: rss_mb(pid) for pid in pids}
+
+    memory = {
+        'workers': len(pids),
+        'rss_mb_per_worker': [memory_after[pid] for pid in pids],
+        'rss_mb_mean': float(np.mean(list(memory_after.values()))),
+        'rss_mb_growth': float(np.mean([memory_after[pid] - memory_before[pid] for pid in pids])),
+    }
+    print(f"Memory: {memory['rss_mb_mean']:.0f} MB per {'process' if mode == 'inprocess' else 'worker'} "
+          f"({memory['rss_mb_growth']:+.0f} MB during the run), {len(pids)} worker(s)")
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'mode': mode,
+            'workers': workers,
+            'predictor': predictor,
+            'env': env,
+            'requests': num_requests,
+            'seed': seed,
+        },
+        'results': results,
+        'memory': memory,
+    }
+
+
+def compare(report, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Prints the change against the baseline for each endpoint and concurrency; returns the regressions."""
+    regressions = []
+    print(f"\nCompared with baseline {baseline['meta'].get('commit')} ({baseline['meta'].get('created_at')}):")
+    for key in ('mode', 'workers', 'predictor', 'env', 'requests', 'cpu_count'):
+        if baseline['meta'].get(key) != report['meta'][key]:
+            print(f"Warning: baseline {key} {baseline['meta'].get(key)!r} differs from {report['meta'][key]!r}")
+    for endpoint, levels in report['results'].items():
+        for concurrency, stats in levels.items():
+            base = baseline['results'].get(endpoint, {}).get(concurrency)
+            if base is None:
+                continue
+            changes = []
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps'):
+                change = stats[key] / base[key] - 1
+                changes.append(f"{key[:-3] if key.endswith('_ms') else 'throughput'} {change:+.1%}")
+                worse = change < -tolerance if key == 'throughput_rps' else change > tolerance
+                if worse:
+                    regressions.append((endpoint, concurrency, key, base[key], stats[key]))
+            print(f"{endpoint:>22} c={concurrency:<3} " + ', '.join(changes))
+    for endpoint, concurrency, key, before, after in regressions:
+        print(f"Regression: {endpoint} c={concurrency} {key} {before:.2f} -> {after:.2f}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark API latency, throughput and memory.")
+    parser.add_argument('--mode', choices=['inprocess', 'uvicorn'], default='inprocess',
+                        help="Call the app through ASGI in this process, or a local uvicorn server.")
+    parser.add_argument('--workers', type=int, default=1, help="uvicorn workers (uvicorn mode).")
+    parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=2000, help="Requests per endpoint and concurrency level.")
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--model-format', default=None, help="MODEL_FORMAT for the app (default: its own).")
+    parser.add_argument('--no-cache', action='store_true', help="Disable the prediction cache.")
+    parser.add_argument('--no-table', action='store_true', help="Do not answer from the prediction table.")
+    parser.add_argument('--output', default=None, help="Write the results as JSON to this file.")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline results to compare with.")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the baseline.")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on a regression.")
+    args = parser.parse_args()
+
+    env = {'MODEL_WATCH_INTERVAL': '0'}
+    if args.model_format:
+        env['MODEL_FORMAT'] = args.model_format
+    if args.no_cache:
+        env['PREDICTION_CACHE_SIZE'] = '0'
+    if args.no_table:
+        env['USE_PREDICTION_TABLE'] = '0'
+    report = asyncio.run(benchmark(args.mode, args.endpoints, args.concurrency, args.requests, args.warmup,
+                                   args.workers, env, args.seed))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    regressions = []
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
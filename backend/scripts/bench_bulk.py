@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+import pyarrow as pa
+from bench_api import in_process_client
+from sample_profiles import random_profiles
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+FORMATS = ['json', 'arrow', 'msgpack']
+
+
+def encode_request(fmt, profiles):
+    """Request body as a client would build it from the same list of profile dicts."""
+    if fmt == 'json':
+        return json.dumps({'profiles': profiles}).encode(), 'application/json'
+    columns = {field: [p[field] for p in profiles] for field in profiles[0]}
+    if fmt == 'arrow':
+        table = pa.table(columns)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW_MEDIA_TYPE
+    import msgpack
+
+    return msgpack.packb(columns), MSGPACK_MEDIA_TYPE
+
+
+def decode_medians(fmt, content):
+    if fmt == 'json':
+        return np.array([(item.get('prediction') or {}).get('median', np.nan)
+                         for item in json.loads(content)['results']])
+    if fmt == 'arrow':
+        return pa.ipc.open_stream(content).read_all().column('median').to_numpy(zero_copy_only=False)
+    import msgpack
+
+    return np.array(msgpack.unpackb(content)['median'], dtype=np.float64)
+
+
+async def measure(client, fmt, profiles):
+    start = time.perf_counter()
+    body, content_type = encode_request(fmt, profiles)
+    encoded = time.perf_counter()
+    path = '/predict_salary_range/batch' if fmt == 'json' else '/predict_salary_range/bulk'
+    response = await client.post(path, content=body, headers={'content-type': content_type})
+    response.raise_for_status()
+    answered = time.perf_counter()
+    medians = decode_medians(fmt, response.content)
+    decoded = time.perf_counter()
+    return {
+        'format': fmt, 'rows': len(profiles),
+        'request_mb': len(body) / 1e6, 'response_mb': len(response.content) / 1e6,
+        'client_encode_s': encoded - start, 'server_s': answered - encoded, 'client_decode_s': decoded - answered,
+        'total_s': decoded - start, 'rows_per_second': len(profiles) / (decoded - start),
+    }, medians
+
+
+async def benchmark(sizes, formats, use_table, repeat):
+    # The JSON batch endpoint is capped at MAX_BATCH_SIZE; lift the cap to compare equal batches
+    env = {'PREDICTION_CACHE_SIZE': '0', 'USE_PREDICTION_TABLE': '1' if use_table else '0',
+           'MAX_BATCH_SIZE': str(max(sizes)), 'BULK_MAX_ROWS': str(max(sizes))}
+    results = []
+    async with in_process_client(env) as (client, _, predictor):
+        print(f"{predictor}, prediction table {'on' if use_table else 'off'}, in-process ASGI client")
+        for n in sizes:
+            profiles = random_profiles(n, seed=n)
+            reference = None
+            for fmt in formats:
+                runs = []
+                for _ in range(repeat):
+                    result, medians = await measure(client, fmt, profiles)
+                    runs.append(result)
+                result = min(runs, key=lambda r: r['total_s'])
+                if reference is None:
+                    reference = medians
+                elif not np.array_equal(reference, medians):
+                    raise AssertionError(f"{fmt} results differ from {formats[0]} for {n} rows.")
+                results.append(result)
+                print(f"{n:>8} rows {fmt:>8}: {result['total_s'] * 1000:9.1f}ms total "
+                      f"(encode {result['client_encode_s'] * 1000:7.1f}, server {result['server_s'] * 1000:8.1f}, "
+                      f"decode {result['client_decode_s'] * 1000:7.1f}), {result['rows_per_second']:>10,.0f} rows/s, "
+                      f"{result['request_mb']:6.1f} MB in / {result['response_mb']:6.1f} MB out")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the JSON batch endpoint with the columnar bulk "
+                                                 "endpoint (Arrow IPC and MessagePack) for growing batch sizes.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS)
+    parser.add_argument('--no-table', action='store_true',
+                        help="Serve every row from the models instead of the prediction table.")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size and format; the fastest is kept.")
+    parser.add_argument('--output', default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+    results = asyncio.run(benchmark(args.sizes, args.formats, not args.no_table, args.repeat))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
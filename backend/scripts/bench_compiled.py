@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.registry import resolve_models_dir
+from app.predictor import load_salary_predictor, load_compiled_salary_predictor
+from sample_profiles import random_profile_columns
+from bench_utils import time_calls, format_latency
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+
+def benchmark_compiled(repeat=2000):
+    """Single-request and small-batch latency of the xgboost booster vs. the exported NumPy predictor."""
+    _, models_dir = resolve_models_dir(MODELS_DIR)
+    predictor = load_salary_predictor(models_dir)
+    compiled = load_compiled_salary_predictor(models_dir)
+    if predictor is None or compiled is None:
+        sys.exit("Train the models and run export_acs.py first.")
+
+    for batch_size in (1, 11, 100):
+        columns = random_profile_columns(batch_size, seed=1)
+        booster_latency = time_calls(lambda: predictor.predict_columns(columns), repeat)
+        compiled_latency = time_calls(lambda: compiled.predict_columns(columns), repeat)
+        print(f"\n--- Batch size {batch_size} ---")
+        print(format_latency("xgboost booster", booster_latency))
+        print(format_latency("Compiled NumPy forest", compiled_latency))
+
+if __name__ == "__main__":
+    benchmark_compiled()
@@ -0,0 +1,54 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.registry import resolve_models_dir
+from app.predictor import load_salary_predictor
+from bench_utils import time_calls, format_latency
+from sample_profiles import random_profile_columns
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+
+def verify_native_encoder(predictor, n=20_000, single_rows=500):
+    """
+    Checks that the native encoder + in-place predict path returns exactly the same
+    float32 values as Pipeline.predict, for a large batch and for single rows.
+    """
+    columns = random_profile_columns(n)
+    expected = predictor.predict_ranges(pd.DataFrame(columns))
+    actual = predictor.predict_columns(columns)
+    batch_ok = np.array_equal(expected, actual)
+
+    single_ok = True
+    for i in range(single_rows):
+        row = {column: values[i:i + 1] for column, values in columns.items()}
+        if not np.array_equal(predictor.predict_ranges(pd.DataFrame(row)), predictor.predict_columns(row)):
+            single_ok = False
+            break
+
+    print(f"Batch of {n} rows bit-for-bit identical: {batch_ok}")
+    print(f"{single_rows} single rows bit-for-bit identical: {single_ok}")
+    return batch_ok and single_ok
+
+def benchmark_native_encoder(predictor, repeat=1000):
+    """Compares single-request latency of the pandas/sklearn pipeline and the native path."""
+    row = {column: values[:1] for column, values in random_profile_columns(1, seed=1).items()}
+    pipeline_latency = time_calls(lambda: predictor.predict_ranges(pd.DataFrame(row)), repeat)
+    native_latency = time_calls(lambda: predictor.predict_columns(row), repeat)
+    print(format_latency("Pipeline.predict (pandas + ColumnTransformer)", pipeline_latency))
+    print(format_latency("Native encoder + inplace_predict", native_latency))
+    print(f"Speed-up at p50: {pipeline_latency['p50_ms'] / native_latency['p50_ms']:.1f}x")
+
+if __name__ == "__main__":
+    _, models_dir = resolve_models_dir(MODELS_DIR)
+    predictor = load_salary_predictor(models_dir)
+    if predictor is None:
+        sys.exit("No salary models found. Please train them first.")
+    ok = verify_native_encoder(predictor)
+    benchmark_native_encoder(predictor)
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from ingest import acs_partition_files
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Each measurement runs in a fresh process so peak memory is not carried over
+EXTERNAL_PROBE = """
+import json, sys
+from train_acs import train_and_save_quantile_regressors_external
+result = train_and_save_quantile_regressors_external(sys.argv[1], sys.argv[2].split(','), multi_quantile=True,
+                                                     publish=False)
+print(json.dumps(result))
+"""
+IN_MEMORY_PROBE = """
+import json, resource, sys, time
+from ingest import load_acs_partitions
+from train_acs import train_and_save_multi_quantile_regressor
+start = time.perf_counter()
+X, y = load_acs_partitions(sys.argv[1], sys.argv[2].split(','))
+train_and_save_multi_quantile_regressor(X, y, publish=False)
+print(json.dumps({'rows': len(X), 'seconds': time.perf_counter() - start,
+                  'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+def partition_states(partitions_dir):
+    states = set()
+    for path in acs_partition_files(partitions_dir):
+        states.update(part[len('state='):] for part in path.split(os.sep) if part.startswith('state='))
+    return sorted(states)
+
+def run_probe(probe, partitions_dir, states):
+    result = subprocess.run([sys.executable, '-c', probe, partitions_dir, ','.join(states)], cwd=SCRIPTS_DIR,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def compare_memory_scaling(partitions_dir, state_counts):
+    """Peak memory and time of in-memory vs. external-memory training as more states are added."""
+    states = partition_states(partitions_dir)
+    for count in state_counts:
+        if count > len(states):
+            break
+        selected = states[:count]
+        in_memory = run_probe(IN_MEMORY_PROBE, partitions_dir, selected)
+        external = run_probe(EXTERNAL_PROBE, partitions_dir, selected)
+        print(f"{count} states ({external['rows']} rows): "
+              f"in-memory {in_memory['peak_rss_mb']:.0f} MB / {in_memory['seconds']:.1f}s, "
+              f"external memory {external['peak_rss_mb']:.0f} MB / {external['seconds']:.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare peak memory of in-memory and external-memory training.")
+    parser.add_argument('partitions', help="Partitioned ACS data written by ingest.py.")
+    parser.add_argument('--state-counts', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    compare_memory_scaling(os.path.abspath(args.partitions), args.state_counts)
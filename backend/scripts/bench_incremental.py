@@ -0,0 +1,92 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from xgboost import XGBRegressor
+from ingest import load_acs_data, load_acs_partitions
+from train_acs import (
+    build_preprocessor, continue_quantile_boosters, predict_quantile_boosters, quantile_scores,
+    QUANTILES, XGB_PARAMS, INCREMENTAL_ROUNDS
+)
+
+def fit_quantile_pipelines(X, y, multi_quantile):
+    """Fits the served model layout in memory, without writing artifacts."""
+    alphas = [QUANTILES] if multi_quantile else QUANTILES
+    pipelines = []
+    for alpha in alphas:
+        model = XGBRegressor(objective='reg:quantileerror', quantile_alpha=alpha, **XGB_PARAMS)
+        pipelines.append(Pipeline(steps=[('preprocessor', build_preprocessor()), ('regressor', model)]).fit(X, y))
+    return pipelines
+
+def pipeline_ranges(pipelines, X):
+    outputs = [pipeline.predict(X) for pipeline in pipelines]
+    if len(outputs) == 1:
+        return np.asarray(outputs[0]).reshape(-1, len(QUANTILES))
+    return np.column_stack(outputs)
+
+def compare_incremental_with_full_retrain(X_base, y_base, X_new, y_new, rounds=INCREMENTAL_ROUNDS,
+                                          multi_quantile=False, test_share=0.2, seed=0):
+    """
+    Starts from models fitted on the base data, then adds the new data two ways: an incremental
+    update (rounds more trees fitted to the new rows) and a full retrain on base + new rows.
+    Compares the wall clock of both and their scores on held-out base and new rows.
+    """
+    rng = np.random.default_rng(seed)
+    base_test = rng.random(len(X_base)) < test_share
+    new_test = rng.random(len(X_new)) < test_share
+    X_base_train, y_base_train = X_base[~base_test], y_base[~base_test]
+    X_new_train, y_new_train = X_new[~new_test], y_new[~new_test]
+    test_sets = {'base': (X_base[base_test], y_base[base_test]), 'new': (X_new[new_test], y_new[new_test])}
+
+    print(f"Fitting the base models on {len(X_base_train)} rows...")
+    base = fit_quantile_pipelines(X_base_train, y_base_train, multi_quantile)
+
+    print(f"Incremental update with {len(X_new_train)} new rows...")
+    start = time.perf_counter()
+    preprocessor, boosters, rounds = continue_quantile_boosters(base, X_new_train, y_new_train, rounds)
+    incremental_s = time.perf_counter() - start
+
+    print(f"Full retrain on {len(X_base_train) + len(X_new_train)} rows...")
+    start = time.perf_counter()
+    full = fit_quantile_pipelines(pd.concat([X_base_train, X_new_train]), pd.concat([y_base_train, y_new_train]),
+                                  multi_quantile)
+    full_s = time.perf_counter() - start
+
+    print(f"\n=== Incremental update ({rounds} rounds) vs. full retrain ===")
+    print(f"Wall clock: {incremental_s:.1f}s vs {full_s:.1f}s ({full_s / incremental_s:.1f}x faster)")
+    results = {'incremental_seconds': incremental_s, 'full_retrain_seconds': full_s, 'rounds_added': rounds}
+    for name, (X_test, y_test) in test_sets.items():
+        scores = {
+            'base model': quantile_scores(y_test, pipeline_ranges(base, X_test)),
+            'incremental': quantile_scores(y_test, predict_quantile_boosters(preprocessor, boosters, X_test)),
+            'full retrain': quantile_scores(y_test, pipeline_ranges(full, X_test)),
+        }
+        print(f"\nHeld-out {name} rows ({len(X_test)}):")
+        print(f"{'':>14}" + ''.join(f"{metric:>16}" for metric in scores['base model']))
+        for model, values in scores.items():
+            print(f"{model:>14}" + ''.join(f"{value:>16.4f}" for value in values.values()))
+        drift = {metric: scores['incremental'][metric] - scores['full retrain'][metric]
+                 for metric in scores['full retrain']}
+        print(f"{'drift':>14}" + ''.join(f"{value:>+16.4f}" for value in drift.values()))
+        results[name] = {**scores, 'drift': drift}
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare an incremental model update with a full retrain.")
+    parser.add_argument('--partitions', default=None,
+                        help="Partitioned ACS data (ingest.py); without it the default ACS data is split in half.")
+    parser.add_argument('--base-states', nargs='+', default=None, help="With --partitions, the base data.")
+    parser.add_argument('--new-states', nargs='+', default=None, help="With --partitions, the new data.")
+    parser.add_argument('--rounds', type=int, default=INCREMENTAL_ROUNDS)
+    parser.add_argument('--multi-quantile', action='store_true')
+    args = parser.parse_args()
+
+    if args.partitions:
+        X_base, y_base = load_acs_partitions(args.partitions, args.base_states)
+        X_new, y_new = load_acs_partitions(args.partitions, args.new_states)
+    else:
+        X, y = load_acs_data()
+        new = np.random.default_rng(1).random(len(X)) < 0.5
+        X_base, y_base, X_new, y_new = X[~new], y[~new], X[new], y[new]
+    compare_incremental_with_full_retrain(X_base, y_base, X_new, y_new, args.rounds, args.multi_quantile)
@@ -0,0 +1,26 @@
+import argparse
+import time
+from ingest import load_raw_acs_data, load_raw_uci_data
+
+def time_load(load, **kwargs):
+    start = time.perf_counter()
+    load(**kwargs)
+    return time.perf_counter() - start
+
+def benchmark_dataset_cache(offline=False):
+    """
+    Times a cold load (survey CSV parse / UCI fetch, then cache write) and a warm load
+    (Parquet read) of each dataset. Offline skips the cold loads, which could hit the network.
+    """
+    for name, load in [('ACS', load_raw_acs_data), ('UCI Adult', load_raw_uci_data)]:
+        cold = None if offline else time_load(load, refresh=True)
+        warm = time_load(load, offline=True)
+        cold_text = 'skipped (offline)' if cold is None else f"{cold:.2f}s"
+        speedup = '' if cold is None else f" ({cold / warm:.0f}x faster)"
+        print(f"{name}: cold load {cold_text}, warm load {warm:.2f}s{speedup}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare cold and warm dataset load times.")
+    parser.add_argument('--offline', action='store_true', help="Only time warm loads from the existing cache.")
+    args = parser.parse_args()
+    benchmark_dataset_cache(args.offline)
@@ -0,0 +1,51 @@
+import os
+import joblib
+import numpy as np
+from ingest import load_acs_data
+from bench_utils import time_calls, format_latency
+from train_acs import (
+    train_and_save_quantile_regressors, train_and_save_multi_quantile_regressor,
+    LOW_MODEL_PATH, MID_MODEL_PATH, HIGH_MODEL_PATH, QUANTILES_MODEL_PATH
+)
+
+def compare_quantile_models(repeat=1000):
+    """
+    Trains the three-model and the multi-quantile setups on the same data and compares
+    training time, artifact size, and single-request prediction latency.
+    """
+    print("Loading ACS data...")
+    X, y = load_acs_data()
+
+    print("\n--- Three separate quantile models ---")
+    three_train_s = train_and_save_quantile_regressors(X, y, publish=False)
+    print("\n--- Single multi-quantile model ---")
+    multi_train_s = train_and_save_multi_quantile_regressor(X, y, publish=False)
+
+    three_paths = [LOW_MODEL_PATH, MID_MODEL_PATH, HIGH_MODEL_PATH]
+    three_size = sum(os.path.getsize(path) for path in three_paths)
+    multi_size = os.path.getsize(QUANTILES_MODEL_PATH)
+
+    low, mid, high = (joblib.load(path) for path in three_paths)
+    multi = joblib.load(QUANTILES_MODEL_PATH)
+
+    # One request = one row, as the API scored it before the native encoder
+    row = X.iloc[[0]]
+    three_latency = time_calls(
+        lambda: np.column_stack([low.predict(row), mid.predict(row), high.predict(row)]), repeat)
+    multi_latency = time_calls(lambda: multi.predict(row), repeat)
+
+    # Sanity check: both setups estimate the same quantiles
+    sample = X.iloc[:1000]
+    three_pred = np.column_stack([low.predict(sample), mid.predict(sample), high.predict(sample)])
+    multi_pred = multi.predict(sample)
+    mean_abs_diff = np.abs(three_pred - multi_pred).mean(axis=0)
+
+    print("\n=== Three models vs. one multi-quantile model ===")
+    print(f"Training time: {three_train_s:.1f}s vs {multi_train_s:.1f}s")
+    print(f"Artifact size: {three_size / 1024:.0f} KiB vs {multi_size / 1024:.0f} KiB")
+    print(format_latency("Per-request latency (three models)", three_latency))
+    print(format_latency("Per-request latency (multi-quantile)", multi_latency))
+    print(f"Mean |difference| of low/mid/high predictions: {np.round(mean_abs_diff, 2).tolist()}")
+
+if __name__ == "__main__":
+    compare_quantile_models()
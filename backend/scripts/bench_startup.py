@@ -0,0 +1,78 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules the serving path should not need; reported when a format imports them anyway
+HEAVY_MODULES = ['pandas', 'sklearn', 'joblib', 'scipy', 'xgboost']
+
+# Runs in a fresh interpreter so nothing is already imported or cached
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main as main
+imported = time.perf_counter()
+heavy_modules = [name for name in HEAVY_MODULES if name in sys.modules]
+
+from fastapi.testclient import TestClient
+client = TestClient(main.app)
+profile = {"age": 35, "education_level": "Bachelors", "marital_status": "Married-civ-spouse",
+           "sex": "Female", "occupation_category": "Management & Business",
+           "hours_per_week": 40, "work_class": "Private", "race": "White"}
+request_start = time.perf_counter()
+response = client.post("/predict_salary_range", json=profile)
+request_end = time.perf_counter()
+assert response.status_code == 200, response.text
+
+snapshot = main.registry.current
+print(json.dumps({
+    "predictor": type(snapshot.predictor).__name__,
+    "import_seconds": imported - start - snapshot.load_seconds,
+    "load_seconds": snapshot.load_seconds - snapshot.warm_up_seconds,
+    "warm_up_seconds": snapshot.warm_up_seconds,
+    "first_request_seconds": request_end - request_start,
+    "heavy_modules": heavy_modules,
+}))
+"""
+
+def measure_startup(model_format, env=None):
+    """Starts the API in a subprocess and returns its startup timings, plus total process time."""
+    env = dict(os.environ, **(env or {}), MODEL_FORMAT=model_format, MODEL_WATCH_INTERVAL='0')
+    code = f"HEAVY_MODULES = {HEAVY_MODULES!r}\n" + STARTUP_PROBE
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    total = time.perf_counter() - start
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process_seconds'] = total
+    return timings
+
+def benchmark_startup(formats, repeat=3):
+    """Median startup timings for each model format."""
+    results = {}
+    for model_format in formats:
+        runs = [measure_startup(model_format) for _ in range(repeat)]
+        summary = {key: statistics.median(run[key] for run in runs) for key in runs[0] if key.endswith('_seconds')}
+        summary['predictor'] = runs[0]['predictor']
+        summary['heavy_modules'] = runs[0]['heavy_modules']
+        results[model_format] = summary
+        print(f"{model_format:>8} ({summary['predictor']}): "
+              f"import {summary['import_seconds']:.2f}s, load {summary['load_seconds']:.2f}s, "
+              f"warm-up {summary['warm_up_seconds'] * 1000:.0f}ms, "
+              f"first request {summary['first_request_seconds'] * 1000:.1f}ms, "
+              f"process total {summary['process_seconds']:.2f}s; "
+              f"imported: {', '.join(summary['heavy_modules']) or 'none'}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure API startup time for each model format.")
+    parser.add_argument('--formats', nargs='+', default=['joblib', 'native', 'compiled'],
+                        help="Model formats to compare (see MODEL_FORMAT in app/main.py).")
+    parser.add_argument('--repeat', type=int, default=3, help="Process starts per format (median reported).")
+    args = parser.parse_args()
+    benchmark_startup(args.formats, args.repeat)
@@ -0,0 +1,39 @@
+import argparse
+import joblib
+import numpy as np
+from ingest import load_acs_data
+from train_acs import (
+    train_and_save_quantile_regressors, train_and_save_quantile_regressors_parallel,
+    LOW_MODEL_PATH, MID_MODEL_PATH, HIGH_MODEL_PATH
+)
+
+def load_three_models():
+    return [joblib.load(path) for path in (LOW_MODEL_PATH, MID_MODEL_PATH, HIGH_MODEL_PATH)]
+
+def compare_training_modes(n_threads=None, sample_size=10_000):
+    """
+    Trains the three quantile models with the sequential pipeline loop and with the shared-matrix
+    parallel mode on the same data; compares wall-clock time and the resulting predictions.
+    """
+    print("Loading ACS data...")
+    X, y = load_acs_data()
+    sample = X.iloc[:sample_size]
+
+    print("\n--- Sequential loop (one Pipeline.fit per quantile) ---")
+    sequential_s = train_and_save_quantile_regressors(X, y, publish=False)
+    sequential_pred = np.column_stack([model.predict(sample) for model in load_three_models()])
+
+    print("\n--- Shared QuantileDMatrix, concurrent training ---")
+    parallel_s = train_and_save_quantile_regressors_parallel(X, y, publish=False, n_threads=n_threads)
+    parallel_pred = np.column_stack([model.predict(sample) for model in load_three_models()])
+
+    print("\n=== Sequential vs. parallel quantile training ===")
+    print(f"Wall clock: {sequential_s:.1f}s vs {parallel_s:.1f}s ({sequential_s / parallel_s:.2f}x)")
+    print(f"Max |difference| of low/mid/high predictions: "
+          f"{np.abs(sequential_pred - parallel_pred).max(axis=0).tolist()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sequential and parallel quantile training.")
+    parser.add_argument('--threads', type=int, default=None, help="Threads for the parallel mode.")
+    args = parser.parse_args()
+    compare_training_modes(args.threads)
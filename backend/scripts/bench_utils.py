@@ -0,0 +1,23 @@
+import time
+import numpy as np
+
+def time_calls(fn, repeat=1000, warmup=20):
+    """Calls fn repeatedly and returns latency percentiles in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+    timings *= 1000
+    return {
+        'mean_ms': float(timings.mean()),
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'p99_ms': float(np.percentile(timings, 99)),
+    }
+
+def format_latency(name, stats):
+    return (f"{name}: p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms "
+            f"p99={stats['p99_ms']:.3f}ms mean={stats['mean_ms']:.3f}ms")
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import httpx
+from bench_api import BACKEND_DIR, run_load, summarize, child_pids, ENDPOINTS
+from sample_profiles import random_profiles
+
+# Memory fields read from /proc/<pid>/smaps_rollup (kB)
+SMAPS_FIELDS = ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty', 'Shared_Clean', 'Shared_Dirty')
+
+
+def smaps_rollup(pid):
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in SMAPS_FIELDS:
+                values[name] = int(rest.split()[0]) / 1024
+    values['Private'] = values['Private_Clean'] + values['Private_Dirty']
+    return values
+
+
+def server_command(launcher, workers, port):
+    if launcher == 'fork':
+        return [sys.executable, '-m', 'app.serve', '--workers', str(workers), '--port', str(port),
+                '--log-level', 'warning']
+    return [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--workers', str(workers),
+            '--log-level', 'warning']
+
+
+def worker_processes(server, launcher, workers):
+    """(parent pid or None, worker pids) once all workers have started."""
+    if launcher == 'uvicorn' and workers == 1:
+        return None, [server.pid]
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline:
+        # uvicorn's multiprocessing also starts a resource tracker; only count the workers
+        pids = [pid for pid in child_pids(server.pid) if b'resource_tracker' not in
+                open(f'/proc/{pid}/cmdline', 'rb').read()]
+        if len(pids) == workers:
+            return server.pid, pids
+        time.sleep(0.2)
+    raise RuntimeError(f"Expected {workers} workers.")
+
+
+def memory_summary(parent, pids):
+    workers = [smaps_rollup(pid) for pid in pids]
+    # PSS splits each shared page between the processes mapping it, so the sum is the real total
+    total = sum(w['Pss'] for w in workers) + (smaps_rollup(parent)['Pss'] if parent else 0)
+    return {
+        'total_pss_mb': total,
+        'rss_mb_per_worker': sum(w['Rss'] for w in workers) / len(workers),
+        'private_mb_per_worker': sum(w['Private'] for w in workers) / len(workers),
+        'shared_mb_per_worker': sum(w['Shared_Clean'] + w['Shared_Dirty'] for w in workers) / len(workers),
+    }
+
+
+async def measure(launcher, workers, num_requests, concurrency, endpoint, env):
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    start = time.perf_counter()
+    server = subprocess.Popen(server_command(launcher, workers, port), cwd=BACKEND_DIR,
+                              env=dict(os.environ, **env))
+    try:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', limits=limits, timeout=120) as client:
+            parent, pids = worker_processes(server, launcher, workers)
+            while True:
+                try:
+                    if (await client.get('/ready')).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError("Server exited.")
+                await asyncio.sleep(0.2)
+            # Spawned workers load the models one by one; give the last ones time to finish
+            for _ in range(600):
+                if all(smaps_rollup(pid)['Rss'] > 100 for pid in pids):
+                    break
+                await asyncio.sleep(0.2)
+            startup_seconds = time.perf_counter() - start
+            idle = memory_summary(parent, pids)
+            profiles = random_profiles(num_requests, seed=workers)
+            path = ENDPOINTS[endpoint]
+            await run_load(client, path, profiles, concurrency, min(200, num_requests))
+            stats = summarize(*await run_load(client, path, profiles, concurrency, num_requests))
+            loaded = memory_summary(parent, pids)
+    finally:
+        server.terminate()
+        server.wait()
+    return {'launcher': launcher, 'workers': workers, 'startup_seconds': startup_seconds,
+            'memory_idle': idle, 'memory_after_load': loaded, **stats}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare memory and throughput of the forking launcher "
+                                                 "(app/serve.py) with uvicorn --workers.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--launchers', nargs='+', choices=['fork', 'uvicorn'], default=['fork', 'uvicorn'])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency-per-worker', type=int, default=4)
+    parser.add_argument('--endpoint', choices=list(ENDPOINTS), default='predict_salary_range')
+    parser.add_argument('--output', default=None, help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    # Model inference rather than lookups, one thread per worker for both launchers
+    env = {'PREDICTION_CACHE_SIZE': '0', 'USE_PREDICTION_TABLE': '0', 'OMP_NUM_THREADS': '1',
+           'MODEL_WATCH_INTERVAL': '0'}
+    results = []
+    for workers in args.workers:
+        for launcher in args.launchers:
+            result = asyncio.run(measure(launcher, workers, args.requests, workers * args.concurrency_per_worker,
+                                         args.endpoint, env))
+            results.append(result)
+            memory = result['memory_after_load']
+            print(f"{launcher:>7} x{workers:<2}: total PSS {memory['total_pss_mb']:.0f} MB, per worker "
+                  f"RSS {memory['rss_mb_per_worker']:.0f} MB / private {memory['private_mb_per_worker']:.0f} MB, "
+                  f"{result['throughput_rps']:.0f} req/s, p50 {result['p50_ms']:.1f}ms p99 {result['p99_ms']:.1f}ms, "
+                  f"ready in {result['startup_seconds']:.1f}s")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,106 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.predictor import load_salary_predictor
+from app.registry import resolve_models_dir, record_artifacts
+from app.prediction_table import (
+    PredictionTable, PROFILE_AXES, TABLE_FILE, TABLE_META_FILE, build_axes, load_prediction_table
+)
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+CHUNK_SIZE = 500_000
+
+def profile_columns(table, indices):
+    """Column-oriented model input (same columns as app.predictor.profile_columns) for a batch of table rows."""
+    values = table.decode(indices)
+    columns = {}
+    for field, column, axis_values in PROFILE_AXES:
+        if field in values:
+            columns[column] = values[field]
+        else:
+            # Field is not read by the models, so any valid value gives the same prediction
+            columns[column] = np.full(len(indices), axis_values[0], dtype=object)
+    return columns
+
+def build_prediction_table(models_dir=MODELS_DIR, chunk_size=CHUNK_SIZE):
+    """
+    Scores every profile in the discrete input space and writes the results to a
+    memory-mappable .npy file plus a JSON sidecar describing the axes, next to the
+    current registry version's models.
+    """
+    registry_dir = models_dir
+    version, models_dir = resolve_models_dir(registry_dir)
+    predictor = load_salary_predictor(models_dir)
+    if predictor is None:
+        raise FileNotFoundError(f"No salary models found in {models_dir}. Please train them first.")
+
+    axes = build_axes(predictor.input_columns)
+    shape = [axis.size for axis in axes]
+    size = int(np.prod(shape))
+    print(f"Building prediction table for model {predictor.version}: "
+          f"{' x '.join(f'{axis.field}={axis.size}' for axis in axes)} = {size} profiles")
+
+    table_path = os.path.join(models_dir, TABLE_FILE)
+    meta_path = os.path.join(models_dir, TABLE_META_FILE)
+    # Write to temporary names first so a running server never maps a half-written table
+    tmp_table_path = table_path + '.tmp.npy'
+    values = np.lib.format.open_memmap(tmp_table_path, mode='w+', dtype=np.float32, shape=(size, 3))
+    table = PredictionTable(axes, values, predictor.version)
+
+    start = time.perf_counter()
+    for chunk_start in range(0, size, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, size)
+        indices = np.arange(chunk_start, chunk_end)
+        values[chunk_start:chunk_end] = predictor.predict_columns(profile_columns(table, indices))
+        print(f"  {chunk_end}/{size} profiles scored ({time.perf_counter() - start:.0f}s)")
+    values.flush()
+    del values
+
+    os.replace(tmp_table_path, table_path)
+    table.save_meta(meta_path + '.tmp')
+    os.replace(meta_path + '.tmp', meta_path)
+    record_artifacts(registry_dir, version, [table_path, meta_path])
+    print(f"Prediction table saved to {table_path} ({os.path.getsize(table_path) / 2**20:.1f} MiB).")
+
+def verify_prediction_table(models_dir=MODELS_DIR, num_samples=20_000, seed=0):
+    """
+    Compares a random sample of table rows with live model output.
+    Returns True if every sampled row matches.
+    """
+    _, models_dir = resolve_models_dir(models_dir)
+    predictor = load_salary_predictor(models_dir)
+    table = load_prediction_table(models_dir, predictor.version)
+    if table is None:
+        print("No prediction table for the current models.")
+        return False
+
+    rng = np.random.default_rng(seed)
+    # Always include the corners of the space, then a uniform sample
+    indices = np.unique(np.concatenate([[0, table.size - 1], rng.integers(0, table.size, num_samples)]))
+    # The sklearn pipelines are the reference; the table itself is built with the native path
+    expected = predictor.predict_ranges(pd.DataFrame(profile_columns(table, indices))).astype(np.float32)
+    actual = np.asarray(table.values[indices])
+
+    mismatches = np.flatnonzero(np.any(actual != expected, axis=1))
+    max_abs_diff = float(np.abs(actual - expected).max())
+    print(f"Checked {len(indices)} table rows against the models: "
+          f"{len(mismatches)} mismatches, max |diff|={max_abs_diff:.6g}")
+    return len(mismatches) == 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute salary range predictions for every profile.")
+    parser.add_argument('--verify-only', action='store_true', help="Only check an existing table against the models.")
+    parser.add_argument('--samples', type=int, default=20_000, help="Number of rows to check against the models.")
+    args = parser.parse_args()
+
+    if not args.verify_only:
+        build_prediction_table()
+    if not verify_prediction_table(num_samples=args.samples):
+        sys.exit(1)
@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+import joblib
+import numpy as np
+import pandas as pd
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.forest import CompiledForest
+from app.predictor import (
+    load_salary_predictor, BoosterSalaryPredictor, CompiledSalaryPredictor, COMPILED_REGRESSOR_FILE,
+    _iteration_range
+)
+from app.registry import resolve_models_dir, record_artifacts
+from sample_profiles import random_profile_columns
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+CLASSIFIER_PATH = os.path.join(MODELS_DIR, 'uci_classifier.joblib')
+COMPILED_CLASSIFIER_PATH = os.path.join(MODELS_DIR, 'uci_classifier_compiled.npz')
+
+# Maximum relative difference allowed between the exported and the original models
+TOLERANCE = 1e-5
+
+def _report_difference(name, expected, actual):
+    expected = np.asarray(expected, dtype=np.float64).reshape(np.shape(actual))
+    rel_diff = np.abs(actual - expected) / np.maximum(np.abs(expected), 1e-12)
+    ok = bool(rel_diff.max() <= TOLERANCE)
+    print(f"{name}: max relative difference {rel_diff.max():.3g} "
+          f"(exactly equal: {np.array_equal(expected, actual)}) -> {'OK' if ok else 'FAILED'}")
+    return ok
+
+def export_salary_models(models_dir=MODELS_DIR, num_samples=20_000):
+    """
+    Exports the ACS quantile models (multi-quantile or low/mid/high) to the native UBJSON
+    format and to a NumPy-only artifact, and checks both against Pipeline.predict on random profiles.
+    The export is written next to the current registry version's models.
+    """
+    registry_dir = models_dir
+    version, models_dir = resolve_models_dir(registry_dir)
+    predictor = load_salary_predictor(models_dir)
+    if predictor is None:
+        raise FileNotFoundError(f"No salary models found in {models_dir}. Please train them first.")
+
+    # Native boosters + preprocessing sidecar, for models trained before train_acs.py wrote them
+    native_paths = predictor.save_native(models_dir)
+    record_artifacts(registry_dir, version, native_paths)
+    print(f"Wrote native salary models {predictor.version} to {', '.join(native_paths)}.")
+
+    compiled = CompiledSalaryPredictor.from_predictor(predictor)
+    path = os.path.join(models_dir, COMPILED_REGRESSOR_FILE)
+    compiled.save(path)
+    record_artifacts(registry_dir, version, [path])
+    print(f"Exported salary models {predictor.version} to {path} ({os.path.getsize(path) / 1024:.0f} KiB).")
+
+    # Check the saved artifacts, not the in-memory copies
+    native = BoosterSalaryPredictor.load_native(models_dir)
+    compiled = CompiledSalaryPredictor.load(path)
+    columns = random_profile_columns(num_samples)
+    expected = predictor.predict_ranges(pd.DataFrame(columns))
+    native_ok = _report_difference("ACS quantile models (native)", expected, native.predict_columns(columns))
+    return _report_difference("ACS quantile models (compiled)", expected, compiled.predict_columns(columns)) and native_ok
+
+def export_classifier(path=CLASSIFIER_PATH, num_samples=20_000):
+    """
+    Exports the UCI classifier's booster to flattened NumPy arrays. Its preprocessing
+    (OneHotEncoder with passthrough columns) stays in sklearn, so the check runs on
+    random preprocessed matrices with missing values.
+    """
+    if not os.path.exists(path):
+        print(f"Skipping UCI classifier: {path} not found.")
+        return True
+    pipeline = joblib.load(path)
+    model = pipeline[-1]
+    booster = model.get_booster()
+    forest = CompiledForest.from_booster(booster, _iteration_range(model))
+    np.savez(COMPILED_CLASSIFIER_PATH, **forest.to_arrays())
+    print(f"Exported UCI classifier to {COMPILED_CLASSIFIER_PATH} "
+          f"({os.path.getsize(COMPILED_CLASSIFIER_PATH) / 1024:.0f} KiB).")
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(scale=1000, size=(num_samples, booster.num_features())).astype(np.float32)
+    X[rng.random(X.shape) < 0.7] = np.nan
+    with np.load(COMPILED_CLASSIFIER_PATH) as arrays:
+        forest = CompiledForest.from_arrays(arrays)
+    expected = booster.inplace_predict(X, iteration_range=_iteration_range(model), missing=np.nan)
+    return _report_difference("UCI classifier", expected, forest.predict(X))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the trained tree models to the native and NumPy-only formats.")
+    parser.add_argument('--skip-classifier', action='store_true', help="Only export the ACS salary models.")
+    args = parser.parse_args()
+
+    ok = export_salary_models()
+    if not args.skip_classifier:
+        ok = export_classifier() and ok
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,183 @@
+import itertools
+import time
+import numpy as np
+import pandas as pd
+
+# Confusion cells, indexed by 2 * actual + predicted for binary labels
+CELLS = ['tn', 'fp', 'fn', 'tp']
+
+
+def _metrics(counts):
+    """Selection rate (demographic parity), TPR and FPR from (..., 4) confusion counts; NaN when undefined."""
+    tn, fp, fn, tp = (counts[..., i].astype(np.float64) for i in range(4))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'selection_rate': (fp + tp) / (tn + fp + fn + tp),
+            'tpr': tp / (tp + fn),
+            'fpr': fp / (fp + tn),
+        }
+
+
+class FairnessAudit:
+    """
+    Confusion counts and fairness metrics for every group of every combination of the
+    sensitive attributes (e.g. sex, race, sex x race, sex x race x occupation).
+
+    All rows are counted once, in a single bincount over the finest intersection of the
+    attributes; coarser groupings are sums of those counts. Bootstrap confidence intervals
+    resample the counts instead of the rows: a row bootstrap of n rows is a multinomial draw
+    of n over the (group, cell) counts, so all replicates come from one vectorized call
+    whatever the number of rows.
+    """
+
+    def __init__(self, y_true, y_pred, attributes: pd.DataFrame, positive=1,
+                 n_bootstrap=1000, confidence=0.95, seed=0):
+        self.columns = list(attributes.columns)
+        self.confidence = confidence
+        actual = np.asarray(y_true) == positive
+        predicted = np.asarray(y_pred) == positive
+
+        # Finest groups: mixed-radix combination of each attribute's codes
+        codes, self.levels = [], []
+        for column in self.columns:
+            column_codes, uniques = pd.factorize(attributes[column], sort=True, use_na_sentinel=False)
+            codes.append(column_codes)
+            self.levels.append(list(uniques))
+        sizes = [len(levels) for levels in self.levels]
+        group_ids = np.ravel_multi_index(codes, sizes) if codes else np.zeros(len(actual), dtype=np.int64)
+        cells = 2 * actual.astype(np.int64) + predicted
+        counts = np.bincount(group_ids * 4 + cells, minlength=int(np.prod(sizes)) * 4).reshape(-1, 4)
+
+        # Only groups that occur; group_codes[g] holds group g's code for each attribute
+        present = counts.sum(axis=1) > 0
+        self.counts = counts[present]
+        self.group_codes = np.column_stack(np.unravel_index(np.flatnonzero(present), sizes))
+        self.num_rows = len(actual)
+
+        self.replicates = None
+        if n_bootstrap:
+            rng = np.random.default_rng(seed)
+            flat = self.counts.ravel()
+            self.replicates = rng.multinomial(self.num_rows, flat / flat.sum(), size=n_bootstrap).reshape(
+                n_bootstrap, *self.counts.shape)
+
+    def _coarse_groups(self, columns):
+        # Index of each finest group in the coarser grouping by columns, and the coarse groups' codes
+        positions = [self.columns.index(column) for column in columns]
+        keys, inverse = np.unique(self.group_codes[:, positions], axis=0, return_inverse=True)
+        return inverse.ravel(), keys
+
+    def table(self, columns) -> pd.DataFrame:
+        """One row per group of the given attributes: counts, metrics and their confidence intervals."""
+        inverse, keys = self._coarse_groups(columns)
+        num_groups = len(keys)
+        counts = np.zeros((num_groups, 4), dtype=np.int64)
+        np.add.at(counts, inverse, self.counts)
+
+        table = pd.DataFrame({
+            column: [self.levels[self.columns.index(column)][code] for code in keys[:, i]]
+            for i, column in enumerate(columns)
+        })
+        table['n'] = counts.sum(axis=1)
+        for i, cell in enumerate(CELLS):
+            table[cell] = counts[:, i]
+        for name, values in _metrics(counts).items():
+            table[name] = values
+
+        if self.replicates is not None:
+            # Same summation for every replicate at once: (B, fine groups, 4) -> (B, groups, 4)
+            assignment = np.zeros((len(inverse), num_groups))
+            assignment[np.arange(len(inverse)), inverse] = 1
+            replicate_counts = np.einsum('bgc,gh->bhc', self.replicates, assignment)
+            tail = (1 - self.confidence) / 2 * 100
+            for name, values in _metrics(replicate_counts).items():
+                with np.errstate(invalid='ignore'):
+                    low, high = np.nanpercentile(values, [tail, 100 - tail], axis=0)
+                table[f'{name}_low'] = low
+                table[f'{name}_high'] = high
+        return table
+
+    def tables(self, max_order=None):
+        """Tables for every non-empty combination of the attributes, up to max_order attributes."""
+        max_order = max_order or len(self.columns)
+        return {
+            combination: self.table(list(combination))
+            for order in range(1, max_order + 1)
+            for combination in itertools.combinations(self.columns, order)
+        }
+
+    def gap(self, column, group_a, group_b, metric):
+        """metric(group_a) - metric(group_b) for one attribute, with its bootstrap interval (NaN without bootstrap)."""
+        inverse, keys = self._coarse_groups([column])
+        levels = self.levels[self.columns.index(column)]
+        values = []
+        for source in [self.counts[None]] + ([self.replicates] if self.replicates is not None else []):
+            per_group = []
+            for group in (group_a, group_b):
+                if group not in levels:
+                    per_group.append(np.full(len(source), np.nan))
+                    continue
+                members = inverse == np.flatnonzero(keys[:, 0] == levels.index(group))[0]
+                per_group.append(_metrics(source[:, members].sum(axis=1))[metric])
+            values.append(per_group[0] - per_group[1])
+        gap = float(values[0][0])
+        if len(values) == 1:
+            return gap, np.nan, np.nan
+        tail = (1 - self.confidence) / 2 * 100
+        with np.errstate(invalid='ignore'):
+            low, high = np.nanpercentile(values[1], [tail, 100 - tail])
+        return gap, float(low), float(high)
+
+
+def format_table(table, columns, limit=None):
+    """Text rendering of FairnessAudit.table with intervals, largest groups first."""
+    rows = table.sort_values('n', ascending=False)
+    lines = []
+    for _, row in (rows.head(limit) if limit else rows).iterrows():
+        group = ' x '.join(str(row[column]) for column in columns)
+        parts = []
+        for metric, label in [('selection_rate', 'DP'), ('tpr', 'TPR'), ('fpr', 'FPR')]:
+            text = f"{label}={row[metric]:.3f}"
+            if f'{metric}_low' in row:
+                text += f" [{row[f'{metric}_low']:.3f}, {row[f'{metric}_high']:.3f}]"
+            parts.append(text)
+        lines.append(f"{group} (n={row['n']}): {', '.join(parts)}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    # Self-check against per-group sklearn confusion matrices, then timing of a full audit
+    from sklearn.metrics import confusion_matrix
+
+    rng = np.random.default_rng(0)
+    n = 2_000_000
+    attributes = pd.DataFrame({
+        'SEX': rng.choice(['Male', 'Female'], n),
+        'RAC1P': rng.choice([str(code) for code in range(1, 10)], n),
+        'OCCP': rng.choice(['Management & Business', 'Tech & Engineering', 'Healthcare',
+                            'Sales & Office', 'Service & Blue Collar', 'Other'], n),
+    })
+    y_true = rng.integers(0, 2, n)
+    y_pred = np.where(rng.random(n) < 0.8, y_true, 1 - y_true)
+
+    start = time.perf_counter()
+    audit = FairnessAudit(y_true, y_pred, attributes, n_bootstrap=1000)
+    tables = audit.tables()
+    elapsed = time.perf_counter() - start
+    print(f"Audited {n} rows: {sum(len(t) for t in tables.values())} groups in {len(tables)} groupings "
+          f"with 1000 bootstrap replicates in {elapsed:.2f}s")
+
+    ok = True
+    sample = tables[('SEX', 'RAC1P')]
+    start = time.perf_counter()
+    for _, row in sample.iterrows():
+        mask = ((attributes['SEX'] == row['SEX']) & (attributes['RAC1P'] == row['RAC1P'])).to_numpy()
+        expected = confusion_matrix(y_true[mask], y_pred[mask], labels=[0, 1]).ravel()
+        ok = ok and list(expected) == [row[cell] for cell in CELLS]
+    print(f"Per-group confusion_matrix loop over {len(sample)} SEX x RAC1P groups: "
+          f"{time.perf_counter() - start:.2f}s, counts identical: {ok}")
+    print(format_table(tables[('SEX',)], ['SEX']))
+    gap, low, high = audit.gap('SEX', 'Male', 'Female', 'tpr')
+    print(f"TPR gap (Male-Female): {gap:.4f} [{low:.4f}, {high:.4f}]")
+    if not ok:
+        raise SystemExit(1)
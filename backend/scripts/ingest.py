@@ -1,22 +1,101 @@
+import argparse
+import glob
+import hashlib
+import resource
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
 from ucimlrepo import fetch_ucirepo
-from folktables import ACSDataSource
+from folktables.load_acs import initialize_and_download, state_list
 import sys
 import os
 
 # Add the project root to the Python path to allow for absolute imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from mappings import map_education, map_occupation
+from mappings import map_education_codes, map_occupation_codes
 
-def load_acs_data():
+# Raw survey downloads (same location ACSDataSource uses by default)
+ACS_DATA_DIR = os.environ.get('ACS_DATA_DIR', 'data')
+# Columnar copies of the columns the models need, keyed by dataset parameters
+DATASET_CACHE_DIR = os.environ.get(
+    'DATASET_CACHE_DIR', os.path.join(os.path.dirname(__file__), '..', 'data', 'cache'))
+# Never reach the network: load from the cache (or already downloaded CSVs) or fail
+DATA_OFFLINE = os.environ.get('DATA_OFFLINE', '0') == '1'
+
+ACS_SURVEY_YEAR = '2018'
+ACS_HORIZON = '1-Year'
+ACS_STATES = ['CA']
+# PUMS columns read from the wide survey CSVs; everything else is skipped while parsing
+ACS_RAW_COLUMNS = ['PINCP', 'WKHP', 'AGEP', 'SCHL', 'OCCP', 'MAR', 'SEX', 'COW', 'RAC1P']
+# Explicit dtypes, the same for every file and chunk: AGEP, MAR, SEX and RAC1P are never missing
+# in person records, so a full read_csv infers int64 for them and float64 for the rest
+ACS_INTEGER_COLUMNS = ['AGEP', 'MAR', 'SEX', 'RAC1P']
+ACS_DTYPES = {col: np.int64 if col in ACS_INTEGER_COLUMNS else np.float64 for col in ACS_RAW_COLUMNS}
+
+ACS_FEATURE_COLUMNS = ['AGEP', 'SCHL', 'MAR', 'SEX', 'COW', 'WKHP', 'OCCP', 'RAC1P']
+ACS_TARGET_COLUMN = 'PINCP'
+# Streaming ingest (ingest_acs_partitions): rows parsed per chunk, and the partitioned output
+ACS_CHUNK_ROWS = int(os.environ.get('ACS_CHUNK_ROWS', '250000'))
+ACS_PARTITIONS_DIR = os.environ.get('ACS_PARTITIONS_DIR')
+
+UCI_ADULT_ID = 2
+
+def _cache_path(name, *key):
+    return os.path.join(DATASET_CACHE_DIR, '_'.join([name] + [str(part) for part in key]) + '.parquet')
+
+def _columns_key(dtypes):
+    # Short hash of the stored columns and dtypes, so changing ACS_DTYPES rebuilds the cache
+    return hashlib.sha256(repr(sorted((col, np.dtype(dtype).str) for col, dtype in dtypes.items())).encode()).hexdigest()[:8]
+
+def _write_cache(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def _read_acs_csv(path, chunksize=None):
+    # Column projection with explicit dtypes; with chunksize, an iterator of frames
+    return pd.read_csv(path, usecols=ACS_RAW_COLUMNS, dtype=ACS_DTYPES, skipinitialspace=True,
+                       chunksize=chunksize)
+
+def _acs_csv_path(state, year, horizon, offline):
+    base_datadir = os.path.join(ACS_DATA_DIR, str(year), horizon)
+    os.makedirs(base_datadir, exist_ok=True)
+    try:
+        return initialize_and_download(base_datadir, state, year, horizon, 'person', download=not offline)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"ACS data for {state} is neither cached in {DATASET_CACHE_DIR} nor "
+                                f"downloaded, and offline mode is on. {e}") from e
+
+def load_raw_acs_data(year=ACS_SURVEY_YEAR, horizon=ACS_HORIZON, states=None, offline=None, refresh=False):
     """
-    Fetches, preprocesses, and maps ACS PUMS data using shared mapping logic.
+    Returns the ACS person records (ACS_RAW_COLUMNS only) for the given survey and states.
+    The first call parses the survey CSVs and stores the columns as Parquet; later calls
+    read only those columns back. With offline, missing data raises instead of downloading.
     """
-    # ... (rest of the file remains the same)
-    data_source = ACSDataSource(survey_year='2018', horizon='1-Year', survey='person')
-    raw_df = data_source.get_data(states=['CA'], download=True)
+    states = sorted(states or ACS_STATES)
+    offline = DATA_OFFLINE if offline is None else offline
+    path = _cache_path('acs', year, horizon, '-'.join(states), _columns_key(ACS_DTYPES))
+    start = time.perf_counter()
+    if os.path.exists(path) and not refresh:
+        raw_df = pd.read_parquet(path, columns=ACS_RAW_COLUMNS)
+        print(f"Loaded {len(raw_df)} ACS records from cache {path} in {time.perf_counter() - start:.2f}s (warm).")
+        return raw_df
 
+    frames = [_read_acs_csv(_acs_csv_path(state, year, horizon, offline))[ACS_RAW_COLUMNS] for state in states]
+    raw_df = pd.concat(frames, ignore_index=True)
+    _write_cache(raw_df, path)
+    print(f"Loaded {len(raw_df)} ACS records from CSV in {time.perf_counter() - start:.2f}s (cold), cached to {path}.")
+    return raw_df
+
+def preprocess_acs(raw_df):
+    """
+    Coerces, filters and maps raw ACS person records; returns the feature columns plus PINCP.
+    Works on any subset of the records, such as one state or one CSV chunk.
+    """
     # --- Preprocessing ---
     numeric_cols = ['PINCP', 'WKHP', 'AGEP', 'SCHL', 'OCCP', 'MAR', 'SEX', 'COW', 'RAC1P']
     for col in numeric_cols:
@@ -28,8 +107,8 @@ def load_acs_data():
     filtered_df = raw_df[(raw_df['WKHP'] > 0) & (raw_df['PINCP'] >= 1000)].copy()
 
     # --- Apply Mappings ---
-    filtered_df['SCHL'] = filtered_df['SCHL'].apply(map_education)
-    filtered_df['OCCP'] = filtered_df['OCCP'].apply(map_occupation)
+    filtered_df['SCHL'] = map_education_codes(filtered_df['SCHL'])
+    filtered_df['OCCP'] = map_occupation_codes(filtered_df['OCCP'])
     
     # --- Feature Selection ---
     # Ensure MAR, SEX, COW are strings for one-hot encoding
@@ -38,23 +117,151 @@ def load_acs_data():
     filtered_df['COW'] = filtered_df['COW'].astype(str)
     filtered_df['RAC1P'] = filtered_df['RAC1P'].astype(str) # Add race for fairness analysis
 
-    feature_cols = ['AGEP', 'SCHL', 'MAR', 'SEX', 'COW', 'WKHP', 'OCCP', 'RAC1P']
-    target_col = 'PINCP'
+    filtered_df.dropna(subset=ACS_FEATURE_COLUMNS, inplace=True)
+    return filtered_df[ACS_FEATURE_COLUMNS + [ACS_TARGET_COLUMN]]
+
+def load_acs_data(offline=None):
+    """
+    Fetches, preprocesses, and maps ACS PUMS data using shared mapping logic.
+    With ACS_PARTITIONS_DIR set, reads the output of ingest_acs_partitions instead.
+    """
+    if ACS_PARTITIONS_DIR:
+        return load_acs_partitions(ACS_PARTITIONS_DIR)
+    filtered_df = preprocess_acs(load_raw_acs_data(offline=offline))
+    return filtered_df[ACS_FEATURE_COLUMNS], filtered_df[ACS_TARGET_COLUMN]
+
+def _ingest_state(state, year, horizon, output_dir, chunk_rows, offline):
+    """Worker: streams one state's CSV in chunks and writes one Parquet file per chunk."""
+    start = time.perf_counter()
+    csv_path = _acs_csv_path(state, year, horizon, offline)
+    state_dir = os.path.join(output_dir, f"state={state}")
+    # Replace any earlier output for this state; written to a temporary directory first
+    tmp_dir = state_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    rows_read = rows_written = parts = 0
+    for chunk in _read_acs_csv(csv_path, chunksize=chunk_rows):
+        rows_read += len(chunk)
+        filtered_df = preprocess_acs(chunk)
+        if len(filtered_df):
+            filtered_df.to_parquet(os.path.join(tmp_dir, f"part-{parts:05d}.parquet"), index=False)
+            rows_written += len(filtered_df)
+            parts += 1
+    shutil.rmtree(state_dir, ignore_errors=True)
+    os.replace(tmp_dir, state_dir)
+    return {
+        'state': state,
+        'rows_read': rows_read,
+        'rows_written': rows_written,
+        'parts': parts,
+        'seconds': time.perf_counter() - start,
+        # Peak resident memory of this worker process (kilobytes on Linux)
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
 
-    filtered_df.dropna(subset=feature_cols, inplace=True)
+def ingest_acs_partitions(states, output_dir, year=ACS_SURVEY_YEAR, horizon=ACS_HORIZON,
+                          workers=None, chunk_rows=ACS_CHUNK_ROWS, offline=None):
+    """
+    Streams the ACS person records of many states through preprocess_acs in worker processes
+    and writes them as Parquet partitioned by state (output_dir/state=XX/part-NNNNN.parquet).
+    Each worker holds one CSV chunk at a time and handles one state before being replaced,
+    so peak memory depends on workers and chunk_rows, not on the number of states.
+    """
+    offline = DATA_OFFLINE if offline is None else offline
+    workers = workers or os.cpu_count()
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as executor:
+        futures = [executor.submit(_ingest_state, state, year, horizon, output_dir, chunk_rows, offline)
+                   for state in states]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"{result['state']}: {result['rows_written']}/{result['rows_read']} rows kept, "
+                  f"{result['parts']} parts in {result['seconds']:.1f}s (worker peak {result['peak_rss_mb']:.0f} MB)")
+    elapsed = time.perf_counter() - start
+    rows = sum(result['rows_written'] for result in results)
+    print(f"Ingested {len(states)} states ({rows} rows) into {output_dir} in {elapsed:.1f}s with {workers} workers; "
+          f"max worker peak memory {max(result['peak_rss_mb'] for result in results):.0f} MB.")
+    return results
 
-    X = filtered_df[feature_cols]
-    y = filtered_df[target_col]
+def acs_partition_files(output_dir, states=None):
+    """
+    Parquet files written by ingest_acs_partitions under output_dir, in a stable order.
+    Several years can live side by side (e.g. output_dir/year=2018/state=CA/...).
+    """
+    files = []
+    for path in sorted(glob.glob(os.path.join(output_dir, '**', '*.parquet'), recursive=True)):
+        parts = os.path.relpath(path, output_dir).split(os.sep)
+        if any(part.endswith('.tmp') for part in parts):
+            continue  # A state still being written
+        if states and not any(f"state={state}" in parts for state in states):
+            continue
+        files.append(path)
+    return files
 
-    return X, y
+def read_acs_partition(path):
+    """One partition file as X, y."""
+    df = pd.read_parquet(path, columns=ACS_FEATURE_COLUMNS + [ACS_TARGET_COLUMN])
+    return df[ACS_FEATURE_COLUMNS], df[ACS_TARGET_COLUMN]
 
-def load_uci_data():
+def load_acs_partitions(output_dir, states=None):
+    """Reads the output of ingest_acs_partitions (optionally only some states) as X, y."""
+    filters = [('state', 'in', list(states))] if states else None
+    df = pd.read_parquet(output_dir, columns=ACS_FEATURE_COLUMNS + [ACS_TARGET_COLUMN], filters=filters)
+    return df[ACS_FEATURE_COLUMNS], df[ACS_TARGET_COLUMN]
+
+def load_raw_uci_data(dataset_id=UCI_ADULT_ID, offline=None, refresh=False):
+    """
+    Returns the features and the target frame of a UCI repository dataset, cached as
+    Parquet after the first download. With offline, a cache miss raises instead of fetching.
+    """
+    offline = DATA_OFFLINE if offline is None else offline
+    path = _cache_path('uci', dataset_id)
+    start = time.perf_counter()
+    if os.path.exists(path) and not refresh:
+        df = pd.read_parquet(path)
+        # The target columns are stored last; their names are kept in the file metadata
+        num_targets = int(df.attrs.get('num_targets', 1))
+        print(f"Loaded UCI dataset {dataset_id} from cache {path} in {time.perf_counter() - start:.2f}s (warm).")
+        return df.iloc[:, :-num_targets], df.iloc[:, -num_targets:]
+
+    if offline:
+        raise FileNotFoundError(f"UCI dataset {dataset_id} is not cached in {DATASET_CACHE_DIR} and offline mode is on.")
+    dataset = fetch_ucirepo(id=dataset_id)
+    features, targets = dataset.data.features, dataset.data.targets
+    df = pd.concat([features, targets], axis=1)
+    df.attrs['num_targets'] = targets.shape[1]
+    _write_cache(df, path)
+    print(f"Fetched UCI dataset {dataset_id} in {time.perf_counter() - start:.2f}s (cold), cached to {path}.")
+    return features, targets
+
+def load_uci_data(offline=None):
     """
     Fetches and preprocesses the UCI Adult dataset.
     """
-    adult = fetch_ucirepo(id=2)
-    X = adult.data.features
-    y = adult.data.targets.iloc[:, 0]
+    X, targets = load_raw_uci_data(offline=offline)
+    y = targets.iloc[:, 0]
     y = y.str.strip().str.replace(r"\.", "", regex=True)
     y = y.map({'<=50K': 0, '>50K': 1})
     return X, y
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream ACS person records of many states into partitioned Parquet.")
+    parser.add_argument('--states', nargs='+', default=ACS_STATES,
+                        help="State codes, or 'all' for every state and Puerto Rico.")
+    parser.add_argument('--output', default=None,
+                        help="Output directory (default: data/acs_partitions/year=<year>; "
+                             "set ACS_PARTITIONS_DIR to data/acs_partitions to train from every year).")
+    parser.add_argument('--year', default=ACS_SURVEY_YEAR)
+    parser.add_argument('--horizon', default=ACS_HORIZON)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument('--chunk-rows', type=int, default=ACS_CHUNK_ROWS, help="CSV rows parsed at a time per worker.")
+    parser.add_argument('--offline', action='store_true', help="Fail instead of downloading missing states.")
+    args = parser.parse_args()
+
+    states = state_list if args.states == ['all'] else args.states
+    output = args.output or os.path.join(os.path.dirname(__file__), '..', 'data', 'acs_partitions', f"year={args.year}")
+    ingest_acs_partitions(states, output, args.year, args.horizon, args.workers, args.chunk_rows,
+                          offline=args.offline or None)
@@ -5,42 +5,36 @@ import numpy as np
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, log_loss, confusion_matrix
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, log_loss
 from xgboost import XGBClassifier
 from ingest import load_acs_data  # Your data loading function
+from fairness import FairnessAudit, format_table
 
 # Directory to save models
 MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
 MODEL_PATH = os.path.join(MODELS_DIR, 'acs_classifier.joblib')
 
-def compute_fairness_metrics(X, y_true, y_pred, sensitive_feature_column):
+# Attributes crossed with the sensitive feature in the intersectional report
+INTERSECTIONAL_COLUMNS = ['SEX', 'RAC1P', 'OCCP']
+INTERSECTIONAL_GROUPS_SHOWN = 10
+
+def compute_fairness_metrics(X, y_true, y_pred, sensitive_feature_column,
+                             intersectional_columns=INTERSECTIONAL_COLUMNS, n_bootstrap=1000):
     """
-    Computes fairness metrics (Demographic Parity, TPR, FPR) by sensitive attribute.
+    Computes fairness metrics (Demographic Parity, TPR, FPR) by sensitive attribute, with
+    bootstrap confidence intervals, and the same metrics for every intersection with
+    intersectional_columns (e.g. sex x race x occupation) in the same pass over the rows.
     Assumes positive class is '2' (high income).
     """
-    metrics = {}
-    sensitive_feature = X[sensitive_feature_column]
-    groups = sensitive_feature.unique()
-    
-    for group in groups:
-        idx = sensitive_feature == group
-        y_g = y_true[idx]
-        y_pred_g = y_pred[idx]
-
-        # Binary: class '2' as positive
-        y_true_bin = (y_g == 2).astype(int)
-        y_pred_bin = (y_pred_g == 2).astype(int)
-
-        if len(np.unique(y_true_bin)) > 1:
-            tn, fp, fn, tp = confusion_matrix(y_true_bin, y_pred_bin, labels=[0,1]).ravel()
-        else:
-            tn = fp = fn = tp = 0
-
-        dp = y_pred_bin.mean()  # Demographic parity
-        tpr = tp / (tp + fn) if (tp + fn) > 0 else np.nan
-        fpr = fp / (fp + tn) if (fp + tn) > 0 else np.nan
-
-        metrics[group] = {'Demographic Parity': dp, 'TPR': tpr, 'FPR': fpr}
+    columns = [sensitive_feature_column] + [c for c in intersectional_columns
+                                            if c != sensitive_feature_column and c in X.columns]
+    audit = FairnessAudit(np.asarray(y_true), np.asarray(y_pred), X[columns], positive=2,
+                          n_bootstrap=n_bootstrap)
+    table = audit.table([sensitive_feature_column])
+    metrics = {
+        row[sensitive_feature_column]: {'Demographic Parity': row['selection_rate'], 'TPR': row['tpr'], 'FPR': row['fpr']}
+        for _, row in table.iterrows()
+    }
 
     # Gaps Male - Female
     gap_dp = metrics.get('Male', {}).get('Demographic Parity', 0) - metrics.get('Female', {}).get('Demographic Parity', 0)
@@ -48,9 +42,18 @@ def compute_fairness_metrics(X, y_true, y_pred, sensitive_feature_column):
     gap_fpr = metrics.get('Male', {}).get('FPR', 0) - metrics.get('Female', {}).get('FPR', 0)
 
     print("\n=== Fairness Metrics by Sex ===")
-    for g, m in metrics.items():
-        print(f"{g}: Demographic Parity={m['Demographic Parity']:.3f}, TPR={m['TPR']:.3f}, FPR={m['FPR']:.3f}")
-    print(f"Gap (Male-Female): DP={gap_dp:.3f}, TPR Gap={gap_tpr:.3f}, FPR Gap={gap_fpr:.3f}\n")
+    print(format_table(table, [sensitive_feature_column]))
+    print(f"Gap (Male-Female): DP={gap_dp:.3f}, TPR Gap={gap_tpr:.3f}, FPR Gap={gap_fpr:.3f}")
+    if 'Male' in metrics and 'Female' in metrics:
+        for metric, label in [('selection_rate', 'DP'), ('tpr', 'TPR'), ('fpr', 'FPR')]:
+            _, low, high = audit.gap(sensitive_feature_column, 'Male', 'Female', metric)
+            print(f"  {label} gap {int(audit.confidence * 100)}% CI: [{low:.3f}, {high:.3f}]")
+
+    for combination, group_table in audit.tables().items():
+        if len(combination) > 1:
+            print(f"\n=== Fairness Metrics by {' x '.join(combination)} (largest {INTERSECTIONAL_GROUPS_SHOWN} groups) ===")
+            print(format_table(group_table, list(combination), limit=INTERSECTIONAL_GROUPS_SHOWN))
+    print()
 
     return metrics
 
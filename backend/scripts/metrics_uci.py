@@ -1,13 +1,15 @@
 import joblib
 import os
+import numpy as np
+import pandas as pd
 from ingest import load_uci_data
+from fairness import FairnessAudit, format_table
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, f1_score, roc_auc_score, log_loss
 from xgboost import XGBClassifier
-from sklearn.metrics import confusion_matrix
 
 
 MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
@@ -75,45 +77,33 @@ def train_and_evaluate_classifier():
     joblib.dump(clf_pipeline, CLASSIFIER_PATH)
     print("Classifier saved successfully.")
 
-    fairness_metrics(clf_pipeline, X_test, y_test, sensitive_col="race")
+    fairness_metrics(y_pred, X_test, y_test, sensitive_col="race")
 
 
 
-def fairness_metrics(clf_pipeline, X_test, y_test, sensitive_col="race"):
+def fairness_metrics(y_pred, X_test, y_test, sensitive_col="race", n_bootstrap=1000):
     """
-    Computes demographic parity, TPR, and FPR for white vs non-white groups.
+    Computes demographic parity, TPR, and FPR for white vs non-white groups, with bootstrap
+    confidence intervals, from the predictions already made for the test set.
     """
-    # Predict labels and probabilities
-    y_pred = clf_pipeline.predict(X_test)
-    
-    # Extract the sensitive attribute
-    race = X_test[sensitive_col]
-    
     # Define groups
-    white_mask = race == "White"
-    non_white_mask = ~white_mask
-    
-    # Demographic Parity (selection rate)
-    dp_white = y_pred[white_mask].mean()
-    dp_non_white = y_pred[non_white_mask].mean()
-    
-    # Confusion matrices
-    tn_w, fp_w, fn_w, tp_w = confusion_matrix(y_test[white_mask], y_pred[white_mask]).ravel()
-    tn_nw, fp_nw, fn_nw, tp_nw = confusion_matrix(y_test[non_white_mask], y_pred[non_white_mask]).ravel()
-    
-    # True Positive Rate (Recall)
-    tpr_white = tp_w / (tp_w + fn_w) if (tp_w + fn_w) > 0 else 0
-    tpr_non_white = tp_nw / (tp_nw + fn_nw) if (tp_nw + fn_nw) > 0 else 0
-    
-    # False Positive Rate
-    fpr_white = fp_w / (fp_w + tn_w) if (fp_w + tn_w) > 0 else 0
-    fpr_non_white = fp_nw / (fp_nw + tn_nw) if (fp_nw + tn_nw) > 0 else 0
-    
+    race = X_test[sensitive_col]
+    groups = pd.DataFrame({sensitive_col: np.where(race == "White", "White", "Non-White")})
+
+    audit = FairnessAudit(np.asarray(y_test), np.asarray(y_pred), groups, positive=1, n_bootstrap=n_bootstrap)
+    # Undefined rates are reported as 0
+    table = audit.table([sensitive_col]).set_index(sensitive_col).fillna(0)
+    white, non_white = table.loc["White"], table.loc["Non-White"]
+
     # Print results
     print("=== Fairness Metrics ===")
-    print(f"Demographic Parity: White={dp_white:.3f}, Non-White={dp_non_white:.3f}")
-    print(f"TPR (Recall): White={tpr_white:.3f}, Non-White={tpr_non_white:.3f}")
-    print(f"FPR: White={fpr_white:.3f}, Non-White={fpr_non_white:.3f}")
+    print(f"Demographic Parity: White={white['selection_rate']:.3f}, Non-White={non_white['selection_rate']:.3f}")
+    print(f"TPR (Recall): White={white['tpr']:.3f}, Non-White={non_white['tpr']:.3f}")
+    print(f"FPR: White={white['fpr']:.3f}, Non-White={non_white['fpr']:.3f}")
+    print(format_table(table.reset_index(), [sensitive_col]))
+    for metric, label in [('selection_rate', 'DP'), ('tpr', 'TPR'), ('fpr', 'FPR')]:
+        gap, low, high = audit.gap(sensitive_col, "White", "Non-White", metric)
+        print(f"{label} gap (White-Non-White): {gap:.3f} [{low:.3f}, {high:.3f}]")
 
 # Example usage
 
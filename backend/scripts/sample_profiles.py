@@ -0,0 +1,51 @@
+import os
+import sys
+import numpy as np
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.predictor import PROFILE_COLUMNS
+from mappings import (
+    EDUCATION_LEVELS, OCCUPATION_CATEGORIES, WORK_CLASSES, MARITAL_STATUSES,
+    SEXES, RACES, AGE_RANGE, HOURS_RANGE
+)
+
+def random_profile_columns(n, seed=0):
+    """Random model input covering every option, unknown categories and out-of-range integers."""
+    rng = np.random.default_rng(seed)
+    options = {
+        'education_level': EDUCATION_LEVELS + ['Unknown'],
+        'occupation_category': OCCUPATION_CATEGORIES + ['Unknown'],
+        'work_class': WORK_CLASSES + ['Unknown'],
+        'marital_status': MARITAL_STATUSES + ['Unknown'],
+        'sex': SEXES + ['Unknown'],
+        'race': RACES + ['Unknown'],
+    }
+    columns = {}
+    for field, column in PROFILE_COLUMNS.items():
+        if field in options:
+            columns[column] = [options[field][i] for i in rng.integers(0, len(options[field]), n)]
+        else:
+            columns[column] = rng.integers(0, 120, n).tolist()
+    return columns
+
+def random_profiles(n, seed=0):
+    """Synthetic UserProfile payloads drawn uniformly from the option lists and input ranges."""
+    rng = np.random.default_rng(seed)
+    options = {
+        'education_level': EDUCATION_LEVELS,
+        'work_class': WORK_CLASSES,
+        'marital_status': MARITAL_STATUSES,
+        'sex': SEXES,
+        'occupation_category': OCCUPATION_CATEGORIES,
+        'race': RACES,
+    }
+    columns = {field: rng.integers(0, len(values), n) for field, values in options.items()}
+    ages = rng.integers(AGE_RANGE[0], AGE_RANGE[1] + 1, n)
+    hours = rng.integers(HOURS_RANGE[0], HOURS_RANGE[1] + 1, n)
+    return [
+        {'age': int(ages[i]), 'hours_per_week': int(hours[i]),
+         **{field: options[field][columns[field][i]] for field in options}}
+        for i in range(n)
+    ]
@@ -0,0 +1,170 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.columnar import INTEGER_FIELDS, STRING_FIELDS, OUTPUT_COLUMNS, validate_columns
+from app.predictor import load_predictor, PROFILE_COLUMNS, MODEL_FORMATS
+from app.registry import resolve_models_dir
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+SCORE_CHUNK_ROWS = int(os.environ.get("SCORE_CHUNK_ROWS", "100000"))
+
+# Set in each worker process by _init_worker
+_predictor = None
+
+
+def read_chunks(path, chunk_rows=SCORE_CHUNK_ROWS, columns=None):
+    """
+    Yields DataFrames of at most chunk_rows rows from a CSV or Parquet file, or a directory of
+    Parquet files (a partitioned dataset), in file order.
+    """
+    if os.path.isdir(path):
+        dataset = ds.dataset(path, format='parquet')
+        # Batches never span files, so a chunk may be shorter than chunk_rows
+        for batch in dataset.to_batches(batch_size=chunk_rows, columns=columns):
+            if batch.num_rows:
+                yield batch.to_pandas()
+    elif path.endswith('.parquet'):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        # Categorical fields stay strings, as in the JSON API ("1" is not the number 1)
+        yield from pd.read_csv(path, chunksize=chunk_rows, usecols=columns,
+                               dtype={field: 'string' for field in STRING_FIELDS})
+
+
+def normalize_chunk(df):
+    """
+    Applies the UserProfile rules of the bulk API (app.columnar.validate_columns) to a chunk.
+    Returns the model input (ACS column -> array) for the valid rows, the valid row mask and
+    an error message per row (None when valid).
+    """
+    arrays = {}
+    for field in INTEGER_FIELDS:
+        # Text that is not a number stays a non-null NaN, so its row fails as "not an integer"
+        values = pd.to_numeric(df[field], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        arrays[field] = pa.array(values, mask=df[field].isna().to_numpy())
+    for field in STRING_FIELDS:
+        arrays[field] = pa.array(df[field].astype('string'), type=pa.string())
+    return validate_columns(arrays)
+
+
+def score_chunk(predictor, df):
+    """Returns a DataFrame with low, mid and high (NaN for invalid rows) and the row errors."""
+    columns, valid, errors = normalize_chunk(df)
+    ranges = np.full((len(df), 3), np.nan)
+    if valid.any():
+        ranges[valid] = predictor.predict_columns(columns)
+    result = pd.DataFrame(ranges, columns=OUTPUT_COLUMNS, index=df.index)
+    result['error'] = pd.array(errors, dtype='string')
+    return result
+
+
+def _init_worker(models_dir, model_format):
+    global _predictor
+    _predictor = load_predictor(models_dir, model_format)
+
+
+def _score_in_worker(df):
+    if _predictor is None:
+        raise FileNotFoundError("No salary models found. Please train them first.")
+    return score_chunk(_predictor, df)
+
+
+class _ImmediateResult:
+    # Future-like wrapper for in-process scoring
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+
+def score_file(input_path, output_path, models_dir=MODELS_DIR, version=None, model_format='auto',
+               workers=None, chunk_rows=SCORE_CHUNK_ROWS, keep_columns=()):
+    """
+    Scores every profile of input_path (CSV, Parquet or a Parquet directory) and streams the
+    results to a Parquet file in input order, one row group per chunk. Chunks are scored in a
+    process pool with at most 2 x workers chunks in flight, so memory stays bounded whatever
+    the file size.
+    """
+    _, models_dir = resolve_models_dir(models_dir, version)
+    workers = workers or os.cpu_count()
+    if workers > 1:
+        # Each worker predicts single-threaded; must be set before the workers import xgboost
+        os.environ.setdefault('OMP_NUM_THREADS', '1')
+    chunks = read_chunks(input_path, chunk_rows, list(PROFILE_COLUMNS) + list(keep_columns))
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(models_dir, model_format))
+        submit = lambda df: executor.submit(_score_in_worker, df)
+    else:
+        executor = None
+        _init_worker(models_dir, model_format)
+        submit = lambda df: _ImmediateResult(_score_in_worker(df))
+
+    writer = None
+    rows = 0
+    start = time.perf_counter()
+    pending = deque()
+    try:
+        def write_next():
+            nonlocal writer, rows
+            df, future = pending.popleft()
+            result = future.result()
+            if keep_columns:
+                result = pd.concat([df.reset_index(drop=True), result.reset_index(drop=True)], axis=1)
+            table = pa.Table.from_pandas(result, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+            rows += len(result)
+            elapsed = time.perf_counter() - start
+            print(f"Scored {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+        for df in chunks:
+            # Only the pass-through columns stay in the parent until the chunk is written
+            pending.append((df[list(keep_columns)], submit(df[list(PROFILE_COLUMNS)])))
+            if len(pending) >= 2 * workers:
+                write_next()
+        while pending:
+            write_next()
+    finally:
+        if writer is not None:
+            writer.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {rows} predictions to {output_path} in {elapsed:.1f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/s, {workers} worker(s), {chunk_rows} rows per chunk).")
+    return {'rows': rows, 'seconds': elapsed, 'rows_per_second': rows / max(elapsed, 1e-9)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Score a CSV or Parquet file of profiles (columns named like the UserProfile fields) "
+                    "with the ACS salary models and write low, median and high to Parquet.")
+    parser.add_argument('input', help="CSV or Parquet file, or a directory of Parquet files.")
+    parser.add_argument('output', help="Parquet file to write.")
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    parser.add_argument('--version', default=None, help="Registry model version (default: current).")
+    parser.add_argument('--model-format', choices=MODEL_FORMATS, default='auto')
+    parser.add_argument('--workers', type=int, default=None, help="Scoring processes (default: CPU count).")
+    parser.add_argument('--chunk-rows', type=int, default=SCORE_CHUNK_ROWS)
+    parser.add_argument('--keep-columns', nargs='*', default=[],
+                        help="Input columns copied to the output (e.g. an employee id).")
+    args = parser.parse_args()
+    score_file(args.input, args.output, args.models_dir, args.version, args.model_format, args.workers,
+               args.chunk_rows, args.keep_columns)
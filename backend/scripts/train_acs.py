@@ -1,52 +1,109 @@
+import argparse
+import json
+import resource
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 import joblib
+import numpy as np
 import pandas as pd
+import xgboost as xgb
 from sklearn.compose import ColumnTransformer
+from sklearn.metrics import mean_pinball_loss
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.pipeline import Pipeline
 from xgboost import XGBRegressor
 import os
-from ingest import load_acs_data
+import sys
+from ingest import load_acs_data, acs_partition_files, read_acs_partition, load_acs_partitions
+
+# Add the project root to the Python path to allow for absolute imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.registry import publish_version, resolve_models_dir
+from app.predictor import SalaryPredictor, load_salary_predictor
 
 MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
 LOW_MODEL_PATH = os.path.join(MODELS_DIR, 'acs_low.joblib')
 MID_MODEL_PATH = os.path.join(MODELS_DIR, 'acs_mid.joblib')
 HIGH_MODEL_PATH = os.path.join(MODELS_DIR, 'acs_high.joblib')
+# Single model that outputs all three quantiles in one traversal
+QUANTILES_MODEL_PATH = os.path.join(MODELS_DIR, 'acs_quantiles.joblib')
+
+# Quantiles to predict
+QUANTILES = [0.1, 0.5, 0.9]
+
+# Define categorical and numerical features
+CATEGORICAL_FEATURES = ['SCHL', 'MAR', 'SEX', 'COW', 'OCCP']
+NUMERICAL_FEATURES = ['AGEP', 'WKHP']
+
+DEFAULT_XGB_PARAMS = dict(
+    n_estimators=250,
+    max_depth=6,
+    learning_rate=0.05,
+    subsample=0.8,
+    colsample_bytree=0.8,
+    random_state=42,
+    n_jobs=-1
+)
+# Written by tune_acs.py; its parameters override the defaults above when the file exists
+TUNED_PARAMS_PATH = os.environ.get(
+    'ACS_TUNED_PARAMS', os.path.join(os.path.dirname(__file__), '..', 'config', 'acs_xgb_params.json'))
+
+def load_xgb_params(path=TUNED_PARAMS_PATH):
+    """The XGBoost parameters for the salary models: the defaults, updated from the tuning config if present."""
+    params = dict(DEFAULT_XGB_PARAMS)
+    if os.path.exists(path):
+        with open(path) as f:
+            params.update(json.load(f)['params'])
+        print(f"Using tuned XGBoost parameters from {path}.")
+    return params
+
+XGB_PARAMS = load_xgb_params()
+
+def build_preprocessor():
+    """Creates the preprocessing step shared by all ACS salary models."""
+    return ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), NUMERICAL_FEATURES),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES)
+        ])
 
-def train_and_save_quantile_regressors():
+def save_native_models(model_paths, pipelines):
     """
-    Trains and saves three XGBoost quantile regressors for the 10th, 50th, and 90th percentiles.
+    Writes the boosters as UBJSON plus a JSON sidecar with the fitted preprocessing,
+    which the API loads without unpickling sklearn. Returns the written paths.
     """
-    print("Loading ACS data for quantile regression...")
-    X, y = load_acs_data()
+    if len(pipelines) == 1:
+        predictor = SalaryPredictor(model_paths, quantiles_pipeline=pipelines[0])
+    else:
+        low, mid, high = pipelines
+        predictor = SalaryPredictor(model_paths, low_pipeline=low, mid_pipeline=mid, high_pipeline=high)
+    return predictor.save_native(MODELS_DIR)
 
-    # Define categorical and numerical features
-    categorical_features = ['SCHL', 'MAR', 'SEX', 'COW', 'OCCP']
-    numerical_features = ['AGEP', 'WKHP']
+def train_and_save_quantile_regressors(X=None, y=None, publish=True):
+    """
+    Trains and saves three XGBoost quantile regressors for the 10th, 50th, and 90th percentiles.
+    With publish, the models are also registered as a new version in the model registry.
+    """
+    if X is None:
+        print("Loading ACS data for quantile regression...")
+        X, y = load_acs_data()
 
     # Create the preprocessing pipeline
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ('num', StandardScaler(), numerical_features),
-            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
-        ])
+    preprocessor = build_preprocessor()
 
-    # Quantiles to predict
-    quantiles = [0.1, 0.5, 0.9]
     model_paths = [LOW_MODEL_PATH, MID_MODEL_PATH, HIGH_MODEL_PATH]
+    pipelines = []
 
-    for quantile, path in zip(quantiles, model_paths):
+    start = time.perf_counter()
+    for quantile, path in zip(QUANTILES, model_paths):
         print(f"Training model for quantile: {quantile}")
 
         model = XGBRegressor(
             objective='reg:quantileerror',
             quantile_alpha=quantile,
-            n_estimators=250, # Tuned for performance
-            max_depth=6,
-            learning_rate=0.05,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            random_state=42,
-            n_jobs=-1
+            **XGB_PARAMS
         )
 
         pipeline = Pipeline(steps=[('preprocessor', preprocessor),
@@ -57,7 +114,358 @@ def train_and_save_quantile_regressors():
         print(f"Saving model to {path}...")
         os.makedirs(MODELS_DIR, exist_ok=True)
         joblib.dump(pipeline, path)
+        pipelines.append(pipeline)
         print("Model saved successfully.")
 
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(path) for path in model_paths)
+    print(f"Trained {len(model_paths)} quantile models in {elapsed:.1f}s ({size / 1024:.0f} KiB on disk).")
+    native_paths = save_native_models(model_paths, pipelines)
+    if publish:
+        publish_version(MODELS_DIR, model_paths + native_paths, source='train_acs', quantiles=QUANTILES)
+    return elapsed
+
+def save_quantile_boosters(preprocessor, boosters, quantiles, publish=True, **metadata):
+    """
+    Saves boosters trained outside Pipeline.fit (one per quantile, or one multi-quantile
+    booster) with the same Pipeline(preprocessor, XGBRegressor) artifacts as the fit loops.
+    """
+    if len(boosters) == 1:
+        model_paths, alphas = [QUANTILES_MODEL_PATH], [quantiles]
+    else:
+        model_paths, alphas = [LOW_MODEL_PATH, MID_MODEL_PATH, HIGH_MODEL_PATH], quantiles
+    pipelines = []
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    for alpha, booster, path in zip(alphas, boosters, model_paths):
+        model = XGBRegressor(objective='reg:quantileerror', quantile_alpha=alpha, **XGB_PARAMS)
+        model.load_model(bytearray(booster.save_raw('ubj')))
+        pipeline = Pipeline(steps=[('preprocessor', preprocessor), ('regressor', model)])
+        joblib.dump(pipeline, path)
+        pipelines.append(pipeline)
+    size = sum(os.path.getsize(path) for path in model_paths)
+    print(f"Saved {len(model_paths)} model(s) ({size / 1024:.0f} KiB on disk).")
+    native_paths = save_native_models(model_paths, pipelines)
+    if publish:
+        publish_version(MODELS_DIR, model_paths + native_paths, source='train_acs', quantiles=quantiles, **metadata)
+    return model_paths
+
+def _train_quantile_booster(dtrain, quantile, nthread, num_boost_round=None, xgb_model=None):
+    params = {name: value for name, value in XGB_PARAMS.items() if name not in ('n_estimators', 'n_jobs')}
+    params.update(objective='reg:quantileerror', quantile_alpha=quantile, nthread=nthread)
+    return xgb.train(params, dtrain, num_boost_round=num_boost_round or XGB_PARAMS['n_estimators'],
+                     xgb_model=xgb_model)
+
+def train_and_save_quantile_regressors_parallel(X=None, y=None, publish=True, n_threads=None):
+    """
+    Same models and artifacts as train_and_save_quantile_regressors, but the preprocessor
+    is fitted once, the encoded matrix is built once as a shared QuantileDMatrix, and the
+    quantile models train concurrently with the available threads split between them.
+    """
+    if X is None:
+        print("Loading ACS data for quantile regression...")
+        X, y = load_acs_data()
+
+    n_threads = n_threads or os.cpu_count()
+    # Never more busy threads than cores: with fewer cores than models, models take turns
+    concurrent_models = min(len(QUANTILES), n_threads)
+    threads_per_model = max(1, n_threads // concurrent_models)
+
+    start = time.perf_counter()
+    preprocessor = build_preprocessor().fit(X)
+    dtrain = xgb.QuantileDMatrix(preprocessor.transform(X), label=y, nthread=n_threads)
+    prepared = time.perf_counter()
+    print(f"Encoded {dtrain.num_row()} rows once in {prepared - start:.1f}s; training {len(QUANTILES)} models, "
+          f"{concurrent_models} at a time with {threads_per_model} threads each...")
+    # xgboost releases the GIL while training, so threads are enough to run the models side by side
+    with ThreadPoolExecutor(max_workers=concurrent_models) as executor:
+        boosters = list(executor.map(lambda q: _train_quantile_booster(dtrain, q, threads_per_model), QUANTILES))
+    elapsed = time.perf_counter() - start
+
+    print(f"Trained {len(boosters)} quantile models in {elapsed:.1f}s (encoding {prepared - start:.1f}s).")
+    save_quantile_boosters(preprocessor, boosters, QUANTILES, publish)
+    return elapsed
+
+class PartitionIter(xgb.DataIter):
+    """Feeds ACS partition files to XGBoost one at a time, encoded with a fitted preprocessor."""
+
+    def __init__(self, files, preprocessor, cache_prefix=None):
+        self._files = files
+        self._preprocessor = preprocessor
+        self._index = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._index == len(self._files):
+            return False
+        X, y = read_acs_partition(self._files[self._index])
+        input_data(data=self._preprocessor.transform(X), label=y.to_numpy())
+        self._index += 1
+        return True
+
+    def reset(self):
+        self._index = 0
+
+def fit_preprocessor_streaming(files):
+    """
+    Fits the preprocessor without loading all partitions at once: StandardScaler statistics
+    via partial_fit and the union of categories seen, one partition at a time.
+    """
+    scaler = StandardScaler()
+    categories = {column: set() for column in CATEGORICAL_FEATURES}
+    for path in files:
+        X, _ = read_acs_partition(path)
+        scaler.partial_fit(X[NUMERICAL_FEATURES])
+        for column in CATEGORICAL_FEATURES:
+            categories[column].update(X[column].unique())
+
+    # Same layout as build_preprocessor (OneHotEncoder sorts the categories it finds);
+    # fitting on one partition fixes the column layout, then the full-data statistics are set
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), NUMERICAL_FEATURES),
+            ('cat', OneHotEncoder(handle_unknown='ignore',
+                                  categories=[sorted(categories[column]) for column in CATEGORICAL_FEATURES]),
+             CATEGORICAL_FEATURES)
+        ])
+    preprocessor.fit(read_acs_partition(files[0])[0])
+    fitted_scaler = preprocessor.named_transformers_['num']
+    for attribute in ('mean_', 'var_', 'scale_', 'n_samples_seen_'):
+        setattr(fitted_scaler, attribute, getattr(scaler, attribute))
+    return preprocessor
+
+def train_and_save_quantile_regressors_external(partitions_dir, states=None, multi_quantile=False,
+                                                external_memory=True, n_threads=None, publish=True):
+    """
+    Trains the quantile models from partitioned feature data (ingest.py) without holding it
+    in memory: the preprocessor is fitted in one streaming pass, then XGBoost reads the
+    encoded partitions through a DataIter, into an on-disk ExtMemQuantileDMatrix (or, without
+    external_memory, a compressed in-memory QuantileDMatrix). Writes the usual artifacts.
+    """
+    files = acs_partition_files(partitions_dir, states)
+    if not files:
+        raise FileNotFoundError(f"No ACS partitions found in {partitions_dir}. Please run ingest.py first.")
+    n_threads = n_threads or os.cpu_count()
+
+    start = time.perf_counter()
+    preprocessor = fit_preprocessor_streaming(files)
+    fitted = time.perf_counter()
+    print(f"Fitted preprocessor on {len(files)} partitions in {fitted - start:.1f}s.")
+
+    with tempfile.TemporaryDirectory(prefix='acs-xgb-cache-') as cache_dir:
+        if external_memory:
+            iterator = PartitionIter(files, preprocessor, cache_prefix=os.path.join(cache_dir, 'cache'))
+            dtrain = xgb.ExtMemQuantileDMatrix(iterator, nthread=n_threads)
+        else:
+            dtrain = xgb.QuantileDMatrix(PartitionIter(files, preprocessor), nthread=n_threads)
+        rows = dtrain.num_row()
+        built = time.perf_counter()
+        print(f"Built {'external-memory' if external_memory else 'in-memory'} training matrix with "
+              f"{rows} rows in {built - fitted:.1f}s.")
+
+        # One model at a time: external-memory training streams its pages, so concurrent
+        # models would compete for the same disk and memory bandwidth
+        alphas = [QUANTILES] if multi_quantile else QUANTILES
+        boosters = [_train_quantile_booster(dtrain, alpha, n_threads) for alpha in alphas]
+        # Release the cache pages before their directory is removed
+        del dtrain
+
+    elapsed = time.perf_counter() - start
+    # Peak resident memory of this process (kilobytes on Linux)
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Trained {len(boosters)} model(s) on {rows} rows in {elapsed:.1f}s "
+          f"(peak memory {peak_rss_mb:.0f} MB).")
+    save_quantile_boosters(preprocessor, boosters, QUANTILES, publish, partitions=len(files))
+    return {'rows': rows, 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb}
+
+def train_and_save_multi_quantile_regressor(X=None, y=None, publish=True):
+    """
+    Trains and saves one XGBoost regressor that predicts the 10th, 50th, and 90th percentiles together.
+    With publish, the model is also registered as a new version in the model registry.
+    """
+    if X is None:
+        print("Loading ACS data for multi-quantile regression...")
+        X, y = load_acs_data()
+
+    model = XGBRegressor(
+        objective='reg:quantileerror',
+        quantile_alpha=QUANTILES,
+        **XGB_PARAMS
+    )
+
+    pipeline = Pipeline(steps=[('preprocessor', build_preprocessor()),
+                               ('regressor', model)])
+
+    print(f"Training multi-quantile model for quantiles: {QUANTILES}")
+    start = time.perf_counter()
+    pipeline.fit(X, y)
+    elapsed = time.perf_counter() - start
+
+    print(f"Saving model to {QUANTILES_MODEL_PATH}...")
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    joblib.dump(pipeline, QUANTILES_MODEL_PATH)
+    size = os.path.getsize(QUANTILES_MODEL_PATH)
+    print(f"Trained multi-quantile model in {elapsed:.1f}s ({size / 1024:.0f} KiB on disk).")
+    native_paths = save_native_models([QUANTILES_MODEL_PATH], [pipeline])
+    if publish:
+        publish_version(MODELS_DIR, [QUANTILES_MODEL_PATH] + native_paths, source='train_acs', quantiles=QUANTILES)
+    return elapsed
+
+# Boosting rounds added per incremental update, and the most rounds a model may reach through
+# updates; past the budget a full retrain is needed
+INCREMENTAL_ROUNDS = int(os.environ.get('ACS_INCREMENTAL_ROUNDS', '50'))
+TREE_BUDGET = int(os.environ.get('ACS_TREE_BUDGET', '1000'))
+
+def unknown_categories(preprocessor, X):
+    """
+    Values of X the fitted one-hot encoder has never seen, per categorical column. They
+    would be encoded as all zeros, so the existing trees could not tell them apart.
+    """
+    fitted = {name: list(columns) for name, _, columns in preprocessor.transformers_ if name != 'remainder'}
+    if fitted != {'num': NUMERICAL_FEATURES, 'cat': CATEGORICAL_FEATURES}:
+        raise ValueError(f"The models were fitted on different features ({fitted}); run a full retrain.")
+    encoder = preprocessor.named_transformers_['cat']
+    unknown = {}
+    for column, categories in zip(CATEGORICAL_FEATURES, encoder.categories_):
+        values = sorted(set(X[column].dropna().unique()) - set(categories.tolist()))
+        if values:
+            unknown[column] = values
+    return unknown
+
+def predict_quantile_boosters(preprocessor, boosters, X):
+    """(n, 3) low, mid, high from one multi-quantile booster or the three quantile boosters."""
+    encoded = preprocessor.transform(X)
+    outputs = [booster.inplace_predict(encoded) for booster in boosters]
+    if len(outputs) == 1:
+        return outputs[0].reshape(-1, len(QUANTILES))
+    return np.column_stack(outputs)
+
+def quantile_scores(y, ranges):
+    """Mean pinball loss of each quantile and the share of y inside [low, high]."""
+    y = np.asarray(y)
+    scores = {f'pinball_{quantile}': mean_pinball_loss(y, ranges[:, i], alpha=quantile)
+              for i, quantile in enumerate(QUANTILES)}
+    scores['coverage'] = float(np.mean((y >= ranges[:, 0]) & (y <= ranges[:, -1])))
+    return scores
+
+def continue_quantile_boosters(pipelines, X, y, rounds=INCREMENTAL_ROUNDS, tree_budget=TREE_BUDGET,
+                               allow_unknown_categories=False, n_threads=None):
+    """
+    Adds up to `rounds` boosting rounds fitted to X, y to each fitted quantile pipeline,
+    keeping its preprocessor, so the new trees correct the existing ones on the new rows.
+    Returns the preprocessor, the updated boosters and the rounds added.
+    """
+    preprocessor = pipelines[0].named_steps['preprocessor']
+    unknown = unknown_categories(preprocessor, X)
+    if unknown:
+        listed = '; '.join(f"{column}: {values}" for column, values in unknown.items())
+        if not allow_unknown_categories:
+            raise ValueError(f"The new data has categories the models were not fitted on ({listed}). "
+                             f"Run a full retrain, or allow them to be encoded as unknown.")
+        print(f"Warning: encoding unseen categories as unknown ({listed}).")
+    scaler = preprocessor.named_transformers_['num']
+    shift = (X[NUMERICAL_FEATURES].mean().to_numpy() - scaler.mean_) / scaler.scale_
+    print("Mean shift of the new data, in fitted standard deviations: " +
+          ', '.join(f"{column} {value:+.2f}" for column, value in zip(NUMERICAL_FEATURES, shift)))
+
+    boosters = [pipeline[-1].get_booster() for pipeline in pipelines]
+    existing = boosters[0].num_boosted_rounds()
+    rounds = min(rounds, tree_budget - existing)
+    if rounds <= 0:
+        raise ValueError(f"The models already have {existing} boosting rounds and the budget is "
+                         f"{tree_budget}; run a full retrain.")
+    n_threads = n_threads or os.cpu_count()
+    dtrain = xgb.QuantileDMatrix(preprocessor.transform(X), label=y, nthread=n_threads)
+    alphas = [QUANTILES] if len(boosters) == 1 else QUANTILES
+    updated = [_train_quantile_booster(dtrain, alpha, n_threads, rounds, xgb_model=booster)
+               for alpha, booster in zip(alphas, boosters)]
+    return preprocessor, updated, rounds
+
+def train_and_save_incremental(X=None, y=None, base_version=None, rounds=INCREMENTAL_ROUNDS,
+                               tree_budget=TREE_BUDGET, holdout=0.2, allow_unknown_categories=False,
+                               n_threads=None, publish=True):
+    """
+    Updates the current registry version (or base_version) with new data only, instead of
+    retraining on everything: see continue_quantile_boosters. A holdout share of the new rows
+    is left out of the update and scores the models before and after it. Writes the usual
+    artifacts and publishes them as a new version.
+    """
+    if X is None:
+        print("Loading ACS data for the incremental update...")
+        X, y = load_acs_data()
+    version, models_dir = resolve_models_dir(MODELS_DIR, base_version)
+    predictor = load_salary_predictor(models_dir)
+    if predictor is None:
+        raise FileNotFoundError(f"No salary models found in {models_dir}. Please train them first.")
+
+    held_out = np.random.default_rng(0).random(len(X)) < holdout
+    X_train, y_train = X[~held_out], y[~held_out]
+    X_eval, y_eval = X[held_out], y[held_out]
+    start = time.perf_counter()
+    preprocessor, boosters, rounds = continue_quantile_boosters(
+        predictor.pipelines, X_train, y_train, rounds, tree_budget, allow_unknown_categories, n_threads)
+    elapsed = time.perf_counter() - start
+    total_rounds = boosters[0].num_boosted_rounds()
+    print(f"Added {rounds} boosting rounds ({total_rounds} in total) to {len(boosters)} model(s) "
+          f"on {len(X_train)} new rows in {elapsed:.1f}s.")
+
+    report = {'base_version': version, 'rows': len(X_train), 'rounds_added': rounds,
+              'total_rounds': total_rounds, 'seconds': elapsed}
+    if len(X_eval):
+        before = quantile_scores(y_eval, predictor.predict_ranges(X_eval))
+        after = quantile_scores(y_eval, predict_quantile_boosters(preprocessor, boosters, X_eval))
+        print(f"On {len(X_eval)} held-out new rows (before -> after):")
+        for name in before:
+            print(f"  {name}: {before[name]:.4f} -> {after[name]:.4f}")
+        report.update(before=before, after=after)
+
+    save_quantile_boosters(preprocessor, boosters, QUANTILES, publish, incremental_from=version,
+                           rows_added=len(X_train), rounds_added=rounds)
+    return report
+
 if __name__ == "__main__":
-    train_and_save_quantile_regressors()
+    parser = argparse.ArgumentParser(description="Train the ACS salary range models.")
+    parser.add_argument('--multi-quantile', action='store_true',
+                        help="Train one model for all quantiles (acs_quantiles.joblib) instead of three.")
+    parser.add_argument('--parallel', action='store_true',
+                        help="Encode the data once and train the three quantile models concurrently.")
+    parser.add_argument('--threads', type=int, default=None,
+                        help="Threads shared by the concurrent models with --parallel, or used by --partitions "
+                             "and --incremental (default: CPU count).")
+    parser.add_argument('--partitions', default=None,
+                        help="Train out of core from partitioned data written by ingest.py (e.g. data/acs_partitions).")
+    parser.add_argument('--states', nargs='+', default=None, help="With --partitions, only use these states.")
+    parser.add_argument('--in-memory-matrix', action='store_true',
+                        help="With --partitions, build a compressed in-memory QuantileDMatrix instead of "
+                             "an on-disk external-memory one.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Continue boosting the current model version on the new data only (the "
+                             "--partitions/--states data, or the default ACS data) and publish a new version.")
+    parser.add_argument('--base-version', default=None, help="With --incremental, the version to update.")
+    parser.add_argument('--rounds', type=int, default=INCREMENTAL_ROUNDS,
+                        help="With --incremental, boosting rounds to add.")
+    parser.add_argument('--tree-budget', type=int, default=TREE_BUDGET,
+                        help="With --incremental, most boosting rounds a model may reach through updates.")
+    parser.add_argument('--allow-unknown-categories', action='store_true',
+                        help="With --incremental, encode categories the models were not fitted on as unknown.")
+    args = parser.parse_args()
+    if args.parallel and (args.multi_quantile or args.partitions or args.incremental):
+        parser.error("--parallel trains the three models from in-memory data; it cannot be combined with "
+                     "--multi-quantile, --partitions or --incremental.")
+    if args.incremental and args.multi_quantile:
+        parser.error("--incremental keeps the model layout of the base version; drop --multi-quantile.")
+    if args.threads is not None and not (args.parallel or args.partitions or args.incremental):
+        parser.error("--threads needs --parallel, --partitions or --incremental.")
+
+    if args.incremental:
+        X, y = load_acs_partitions(args.partitions, args.states) if args.partitions else (None, None)
+        train_and_save_incremental(X, y, args.base_version, args.rounds, args.tree_budget,
+                                   allow_unknown_categories=args.allow_unknown_categories, n_threads=args.threads)
+    elif args.partitions:
+        train_and_save_quantile_regressors_external(args.partitions, args.states, args.multi_quantile,
+                                                    not args.in_memory_matrix, args.threads)
+    elif args.multi_quantile:
+        train_and_save_multi_quantile_regressor()
+    elif args.parallel:
+        train_and_save_quantile_regressors_parallel(n_threads=args.threads)
+    else:
+        train_and_save_quantile_regressors()
@@ -0,0 +1,185 @@
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+import xgboost as xgb
+from sklearn.model_selection import KFold, train_test_split
+from ingest import load_acs_data
+from train_acs import build_preprocessor, QUANTILES, DEFAULT_XGB_PARAMS, TUNED_PARAMS_PATH
+
+# Trial scores: quantile loss relative to constant quantile predictions, plus LATENCY_WEIGHT
+# times the trees x depth traversal cost relative to the default configuration
+LATENCY_WEIGHT = 0.05
+REFERENCE_COST = DEFAULT_XGB_PARAMS['n_estimators'] * DEFAULT_XGB_PARAMS['max_depth']
+EARLY_STOPPING_ROUNDS = 25
+
+# Sampled per trial; the first trial is always the current default configuration
+SEARCH_SPACE = {
+    'max_depth': ('int', 3, 8),
+    'learning_rate': ('log', 0.02, 0.3),
+    'subsample': ('float', 0.6, 1.0),
+    'colsample_bytree': ('float', 0.6, 1.0),
+    'min_child_weight': ('log', 1.0, 20.0),
+    'reg_lambda': ('log', 0.1, 10.0),
+}
+
+# Set in each worker process by _init_worker
+_folds = None
+_nthread = None
+
+def quantile_loss(y, predictions, quantiles=QUANTILES):
+    """Mean pinball loss over rows and quantiles; predictions has one column per quantile."""
+    diff = np.asarray(y, dtype=np.float64)[:, None] - np.asarray(predictions, dtype=np.float64)
+    return float(np.mean(np.maximum(np.asarray(quantiles) * diff, (np.asarray(quantiles) - 1) * diff)))
+
+def sample_params(rng):
+    params = {}
+    for name, (kind, low, high) in SEARCH_SPACE.items():
+        if kind == 'int':
+            params[name] = int(rng.integers(low, high + 1))
+        elif kind == 'log':
+            params[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+        else:
+            params[name] = float(rng.uniform(low, high))
+    return params
+
+def _init_worker(X, y, folds, nthread):
+    # Every worker builds the fold matrices once and reuses them for all its trials
+    global _folds, _nthread
+    _nthread = nthread
+    _folds = []
+    for train_idx, val_idx in folds:
+        dtrain = xgb.QuantileDMatrix(X[train_idx], label=y[train_idx], nthread=nthread)
+        dval = xgb.QuantileDMatrix(X[val_idx], label=y[val_idx], ref=dtrain, nthread=nthread)
+        _folds.append((dtrain, dval))
+
+def _evaluate_trial(args):
+    """Cross-validates one configuration with up to max_rounds boosting rounds and early stopping."""
+    params, max_rounds = args
+    losses, rounds = [], []
+    for dtrain, dval in _folds:
+        booster = xgb.train(
+            {**params, 'objective': 'reg:quantileerror', 'quantile_alpha': QUANTILES, 'eval_metric': 'quantile',
+             'random_state': DEFAULT_XGB_PARAMS['random_state'], 'nthread': _nthread},
+            dtrain, num_boost_round=max_rounds, evals=[(dval, 'val')],
+            early_stopping_rounds=EARLY_STOPPING_ROUNDS, verbose_eval=False)
+        losses.append(booster.best_score)
+        rounds.append(booster.best_iteration + 1)
+    return {'loss': float(np.mean(losses)), 'n_estimators': int(np.mean(rounds)),
+            # Stopped before the budget in every fold: more rounds would not change the result
+            'converged': max(rounds) + EARLY_STOPPING_ROUNDS <= max_rounds}
+
+def score_trial(result, params, baseline_loss, latency_weight):
+    cost = result['n_estimators'] * params['max_depth']
+    return result['loss'] / baseline_loss + latency_weight * cost / REFERENCE_COST
+
+def successive_halving(trials, budgets, eta, executor, baseline_loss, latency_weight):
+    """
+    Evaluates all trials with the smallest round budget, keeps the best 1/eta, and repeats
+    with the next (larger) budget, so trials that fall behind are pruned early.
+    Returns every trial with its last result and score.
+    """
+    survivors = list(range(len(trials)))
+    for rung, budget in enumerate(budgets):
+        pending = [i for i in survivors if not trials[i].get('result', {}).get('converged')]
+        start = time.perf_counter()
+        for i, result in zip(pending, executor.map(_evaluate_trial, [(trials[i]['params'], budget) for i in pending])):
+            trials[i]['result'] = result
+            trials[i]['budget'] = budget
+        for i in survivors:
+            trials[i]['score'] = score_trial(trials[i]['result'], trials[i]['params'], baseline_loss, latency_weight)
+        survivors.sort(key=lambda i: trials[i]['score'])
+        best = trials[survivors[0]]
+        print(f"Rung {rung} ({budget} rounds): {len(pending)} trials evaluated in {time.perf_counter() - start:.1f}s, "
+              f"best score {best['score']:.4f} (loss {best['result']['loss']:.1f}, "
+              f"{best['result']['n_estimators']} trees x depth {best['params']['max_depth']})")
+        if rung < len(budgets) - 1:
+            survivors = survivors[:max(1, len(survivors) // eta)]
+    return trials, survivors[0]
+
+def tune(num_trials=24, max_rounds=1000, min_rounds=40, eta=3, folds=3, workers=None,
+         latency_weight=LATENCY_WEIGHT, test_size=0.2, output=TUNED_PARAMS_PATH, seed=0):
+    """Searches the XGBoost parameters of the salary models and writes the best ones to output."""
+    print("Loading ACS data...")
+    X, y = load_acs_data()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
+    # The one-hot layout does not depend on the parameters, so the data is encoded once
+    preprocessor = build_preprocessor().fit(X_train)
+    X_train_encoded = preprocessor.transform(X_train)
+    y_train = y_train.to_numpy()
+    fold_indices = list(KFold(n_splits=folds, shuffle=True, random_state=42).split(X_train_encoded))
+
+    # Constant quantile predictions: the loss scale the tuned models are compared against
+    baseline_loss = quantile_loss(y_train, np.tile(np.quantile(y_train, QUANTILES), (len(y_train), 1)))
+
+    rng = np.random.default_rng(seed)
+    default_params = {name: DEFAULT_XGB_PARAMS[name] for name in ('max_depth', 'learning_rate', 'subsample',
+                                                                   'colsample_bytree')}
+    trials = [{'params': default_params}] + [{'params': sample_params(rng)} for _ in range(num_trials - 1)]
+    budgets = []
+    budget = min_rounds
+    while budget < max_rounds:
+        budgets.append(budget)
+        budget *= eta
+    budgets.append(max_rounds)
+
+    workers = workers or os.cpu_count()
+    nthread = max(1, os.cpu_count() // workers)
+    print(f"Tuning {num_trials} trials with {folds}-fold CV on {len(y_train)} rows, round budgets {budgets}, "
+          f"{workers} worker processes x {nthread} threads...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(X_train_encoded, y_train, fold_indices, nthread)) as executor:
+        trials, best_index = successive_halving(trials, budgets, eta, executor, baseline_loss, latency_weight)
+    tuning_seconds = time.perf_counter() - start
+    best = trials[best_index]
+    params = {**best['params'], 'n_estimators': best['result']['n_estimators']}
+
+    # Held-out check of the chosen configuration against the defaults
+    X_test_encoded = preprocessor.transform(X_test)
+    held_out = {}
+    for name, candidate in [('default', DEFAULT_XGB_PARAMS), ('tuned', {**DEFAULT_XGB_PARAMS, **params})]:
+        booster_params = {k: v for k, v in candidate.items() if k not in ('n_estimators', 'n_jobs')}
+        booster = xgb.train({**booster_params, 'objective': 'reg:quantileerror', 'quantile_alpha': QUANTILES},
+                            xgb.QuantileDMatrix(X_train_encoded, label=y_train), candidate['n_estimators'])
+        held_out[name] = {
+            'quantile_loss': quantile_loss(y_test, booster.inplace_predict(X_test_encoded)),
+            'trees_x_depth': candidate['n_estimators'] * candidate['max_depth'],
+        }
+        print(f"Held-out {name}: quantile loss {held_out[name]['quantile_loss']:.1f}, "
+              f"{candidate['n_estimators']} trees x depth {candidate['max_depth']}")
+
+    config = {
+        'params': params,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'objective': {'latency_weight': latency_weight, 'reference_cost': REFERENCE_COST,
+                      'cv_score': best['score'], 'cv_quantile_loss': best['result']['loss']},
+        'held_out': held_out,
+        'search': {'trials': num_trials, 'budgets': budgets, 'eta': eta, 'folds': folds, 'seed': seed,
+                   'seconds': tuning_seconds},
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(config, f, indent=2)
+    print(f"Tuned in {tuning_seconds:.1f}s; wrote best parameters to {output}: {params}")
+    return config
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the XGBoost parameters of the ACS salary models.")
+    parser.add_argument('--trials', type=int, default=24, help="Configurations to try (the first is the default).")
+    parser.add_argument('--max-rounds', type=int, default=1000, help="Boosting round budget of the last rung.")
+    parser.add_argument('--min-rounds', type=int, default=40, help="Boosting round budget of the first rung.")
+    parser.add_argument('--eta', type=int, default=3, help="Keep the best 1/eta trials at each rung.")
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument('--latency-weight', type=float, default=LATENCY_WEIGHT,
+                        help="Weight of the trees x depth cost relative to the quantile loss.")
+    parser.add_argument('--output', default=TUNED_PARAMS_PATH, help="Config file read by train_acs.py.")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    tune(args.trials, args.max_rounds, args.min_rounds, args.eta, args.folds, args.workers,
+         args.latency_weight, output=args.output, seed=args.seed)
@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+
+# Add the project root and the scripts directory to the Python path, as the scripts do
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+MODEL_PARAMS = dict(n_estimators=20, max_depth=4, learning_rate=0.3, n_jobs=1)
+
+
+def training_data(n=3000, seed=0):
+    """Random profiles without unknown categories and a target that depends on every feature."""
+    import numpy as np
+    import pandas as pd
+    from sample_profiles import random_profile_columns
+
+    X = pd.DataFrame(random_profile_columns(n, seed=seed))
+    X = X[~(X == 'Unknown').any(axis=1)]
+    codes = sum(X[column].astype('category').cat.codes for column in X if X[column].dtype == object)
+    rng = np.random.default_rng(seed)
+    y = 20000 + X['AGEP'] * 700 + X['WKHP'] * 500 + codes * 900 + rng.normal(0, 10000, len(X))
+    return X, y
+
+
+def write_salary_models(models_dir, three_models=False):
+    """Trains small quantile pipelines and saves them in models_dir like scripts/train_acs.py does."""
+    import joblib
+    from sklearn.pipeline import Pipeline
+    from xgboost import XGBRegressor
+    from app.predictor import QUANTILES_REGRESSOR_FILE, LOW_REGRESSOR_FILE, MID_REGRESSOR_FILE, HIGH_REGRESSOR_FILE
+    from train_acs import build_preprocessor, QUANTILES
+
+    X, y = training_data()
+    if three_models:
+        layout = dict(zip([LOW_REGRESSOR_FILE, MID_REGRESSOR_FILE, HIGH_REGRESSOR_FILE], QUANTILES))
+    else:
+        layout = {QUANTILES_REGRESSOR_FILE: QUANTILES}
+    for name, alpha in layout.items():
+        model = XGBRegressor(objective='reg:quantileerror', quantile_alpha=alpha, **MODEL_PARAMS)
+        pipeline = Pipeline(steps=[('preprocessor', build_preprocessor()), ('regressor', model)]).fit(X, y)
+        joblib.dump(pipeline, os.path.join(models_dir, name))
+
+
+@pytest.fixture(scope='session')
+def salary_models():
+    return write_salary_models
+
+
+@pytest.fixture(scope='session')
+def client(tmp_path_factory):
+    """TestClient for app.main serving small models trained for the test session."""
+    from fastapi.testclient import TestClient
+
+    models_dir = tmp_path_factory.mktemp('api_models')
+    write_salary_models(str(models_dir))
+    with pytest.MonkeyPatch.context() as patch:
+        # Read when app.main is imported
+        patch.setenv('MODELS_DIR', str(models_dir))
+        patch.setenv('USE_PREDICTION_TABLE', '0')
+        patch.delenv('ADMIN_TOKEN', raising=False)
+        from app.main import app
+
+        with TestClient(app) as test_client:
+            yield test_client
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from app.batching import InferenceScheduler
+
+
+class RecordingPredict:
+    """predict(snapshot, profiles) stand-in: returns (profile, profile, profile) rows and logs each call."""
+
+    def __init__(self, fail_for=None):
+        self.calls = []
+        self.fail_for = fail_for
+        self._lock = threading.Lock()
+
+    def __call__(self, snapshot, profiles):
+        with self._lock:
+            self.calls.append((snapshot, list(profiles)))
+        if snapshot == self.fail_for:
+            raise RuntimeError(f"model {snapshot} failed")
+        return np.repeat(np.array(profiles, dtype=float)[:, None], 3, axis=1)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_submits_coalesce_into_one_predict():
+    predict = RecordingPredict()
+    scheduler = InferenceScheduler(predict, max_batch_size=16, window_seconds=0.05)
+
+    async def main():
+        results = await asyncio.gather(*(scheduler.submit('v1', [i, i + 10]) for i in range(4)))
+        await scheduler.close()
+        return results
+
+    results = run(main())
+    assert len(predict.calls) == 1
+    assert sorted(predict.calls[0][1]) == [0, 1, 2, 3, 10, 11, 12, 13]
+    for i, ranges in enumerate(results):
+        assert ranges[:, 0].tolist() == [i, i + 10]
+
+
+def test_request_over_max_batch_size_is_carried_into_the_next_batch():
+    predict = RecordingPredict()
+    scheduler = InferenceScheduler(predict, max_batch_size=4, window_seconds=0.05)
+
+    async def main():
+        results = await asyncio.gather(scheduler.submit('v1', [1, 2, 3]), scheduler.submit('v1', [4, 5, 6]),
+                                       scheduler.submit('v1', list(range(10))))
+        await scheduler.close()
+        return results
+
+    first, second, large = run(main())
+    assert [profiles for _, profiles in predict.calls] == [[1, 2, 3], [4, 5, 6], list(range(10))]
+    assert first[:, 0].tolist() == [1, 2, 3]
+    assert second[:, 0].tolist() == [4, 5, 6]
+    # A request larger than the batch size still opens (and fills) a batch of its own
+    assert large[:, 0].tolist() == list(range(10))
+
+
+def test_requests_on_different_snapshots_are_never_scored_together():
+    predict = RecordingPredict()
+    scheduler = InferenceScheduler(predict, max_batch_size=64, window_seconds=0.05)
+    old, new = object(), object()
+
+    async def main():
+        results = await asyncio.gather(scheduler.submit(old, [1, 2]), scheduler.submit(new, [3]),
+                                       scheduler.submit(old, [4]), scheduler.submit(new, [5, 6]))
+        await scheduler.close()
+        return results
+
+    results = run(main())
+    assert sorted((id(snapshot), profiles) for snapshot, profiles in predict.calls) == \
+        sorted([(id(old), [1, 2, 4]), (id(new), [3, 5, 6])])
+    assert [r[:, 0].tolist() for r in results] == [[1, 2], [3], [4], [5, 6]]
+
+
+def test_predict_errors_reach_every_caller_and_the_collector_keeps_running():
+    predict = RecordingPredict(fail_for='broken')
+    scheduler = InferenceScheduler(predict, max_batch_size=64, window_seconds=0.05)
+
+    async def main():
+        failed = await asyncio.gather(scheduler.submit('broken', [1]), scheduler.submit('broken', [2]),
+                                      return_exceptions=True)
+        ok = await scheduler.submit('v1', [3])
+        await scheduler.close()
+        return failed, ok
+
+    failed, ok = run(main())
+    assert all(isinstance(e, RuntimeError) and str(e) == "model broken failed" for e in failed)
+    assert ok[:, 0].tolist() == [3]
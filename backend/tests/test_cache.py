@@ -0,0 +1,51 @@
+from app.cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_the_ttl():
+    clock = FakeClock()
+    cache = PredictionCache(max_size=10, ttl_seconds=60, clock=clock)
+    cache.put('a', 1)
+    clock.now = 60
+    assert cache.get('a') == 1
+    clock.now = 60.5
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations'], stats['size']) == (1, 1, 1, 0)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = PredictionCache(max_size=2, clock=FakeClock())
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    stats = cache.stats()
+    assert (stats['evictions'], stats['size'], stats['hits'], stats['misses']) == (1, 2, 3, 1)
+    assert stats['hit_rate'] == 0.75
+
+
+def test_max_size_zero_disables_caching():
+    cache = PredictionCache(max_size=0)
+    cache.put('a', 1)
+    assert cache.get('a') is None
+    assert cache.stats()['size'] == 0
+
+
+def test_model_swap_clears_the_caches(client):
+    from app.main import prediction_cache, registry, trajectory_cache
+
+    prediction_cache.put(('stale',), 1)
+    trajectory_cache.put(('stale',), 1)
+    registry.reload()
+    assert prediction_cache.get(('stale',)) is None
+    assert trajectory_cache.get(('stale',)) is None
@@ -0,0 +1,101 @@
+import msgpack
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from app.columnar import (
+    ARROW_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, ColumnarError, read_columns, validate_columns
+)
+
+PROFILE = {
+    'age': 30, 'education_level': 'Bachelors', 'work_class': 'Private', 'marital_status': 'Never-married',
+    'sex': 'Male', 'hours_per_week': 40, 'occupation_category': 'Tech & Engineering', 'race': 'White',
+}
+MEDIA_TYPES = [ARROW_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]
+
+
+def profile_columns(n, **overrides):
+    columns = {field: [value] * n for field, value in PROFILE.items()}
+    columns.update(overrides)
+    return columns
+
+
+def encode(columns, media_type, types=None):
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(columns)
+    table = pa.table({field: pa.array(values, type=(types or {}).get(field)) for field, values in columns.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def row_errors(columns, media_type, types=None):
+    _, valid, errors = validate_columns(read_columns(encode(columns, media_type, types), media_type))
+    assert np.array_equal(valid, [error is None for error in errors])
+    return errors.tolist()
+
+
+@pytest.mark.parametrize('media_type', MEDIA_TYPES)
+def test_nulls_fail_only_their_row(media_type):
+    columns = profile_columns(3, age=[30, None, 40], sex=['Male', 'Female', None])
+    assert row_errors(columns, media_type) == [None, 'age: missing', 'sex: missing']
+
+
+@pytest.mark.parametrize('media_type', MEDIA_TYPES)
+def test_out_of_range_floats_fail_only_their_row(media_type):
+    columns = profile_columns(5, age=[30.0, 1e30, -1e19, 2.0 ** 63, 30.5])
+    assert row_errors(columns, media_type) == [None] + ['age: not an integer'] * 4
+
+
+def test_out_of_range_msgpack_integers_fail_only_their_row():
+    # MessagePack holds integers up to 2 ** 64 - 1, past the int64 range of the model input
+    columns = profile_columns(3, age=[30, 2 ** 63, 2 ** 64 - 1])
+    assert row_errors(columns, MSGPACK_MEDIA_TYPE) == [None] + ['age: not an integer'] * 2
+
+
+def test_arrow_uint64_above_int64_fails_only_its_row():
+    columns = profile_columns(2, age=[30, 2 ** 64 - 1])
+    assert row_errors(columns, ARROW_MEDIA_TYPE, {'age': pa.uint64()}) == [None, 'age: not an integer']
+
+
+def test_valid_rows_keep_their_values():
+    columns = profile_columns(3, age=[30, 2 ** 63, 45])
+    model_input, valid, _ = validate_columns(read_columns(encode(columns, MSGPACK_MEDIA_TYPE), MSGPACK_MEDIA_TYPE))
+    assert valid.tolist() == [True, False, True]
+    assert model_input['AGEP'].tolist() == [30, 45]
+
+
+@pytest.mark.parametrize('media_type', MEDIA_TYPES)
+def test_wrong_column_types_reject_the_request(media_type):
+    for columns in (profile_columns(2, age=['30', '40']), profile_columns(2, sex=[1, 2])):
+        with pytest.raises(ColumnarError) as error:
+            validate_columns(read_columns(encode(columns, media_type), media_type))
+        assert error.value.status_code == 422
+
+
+def test_mixed_msgpack_column_rejects_the_request():
+    with pytest.raises(ColumnarError, match="Column age"):
+        read_columns(encode(profile_columns(2, age=[30, 'x']), MSGPACK_MEDIA_TYPE), MSGPACK_MEDIA_TYPE)
+
+
+def test_mismatched_column_lengths_reject_the_request():
+    # Only MessagePack can express this: the columns of an Arrow IPC stream always have equal lengths
+    columns = profile_columns(2, age=[30, 40, 50])
+    with pytest.raises(ColumnarError, match="same length"):
+        read_columns(encode(columns, MSGPACK_MEDIA_TYPE), MSGPACK_MEDIA_TYPE)
+
+
+@pytest.mark.parametrize('media_type', MEDIA_TYPES)
+def test_missing_columns_reject_the_request(media_type):
+    columns = profile_columns(2)
+    del columns['race']
+    with pytest.raises(ColumnarError, match="Missing columns: race"):
+        read_columns(encode(columns, media_type), media_type)
+
+
+@pytest.mark.parametrize('media_type', MEDIA_TYPES)
+def test_empty_body_is_rejected(media_type):
+    with pytest.raises(ColumnarError) as error:
+        read_columns(b'', media_type)
+    assert error.value.status_code == 422
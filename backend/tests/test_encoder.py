@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.predictor import load_salary_predictor
+from sample_profiles import random_profile_columns
+
+
+@pytest.fixture(scope='module', params=['multi_quantile', 'three_models'])
+def predictor(request, tmp_path_factory, salary_models):
+    models_dir = tmp_path_factory.mktemp(request.param)
+    salary_models(str(models_dir), three_models=request.param == 'three_models')
+    return load_salary_predictor(str(models_dir))
+
+
+def test_native_encoder_matches_pipeline_for_a_batch(predictor):
+    # Covers every option, unknown categories and out-of-range integers
+    columns = random_profile_columns(5000, seed=1)
+    expected = predictor.predict_ranges(pd.DataFrame(columns))
+    actual = predictor.predict_columns(columns)
+    assert actual.dtype == expected.dtype
+    assert np.array_equal(actual, expected)
+
+
+def test_native_encoder_matches_pipeline_for_single_rows(predictor):
+    columns = random_profile_columns(200, seed=2)
+    for i in range(200):
+        row = {column: values[i:i + 1] for column, values in columns.items()}
+        assert np.array_equal(predictor.predict_columns(row), predictor.predict_ranges(pd.DataFrame(row)))
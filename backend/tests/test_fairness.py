@@ -0,0 +1,17 @@
+from mappings import SEXES
+
+PROFILE = {
+    'age': 30, 'education_level': 'Bachelors', 'work_class': 'Private', 'marital_status': 'Never-married',
+    'sex': 'Male', 'hours_per_week': 40, 'occupation_category': 'Tech & Engineering', 'race': 'Asian-Pac-Islander',
+}
+
+
+def test_race_is_left_out_when_the_models_do_not_read_it(client):
+    # The test models, like the served ones, use build_preprocessor, which drops RAC1P
+    result = client.post('/analyze_fairness', json=PROFILE).json()
+    assert result['race_in_model'] is False
+    assert result['race_counterfactual'] == result['original_prediction']
+    assert result['race_gap_percent'] == 0
+    assert {sex: list(races) for sex, races in result['prediction_matrix'].items()} == \
+        {sex: [PROFILE['race']] for sex in SEXES}
+    assert result['gap_matrix'][PROFILE['sex']][PROFILE['race']] == 0
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from app import forest as forest_module
+from app.forest import CompiledForest, SUPPORTED_OBJECTIVES
+
+
+def train_booster(objective, seed=0, **params):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(500, 4)).astype(np.float32)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    y = np.abs(np.nan_to_num(X[:, 0]) * 3 + np.nan_to_num(X[:, 1])) + 0.5
+    if objective in ('binary:logistic', 'reg:logistic'):
+        y = (y > np.median(y)).astype(np.float32)
+    booster = xgb.train({'objective': objective, 'max_depth': 4, 'nthread': 1, **params},
+                        xgb.DMatrix(X, label=y), num_boost_round=10)
+    return booster, X
+
+
+@pytest.mark.parametrize('objective', SUPPORTED_OBJECTIVES)
+def test_supported_objectives_match_xgboost(objective):
+    params = {'quantile_alpha': 0.5} if objective == 'reg:quantileerror' else {}
+    booster, X = train_booster(objective, **params)
+    expected = booster.inplace_predict(X)
+    np.testing.assert_allclose(CompiledForest.from_booster(booster).predict(X), expected, rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize('objective', ['reg:gamma', 'reg:tweedie', 'count:poisson', 'reg:logistic'])
+def test_other_objectives_are_rejected(objective):
+    booster, _ = train_booster(objective)
+    with pytest.raises(ValueError, match="Unsupported objective"):
+        CompiledForest.from_booster(booster)
+
+
+def test_row_blocks_give_the_same_margin_as_one_pass(monkeypatch):
+    booster, X = train_booster('reg:quantileerror', quantile_alpha=np.array([0.1, 0.5, 0.9]))
+    forest = CompiledForest.from_booster(booster)
+    whole = forest.predict_margin(X)
+    monkeypatch.setattr(forest_module, 'BLOCK_ROWS', 64)
+    assert np.array_equal(forest.predict_margin(X), whole)
+    np.testing.assert_allclose(forest.predict(X), booster.inplace_predict(X), rtol=1e-5, atol=1e-6)
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mappings import map_education, map_occupation, map_education_codes, map_occupation_codes
+
+# Every code, plus half codes, out-of-range codes and non-finite values
+MAPPINGS = [
+    (map_education, map_education_codes, np.arange(-2, 30, 0.5)),
+    (map_occupation, map_occupation_codes, np.arange(-2, 10_002, 0.5)),
+]
+
+
+@pytest.mark.parametrize('scalar_map, vector_map, codes', MAPPINGS, ids=['SCHL', 'OCCP'])
+def test_vectorized_mapping_matches_scalar_function(scalar_map, vector_map, codes):
+    codes = np.append(codes, [np.nan, -np.inf, np.inf])
+    expected = [scalar_map(code) for code in codes]
+    assert list(vector_map(codes)) == expected
+    assert list(vector_map(pd.Series(codes))) == expected
@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+from app import registry
+from app.registry import publish_version, read_manifest, resolve_models_dir
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_publishing_the_same_artifacts_twice_keeps_both_versions(tmp_path, monkeypatch):
+    artifact = tmp_path / 'acs_quantiles.joblib'
+    artifact.write_bytes(b'model')
+    # Same artifacts in the same second: same timestamp and fingerprint
+    monkeypatch.setattr(registry, 'datetime', FrozenDatetime)
+    first = publish_version(str(tmp_path), [str(artifact)])
+    second = publish_version(str(tmp_path), [str(artifact)])
+    assert second == first + '-2'
+    manifest = read_manifest(str(tmp_path))
+    assert [entry['version'] for entry in manifest['versions']] == [first, second]
+    assert manifest['current'] == second
+    _, version_dir = resolve_models_dir(str(tmp_path))
+    assert (tmp_path / version_dir / 'acs_quantiles.joblib').read_bytes() == b'model'
+    assert not [path for path in (tmp_path / 'registry').iterdir() if path.name.endswith('.tmp')]
@@ -0,0 +1,132 @@
+import gc
+
+import pytest
+
+from app import serve
+from app.serve import Supervisor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def supervisor(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(serve.time, 'monotonic', clock)
+    monkeypatch.setattr(serve, 'WORKER_MIN_UPTIME', 10)
+    monkeypatch.setattr(serve, 'WORKER_RESTART_BACKOFF', 0.5)
+    monkeypatch.setattr(serve, 'WORKER_RESTART_BACKOFF_MAX', 3)
+    monkeypatch.setattr(serve, 'WORKER_MAX_RESTARTS', 4)
+    monkeypatch.setattr(gc, 'freeze', lambda: None)
+    supervisor = Supervisor(app=None, registry=None, sock=None, workers=2, log_level='info')
+    supervisor.clock = clock
+    supervisor.signals = []
+    monkeypatch.setattr(supervisor, 'kill', lambda pid, signum: supervisor.signals.append((pid, signum)))
+    next_pid = iter(range(100, 1000))
+
+    def fork_worker():
+        pid = next(next_pid)
+        supervisor.workers[pid] = clock.now
+        return pid
+
+    monkeypatch.setattr(supervisor, 'fork_worker', fork_worker)
+    yield supervisor
+    for fd in (supervisor.command_r, supervisor.command_w, supervisor.wakeup_r, supervisor.wakeup_w):
+        serve.os.close(fd)
+
+
+def crash_after(supervisor, seconds):
+    """Starts a worker, lets it run for seconds, then reports it as exited; returns its restart delay."""
+    pid = supervisor.fork_worker()
+    supervisor.clock.now += seconds
+    supervisor.worker_exited(pid, 1)
+    if supervisor.stopping:
+        return None
+    return supervisor.pending_spawns.pop() - supervisor.clock.now
+
+
+def test_quick_crashes_back_off_exponentially_up_to_the_cap(supervisor):
+    assert [crash_after(supervisor, 1) for _ in range(4)] == [0.5, 1.0, 2.0, 3.0]
+
+
+def test_a_worker_that_ran_long_enough_resets_the_backoff(supervisor):
+    crash_after(supervisor, 1)
+    crash_after(supervisor, 1)
+    assert crash_after(supervisor, 60) == 0
+    assert crash_after(supervisor, 1) == 0.5
+
+
+def test_too_many_quick_crashes_stop_the_server(supervisor):
+    survivor = supervisor.fork_worker()
+    for _ in range(4):
+        assert crash_after(supervisor, 1) is not None
+    assert crash_after(supervisor, 1) is None
+    assert supervisor.stopping and supervisor.status == 1
+    assert (survivor, serve.signal.SIGTERM) in supervisor.signals
+
+
+class FakeRegistry:
+    class Snapshot:
+        version = 'v2'
+
+    def reload(self, version=None):
+        return self.Snapshot()
+
+
+def test_reload_replaces_workers_one_at_a_time(supervisor, monkeypatch):
+    supervisor.registry = FakeRegistry()
+    old = [supervisor.fork_worker() for _ in range(3)]
+    events = []
+    original_fork = supervisor.fork_worker
+
+    def fork_worker():
+        pid = original_fork()
+        events.append(('fork', pid))
+        return pid
+
+    def retire(pid):
+        events.append(('retire', pid))
+        supervisor.workers.pop(pid)
+
+    monkeypatch.setattr(supervisor, 'fork_worker', fork_worker)
+    monkeypatch.setattr(supervisor, 'retire', retire)
+    supervisor.reload()
+
+    assert [event for event, _ in events] == ['fork', 'retire'] * 3
+    assert [pid for event, pid in events if event == 'retire'] == old
+    assert len(supervisor.workers) == 3 and not set(old) & set(supervisor.workers)
+
+
+def test_reload_skips_workers_that_exited_meanwhile(supervisor, monkeypatch):
+    supervisor.registry = FakeRegistry()
+    first, second = supervisor.fork_worker(), supervisor.fork_worker()
+
+    def retire(pid):
+        supervisor.workers.pop(pid)
+        # The other old worker crashes while this one shuts down
+        if second in supervisor.workers:
+            supervisor.worker_exited(second, 1)
+
+    monkeypatch.setattr(supervisor, 'retire', retire)
+    supervisor.reload()
+    # One fork from the reload, one pending from the crash: back to two workers, not three
+    assert len(supervisor.workers) == 1 and len(supervisor.pending_spawns) == 1
+
+
+def test_reload_interrupted_by_stop_reports_unreplaced_workers(supervisor, monkeypatch, capsys):
+    supervisor.registry = FakeRegistry()
+    for _ in range(3):
+        supervisor.fork_worker()
+
+    def retire(pid):
+        supervisor.workers.pop(pid)
+        supervisor.stop()
+
+    monkeypatch.setattr(supervisor, 'retire', retire)
+    supervisor.reload()
+    assert "2 worker(s) still on the previous model version were not replaced" in capsys.readouterr().out
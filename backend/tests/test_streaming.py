@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from app.streaming import NDJSONStreamingResponse
+
+PROFILE = {
+    'age': 30, 'education_level': 'Bachelors', 'work_class': 'Private', 'marital_status': 'Never-married',
+    'sex': 'Male', 'hours_per_week': 40, 'occupation_category': 'Tech & Engineering', 'race': 'White',
+}
+
+
+def stream(client, chunks):
+    response = client.post('/predict_salary_range/stream', content=iter(chunks),
+                           headers={'content-type': 'application/x-ndjson'})
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_each_line_gets_its_own_result_in_input_order(client):
+    lines = [json.dumps(PROFILE), '{not json', json.dumps({**PROFILE, 'age': 'old'}), '[1, 2]',
+             json.dumps({**PROFILE, 'age': 50})]
+    body = ('\n'.join(lines) + '\n').encode()
+    # Chunk boundaries fall inside lines
+    results = stream(client, [body[i:i + 7] for i in range(0, len(body), 7)])
+
+    assert [result['index'] for result in results] == [0, 1, 2, 3, 4]
+    assert set(results[0]['prediction']) == {'lower_bound', 'median', 'upper_bound'}
+    assert results[1]['errors'][0]['type'] == 'json_invalid'
+    assert results[2]['errors'][0]['loc'] == ['age']
+    assert 'prediction' not in results[3] and results[3]['errors']
+    assert results[4]['prediction']['median'] != results[0]['prediction']['median']
+
+    batch = client.post('/predict_salary_range/batch', json={'profiles': [PROFILE]}).json()
+    assert results[0]['prediction'] == batch['results'][0]['prediction']
+
+
+def test_a_line_over_the_limit_ends_the_stream_after_the_earlier_lines(client):
+    valid = json.dumps(PROFILE).encode() + b'\n'
+    invalid = b'{not json\n'
+    too_long = b'{"age": "' + b'x' * 70000 + b'"}\n'
+    # The unfinished line outgrows the limit before its newline arrives
+    results = stream(client, [valid + invalid, too_long[:66000], too_long[66000:] + valid])
+
+    assert [result.get('index') for result in results] == [0, 1, None]
+    assert 'prediction' in results[0]
+    assert results[1]['errors'][0]['type'] == 'json_invalid'
+    assert results[2] == {'error': "Line 2 is longer than 65536 bytes."}
+
+
+def test_a_complete_line_over_the_limit_is_rejected_too(client):
+    valid = json.dumps(PROFILE).encode() + b'\n'
+    results = stream(client, [valid + b'{"age": "' + b'x' * 70000 + b'"}\n' + valid])
+    assert [result.get('index') for result in results] == [0, None]
+    assert results[1] == {'error': "Line 1 is longer than 65536 bytes."}
+
+
+def test_body_is_not_read_ahead_while_the_handler_is_busy():
+    received = 0
+    release = asyncio.Event()
+
+    async def receive():
+        nonlocal received
+        received += 1
+        return {'type': 'http.request', 'body': b'{}\n', 'more_body': received < 1000}
+
+    async def send(message):
+        pass
+
+    async def handle_batch(lines):
+        await release.wait()
+        return [b'{}\n' for _ in lines]
+
+    async def main():
+        response = NDJSONStreamingResponse(handle_batch, batch_size=1, max_pending_batches=2)
+        task = asyncio.create_task(response({'type': 'http'}, receive, send))
+        await asyncio.sleep(0.1)
+        # One batch in the handler, max_pending_batches queued, one waiting for queue space
+        stalled_at = received
+        release.set()
+        await task
+        return stalled_at
+
+    assert asyncio.run(main()) <= 4
+    assert received == 1000
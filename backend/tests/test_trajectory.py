@@ -0,0 +1,46 @@
+PROFILE = {
+    'age': 30, 'education_level': 'Bachelors', 'work_class': 'Private', 'marital_status': 'Never-married',
+    'sex': 'Male', 'hours_per_week': 40, 'occupation_category': 'Tech & Engineering', 'race': 'White',
+}
+
+
+def trajectory(client, profile=None, **request):
+    return client.post('/predict_salary_range/trajectory', json={'profile': {**PROFILE, **(profile or {})}, **request})
+
+
+def test_ages_outside_the_range_are_rejected(client):
+    for age in (15, 100, 10 ** 30):
+        response = trajectory(client, {'age': age})
+        assert response.status_code == 422
+        assert response.json()['detail'] == "age must be between 16 and 99."
+
+
+def test_hours_outside_the_range_are_rejected(client):
+    for request in ({'profile': {'hours_per_week': 10 ** 30}}, {'hours_per_week': [40, 0]},
+                    {'hours_per_week': [100]}):
+        response = trajectory(client, **request)
+        assert response.status_code == 422
+        assert response.json()['detail'] == "hours_per_week values must be between 1 and 99."
+
+
+def test_ages_stop_at_the_top_of_the_range(client):
+    response = trajectory(client, {'age': 95}, years_ahead=10, hours_per_week=[20, 40])
+    assert response.status_code == 200
+    result = response.json()
+    assert result['ages'] == [95, 96, 97, 98, 99]
+    assert [series['hours_per_week'] for series in result['series']] == [20, 40]
+    assert all(len(series['points']) == 5 for series in result['series'])
+
+
+def test_repeated_requests_are_answered_from_the_trajectory_cache(client):
+    from app.main import prediction_cache, trajectory_cache
+
+    first = trajectory(client, {'age': 41}, years_ahead=3)
+    before, prediction_before = trajectory_cache.stats(), prediction_cache.stats()
+    second = trajectory(client, {'age': 41}, years_ahead=3)
+    after = trajectory_cache.stats()
+    assert second.json() == first.json()
+    assert after['hits'] == before['hits'] + 1
+    assert after['misses'] == before['misses']
+    # Trajectories never take entries from the single-prediction cache
+    assert prediction_cache.stats()['size'] == prediction_before['size']
@@ -40,17 +40,23 @@ const FairnessAudit = ({ fairnessData, originalProfile }) => {
                         </span>
                     </p>
                 </div>
-                <div className="flex justify-between items-center">
+                {fairnessData.race_in_model === false ? (
                     <p className="text-slate-700">
-                        If race were <span className="font-bold">{oppositeRace}</span> instead of {originalProfile.race}:
+                        The model does not use race, so changing it cannot change this prediction.
                     </p>
-                    <p className="font-bold text-slate-800">
-                        {formatCurrency(fairnessData.race_counterfactual)}
-                        <span className={`ml-2 ${fairnessData.race_gap_percent >= 0 ? 'text-emerald-600' : 'text-red-600'}`}>
-                            ({fairnessData.race_gap_percent > 0 ? '+' : ''}{fairnessData.race_gap_percent}%)
-                        </span>
-                    </p>
-                </div>
+                ) : (
+                    <div className="flex justify-between items-center">
+                        <p className="text-slate-700">
+                            If race were <span className="font-bold">{oppositeRace}</span> instead of {originalProfile.race}:
+                        </p>
+                        <p className="font-bold text-slate-800">
+                            {formatCurrency(fairnessData.race_counterfactual)}
+                            <span className={`ml-2 ${fairnessData.race_gap_percent >= 0 ? 'text-emerald-600' : 'text-red-600'}`}>
+                                ({fairnessData.race_gap_percent > 0 ? '+' : ''}{fairnessData.race_gap_percent}%)
+                            </span>
+                        </p>
+                    </div>
+                )}
             </div>
         </motion.div>
     );
@@ -11,7 +11,7 @@ const cardVariants = {
 
 const formatCurrency = (value) => new Intl.NumberFormat('en-US', { style: 'currency', currency: 'USD', maximumFractionDigits: 0 }).format(value);
 
-const ResultsSection = ({ prediction, fairnessData, originalProfile }) => {
+const ResultsSection = ({ prediction, fairnessData, trajectory, originalProfile }) => {
   if (!prediction) {
     return (
       <div className="flex items-center justify-center h-full">
@@ -52,9 +52,11 @@ const ResultsSection = ({ prediction, fairnessData, originalProfile }) => {
       </motion.div>
 
       {/* Salary Graph */}
-      <motion.div variants={cardVariants}>
-        <SalaryGraph low={lower_bound} med={median} high={upper_bound} />
-      </motion.div>
+      {trajectory && (
+          <motion.div variants={cardVariants}>
+            <SalaryGraph trajectory={trajectory} />
+          </motion.div>
+      )}
 
       {/* Fairness Audit */}
       {fairnessData && (
@@ -50,12 +50,14 @@ const Home = () => {
   });
   const [prediction, setPrediction] = useState(null);
   const [fairnessData, setFairnessData] = useState(null);
+  const [trajectory, setTrajectory] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
 
   const handleCalculate = async () => {
     setIsLoading(true);
     setPrediction(null);
     setFairnessData(null);
+    setTrajectory(null);
 
     try {
       const payload = { ...formData };
@@ -81,6 +83,17 @@ const Home = () => {
           setFairnessData(fairnessResult);
       }
 
+      // --- 3. Get Salary Trajectory (one model pass for the whole chart) ---
+      const trajectoryResponse = await fetch("http://127.0.0.1:8000/predict_salary_range/trajectory", {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ profile: payload, years_ahead: 10 })
+      });
+      if (trajectoryResponse.ok) {
+          const trajectoryResult = await trajectoryResponse.json();
+          setTrajectory(trajectoryResult);
+      }
+
     } catch (error) {
       console.error("Error during calculation:", error);
       alert("An error occurred. Please check the console for details.");
@@ -117,11 +130,11 @@ const Home = () => {
             <div className="grid grid-cols-1 md:grid-cols-2 gap-x-6 gap-y-5">
               <div>
                 <FormLabel>Age</FormLabel>
-                <input type="number" name="age" value={formData.age} onChange={handleChange} className="w-full bg-slate-50 border-slate-200 rounded-lg p-3"/>
+                <input type="number" name="age" value={formData.age} onChange={handleChange} min="16" max="99" className="w-full bg-slate-50 border-slate-200 rounded-lg p-3"/>
               </div>
               <div>
                 <FormLabel>Hours Per Week</FormLabel>
-                <input type="number" name="hours_per_week" value={formData.hours_per_week} onChange={handleChange} min="1" max="80" className="w-full bg-slate-50 border-slate-200 rounded-lg p-3"/>
+                <input type="number" name="hours_per_week" value={formData.hours_per_week} onChange={handleChange} min="1" max="99" className="w-full bg-slate-50 border-slate-200 rounded-lg p-3"/>
               </div>
               <div className="md:col-span-2">
                 <FormLabel>Education Level</FormLabel>
@@ -166,7 +179,7 @@ const Home = () => {
                 <Loader2 className="w-12 h-12 text-indigo-600 animate-spin" />
             </div>
           ) : (
-            <ResultsSection prediction={prediction} fairnessData={fairnessData} originalProfile={formData} />
+            <ResultsSection prediction={prediction} fairnessData={fairnessData} trajectory={trajectory} originalProfile={formData} />
           )}
         </div>
 